@@ -1,11 +1,16 @@
 import os
 from flask import Flask, render_template
 from utils.scanner import Scanner
+from utils.compression import register_response_compression
+from features.ai.ollama_warmup import get_ollama_warmer, ollama_preload_enabled
 
 from features.ai.routes import register_ai_integration_routes
 from features.navigation.routes import register_navigation_routes
 from features.file_modification.routes import register_file_modification_routes
 from features.prompt_generation.routes import register_prompt_generation_routes
+from features.jobs.routes import register_job_routes
+from features.monitoring.health import StartupWarmup
+from features.monitoring.routes import register_monitoring_routes
 
 
 def create_app(directory: str):
@@ -19,10 +24,26 @@ def create_app(directory: str):
     scanner = Scanner(directory)
     app.config['SCANNER'] = scanner
 
+    # Load tokenizer encodings and walk the tree off the request path; first
+    # token counts and listings then do not pay for it. /readyz reports when done.
+    warmup = StartupWarmup(scanner)
+    warmup.start()
+    app.config['WARMUP'] = warmup
+
+    # Optionally load the local Ollama model now and keep it loaded, so the
+    # first prompt does not pay the model load time
+    if ollama_preload_enabled():
+        get_ollama_warmer().start()
+
     register_ai_integration_routes(app)
     register_prompt_generation_routes(app, scanner)
     register_navigation_routes(app, scanner)  # Coming from features/navigation
     register_file_modification_routes(app, scanner)
+    register_job_routes(app, scanner)
+    register_monitoring_routes(app, scanner)
+
+    # Compress large JSON and streamed responses when the client accepts it
+    register_response_compression(app)
 
     return app
 
@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+"""
+bench_batched_edits.py - Per-block vs batched application of edit responses
+
+Builds responses with many ModifyCode blocks per file and applies them to
+a scratch copy of a generated project twice: once the per-block way
+(validate_edit() then apply_edit() for every block: two reads and one
+atomic write per block) and once through ClaudeResponseProcessor, which
+validates and applies each file's blocks with one read and one write.
+EDIT_WORKERS is pinned to 1 so only batching is measured, not the
+per-file thread pool (see bench_parallel_edits.py).
+Prints wall time, file reads and writes for each, and checks that both
+leave identical files behind.
+
+Usage:
+  python benchmarks/bench_batched_edits.py [--files 20] [--blocks 1 10 30] [--lines 2000] [--repeat 3]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import features.file_modification.response_processor as response_processor  # noqa: E402
+from features.file_modification.file_editor import FileEditor  # noqa: E402
+from features.file_modification.response_parser import ResponseParser  # noqa: E402
+
+
+class CountingFileEditor(FileEditor):
+    """FileEditor that counts file reads and writes."""
+
+    reads = 0
+    writes = 0
+
+    def _read_file(self, file_path):
+        CountingFileEditor.reads += 1
+        return super()._read_file(file_path)
+
+    def _write_file_safely(self, file_path, content):
+        CountingFileEditor.writes += 1
+        return super()._write_file_safely(file_path, content)
+
+
+def make_project(root, files, lines):
+    for f in range(files):
+        with open(os.path.join(root, f"module_{f}.py"), "w", encoding="utf-8") as out:
+            out.writelines(f"value_{f}_{i} = {i}  # line {i}\n" for i in range(lines))
+
+
+def make_response(files, blocks, lines):
+    step = max(1, lines // blocks)
+    parts = []
+    for f in range(files):
+        for b in range(blocks):
+            i = b * step
+            parts.append(
+                "<ModifyCode>\n"
+                f"<File>module_{f}.py</File>\n"
+                f"<Search>\nvalue_{f}_{i} = {i}  # line {i}\n</Search>\n"
+                f"<Replace>\nvalue_{f}_{i} = {i * 2}  # edited\n</Replace>\n"
+                "</ModifyCode>\n")
+    return "".join(parts)
+
+
+def apply_per_block(root, response):
+    """The per-block path: every block validated and applied on its own."""
+    editor = CountingFileEditor(root)
+    parse_result = ResponseParser().parse_response(response)
+    blocks_by_file = {}
+    for block in parse_result.blocks:
+        blocks_by_file.setdefault(block.file_path, []).append(block)
+    for file_path, blocks in blocks_by_file.items():
+        if all(editor.validate_edit(file_path, block.search_text)[0] for block in blocks):
+            for block in blocks:
+                editor.apply_edit(file_path, block.search_text, block.replace_text)
+
+
+def apply_batched(root, response):
+    # Files one after another, like apply_per_block()
+    response_processor.EDIT_WORKERS = 1
+    processor = response_processor.ClaudeResponseProcessor(root)
+    processor.file_editor = CountingFileEditor(root)
+    results = processor.process_response(response)
+    if results["error_count"]:
+        raise RuntimeError(f"Batched apply reported errors: {results['errors'][:3]}")
+
+
+def snapshot(root):
+    return {name: open(os.path.join(root, name), encoding="utf-8").read() for name in sorted(os.listdir(root))}
+
+
+def run(apply, template, response, repeat):
+    best = None
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as root:
+            shutil.copytree(template, root, dirs_exist_ok=True)
+            CountingFileEditor.reads = CountingFileEditor.writes = 0
+            # The parser logs every block; keep that out of the timing
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                apply(root, response)
+                elapsed = time.perf_counter() - start
+            if best is None or elapsed < best[0]:
+                best = (elapsed, CountingFileEditor.reads, CountingFileEditor.writes, snapshot(root))
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=20)
+    parser.add_argument("--blocks", type=int, nargs="+", default=[1, 10, 30], help="Edit blocks per file")
+    parser.add_argument("--lines", type=int, default=2000, help="Lines per file")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per case; the fastest is reported")
+    args = parser.parse_args()
+
+    print(f"{args.files} files of {args.lines} lines, best of {args.repeat}\n")
+    print(f"{'blocks/file':>11} {'mode':>10} {'wall ms':>9} {'reads':>7} {'writes':>7} {'speedup':>8}")
+
+    ok = True
+    with tempfile.TemporaryDirectory() as template:
+        make_project(template, args.files, args.lines)
+        for blocks in args.blocks:
+            response = make_response(args.files, blocks, args.lines)
+            per_block = run(apply_per_block, template, response, args.repeat)
+            batched = run(apply_batched, template, response, args.repeat)
+            for mode, result in (("per-block", per_block), ("batched", batched)):
+                speedup = per_block[0] / result[0] if result[0] else float("inf")
+                print(f"{blocks:>11} {mode:>10} {result[0] * 1000:>9.1f} {result[1]:>7} {result[2]:>7} {speedup:>7.1f}x")
+            if per_block[3] != batched[3]:
+                print(f"  MISMATCH: files differ between modes with {blocks} blocks per file")
+                ok = False
+
+    print("\nfiles identical in both modes" if ok else "\nFAILED")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+"""
+bench_client_pool.py - Time-to-first-byte with pooled vs per-call clients
+
+Sends chat completions to the local stand-in server twice:
+  1. "fresh":  a new OpenAI client per request (the old _get_client behaviour)
+  2. "pooled": one client from the process-wide client registry
+
+The stand-in server adds a per-connection delay in place of a TLS handshake,
+so the gain from connection reuse is visible without leaving the machine.
+
+Both complete and streamed requests are measured. Note that the OpenAI SDK
+closes a streamed response as soon as it sees the [DONE] event, before the
+end of the HTTP body is read, so streamed requests cannot hand their
+connection back to the pool; their gain comes from not rebuilding the client.
+
+Usage:
+  python benchmarks/bench_client_pool.py [--requests 50] [--handshake-delay 0.05]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from openai import OpenAI  # noqa: E402
+
+from benchmarks.standin_server import start_standin_server  # noqa: E402
+from features.ai.clients import ClientRegistry  # noqa: E402
+
+
+def complete_once(client):
+    """Request one complete (non-streamed) completion."""
+    client.chat.completions.create(
+        model="standin",
+        messages=[{"role": "user", "content": "ping"}]
+    )
+
+
+def stream_once(client):
+    """Stream one completion and return the seconds until the first content chunk."""
+    start = time.perf_counter()
+    ttfb = None
+    stream = client.chat.completions.create(
+        model="standin",
+        messages=[{"role": "user", "content": "ping"}],
+        stream=True
+    )
+    for chunk in stream:
+        if ttfb is None and chunk.choices and chunk.choices[0].delta.content:
+            ttfb = time.perf_counter() - start
+    return ttfb
+
+
+def summarize(label, samples):
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(f"{label:>7}: mean {statistics.mean(samples) * 1000:7.2f} ms | "
+          f"p50 {statistics.median(samples) * 1000:7.2f} ms | p95 {p95 * 1000:7.2f} ms")
+    return statistics.mean(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--handshake-delay", type=float, default=0.05,
+                        help="Simulated TLS handshake cost per new connection in seconds")
+    args = parser.parse_args()
+
+    server = start_standin_server(handshake_delay=args.handshake_delay)
+    base_url = server.base_url
+
+    def new_client():
+        return OpenAI(api_key="standin", base_url=base_url, max_retries=0)
+
+    for label, request_once in (("complete", complete_once), ("stream", stream_once)):
+        print(f"\n=== Client pooling benchmark: {label} ({args.requests} requests) ===")
+
+        # Per-call clients: every request pays client construction and a new connection
+        fresh_samples = []
+        connections_before = server.connection_count
+        for _ in range(args.requests):
+            start = time.perf_counter()
+            client = new_client()
+            request_once(client)
+            fresh_samples.append(time.perf_counter() - start)
+            client.close()
+        fresh_connections = server.connection_count - connections_before
+
+        # Pooled client: built once, connection kept alive between requests
+        registry = ClientRegistry()
+        pooled_samples = []
+        connections_before = server.connection_count
+        for _ in range(args.requests):
+            start = time.perf_counter()
+            client = registry.get("standin", new_client)
+            request_once(client)
+            pooled_samples.append(time.perf_counter() - start)
+        pooled_connections = server.connection_count - connections_before
+        registry.reset()
+
+        fresh_mean = summarize("fresh", fresh_samples)
+        pooled_mean = summarize("pooled", pooled_samples)
+        print(f"Connections opened: fresh {fresh_connections}, pooled {pooled_connections}")
+        print(f"Time-to-first-byte reduction: {(1 - pooled_mean / fresh_mean) * 100:.1f}%")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
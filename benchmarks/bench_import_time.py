@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+"""
+bench_import_time.py - Server import-time regression check
+
+Runs `python -X importtime -c "import app"` in a fresh interpreter and reports
+the cumulative import time of the application, the slowest imported packages
+and whether any provider SDK was imported eagerly. Provider SDKs must only be
+imported on first use (see features/ai/clients.py).
+
+Exits with status 1 when the import time exceeds the threshold or an SDK is
+imported at startup, so it can be used as a regression gate.
+
+Usage:
+  python benchmarks/bench_import_time.py [--max-ms 400] [--runs 3]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from features.ai.clients import PROVIDER_SDK_MODULES  # noqa: E402
+
+
+def measure_import(module="app"):
+    """
+    Import a module in a fresh interpreter with -X importtime.
+
+    Returns:
+        Dict mapping imported module name to cumulative import time in microseconds
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT_DIR,
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr}")
+
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, self_us, cumulative_us, name = [part.strip() for part in line.replace("import time:", "|").split("|")]
+        timings[name] = int(cumulative_us)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="app", help="Module to import (default: app)")
+    parser.add_argument("--max-ms", type=float, default=400.0,
+                        help="Fail if the best cumulative import time exceeds this many milliseconds")
+    parser.add_argument("--runs", type=int, default=3,
+                        help="Number of fresh interpreters; the fastest run is reported")
+    args = parser.parse_args()
+
+    runs = [measure_import(args.module) for _ in range(args.runs)]
+    best = min(runs, key=lambda timings: timings.get(args.module, 0))
+    total_ms = best.get(args.module, 0) / 1000
+
+    print(f"=== Import time for '{args.module}' (best of {args.runs}) ===")
+    print(f"Cumulative: {total_ms:.1f} ms (threshold {args.max_ms:.0f} ms)")
+
+    top_level = {name: us for name, us in best.items() if not name.startswith(" ") and "." not in name}
+    print("Slowest top-level imports:")
+    for name, us in sorted(top_level.items(), key=lambda item: item[1], reverse=True)[:8]:
+        print(f"  {name:<30} {us / 1000:8.1f} ms")
+
+    sdk_roots = sorted({module.split(".")[0] for module in PROVIDER_SDK_MODULES.values()})
+    eager_sdks = [name for name in sdk_roots if name in best]
+    # google.generativeai lives under the google namespace package
+    if "google.generativeai" in best:
+        eager_sdks.append("google.generativeai")
+
+    failed = False
+    if eager_sdks:
+        print(f"FAIL: provider SDKs imported at startup: {', '.join(eager_sdks)}")
+        failed = True
+    if total_ms > args.max_ms:
+        print(f"FAIL: import time {total_ms:.1f} ms exceeds {args.max_ms:.0f} ms")
+        failed = True
+
+    if not failed:
+        print("OK: no provider SDKs imported eagerly and import time within threshold")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+"""
+bench_jobs.py - Batch job throughput against the local stand-in server
+
+Submits the same batch of prompts to a JobManager with different worker
+pool sizes, using the "standin" provider pointed at a stand-in server with
+a fixed per-request latency. Prints wall time, prompts/second and the
+speedup over a single worker, then checks that the results were persisted
+and that a fresh JobManager reloads them.
+
+Runs fully offline. Usage:
+  python benchmarks/bench_jobs.py [--prompts 40] [--latency 0.1] [--workers 1 2 4 8]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.standin_server import DEFAULT_CHUNKS, start_standin_server  # noqa: E402
+from features.ai.admission import get_admission_controller  # noqa: E402
+from features.ai.providers import STANDIN_URL_ENV  # noqa: E402
+from features.jobs.manager import JobManager  # noqa: E402
+
+
+def wait_for(manager, job_id, timeout=300.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = manager.get(job_id)
+        if job.finished_at is not None:
+            return job
+        time.sleep(0.01)
+    raise TimeoutError(f"Job {job_id} did not finish within {timeout}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--prompts", type=int, default=40)
+    parser.add_argument("--latency", type=float, default=0.1, help="Stand-in server latency per request (s)")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    server = start_standin_server(latency=args.latency)
+    os.environ[STANDIN_URL_ENV] = server.base_url
+    # Let the worker pool, not the provider's admission limit, bound concurrency
+    get_admission_controller("standin").limits.max_in_flight = max(args.workers)
+
+    prompts = [(f"Summarize module {i}", f"module-{i}") for i in range(args.prompts)]
+    expected = "".join(DEFAULT_CHUNKS)
+
+    print(f"{args.prompts} prompts, {args.latency * 1000:.0f} ms stand-in latency\n")
+    print(f"{'workers':>8} {'wall s':>8} {'prompts/s':>10} {'speedup':>8}")
+
+    baseline = None
+    ok = True
+    with tempfile.TemporaryDirectory() as jobs_dir:
+        # Untimed warm-up: SDK import and client creation happen on first use
+        warmup = JobManager(jobs_dir=jobs_dir, max_workers=1)
+        wait_for(warmup, warmup.submit(prompts[:1], "standin").id)
+        warmup.shutdown()
+
+        for workers in args.workers:
+            manager = JobManager(jobs_dir=jobs_dir, max_workers=workers)
+            start = time.perf_counter()
+            job = manager.submit(prompts, "standin", name=f"bench-{workers}")
+            wait_for(manager, job.id)
+            elapsed = time.perf_counter() - start
+            manager.shutdown()
+
+            baseline = baseline or elapsed
+            ok &= job.status == "completed" and all(task.text == expected for task in job.tasks)
+            print(f"{workers:>8} {elapsed:>8.2f} {args.prompts / elapsed:>10.1f} {baseline / elapsed:>7.1f}x")
+
+        reloaded = JobManager(jobs_dir=jobs_dir, max_workers=1)
+        persisted = reloaded.get(job.id)
+        ok &= persisted is not None and [t.text for t in persisted.tasks] == [t.text for t in job.tasks]
+        reloaded.shutdown()
+
+    server.shutdown()
+    print(f"\nResults {'persisted and reloaded' if ok else 'MISSING OR WRONG'}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
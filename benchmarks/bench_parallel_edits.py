@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+"""
+bench_parallel_edits.py - Serial vs parallel per-file edits on slow storage
+
+Applies one response with several ModifyCode blocks per file through
+ClaudeResponseProcessor with EDIT_WORKERS=1 and with a pool of workers.
+Every file read and write is delayed by --io-delay to stand in for a slow
+or network filesystem, where the pool pays off; run with --io-delay 0 to
+see the local-disk case, where it does not. Every 7th file has a search
+text that does not match, so validation failures are covered too. The
+response is parsed once, outside the timing. Prints wall time for each
+mode and checks that both report the same results and leave identical
+files behind.
+
+Usage:
+  python benchmarks/bench_parallel_edits.py [--files 300] [--blocks 5] [--lines 3000] [--io-delay 0.003] [--workers 8] [--repeat 3]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import features.file_modification.response_processor as response_processor  # noqa: E402
+from features.file_modification.file_editor import FileEditor  # noqa: E402
+from features.file_modification.response_parser import ResponseParser  # noqa: E402
+
+
+class SlowFileEditor(FileEditor):
+    """FileEditor whose reads and writes each take at least `delay` seconds."""
+
+    delay = 0.0
+
+    def _read_file(self, file_path):
+        time.sleep(SlowFileEditor.delay)
+        return super()._read_file(file_path)
+
+    def _write_file_safely(self, file_path, content):
+        time.sleep(SlowFileEditor.delay)
+        return super()._write_file_safely(file_path, content)
+
+
+def make_project(root, files, lines):
+    for f in range(files):
+        with open(os.path.join(root, f"module_{f}.py"), "w", encoding="utf-8") as out:
+            out.writelines(f"value_{f}_{i} = {i}\n" for i in range(lines))
+
+
+def make_response(files, blocks, lines):
+    step = max(1, lines // blocks)
+    parts = []
+    for f in range(files):
+        for b in range(blocks):
+            i = b * step
+            search = f"value_{f}_{i} = {i}" if f % 7 else "text that is not in the file"
+            parts.append(
+                "<ModifyCode>\n"
+                f"<File>module_{f}.py</File>\n"
+                f"<Search>\n{search}\n</Search>\n"
+                f"<Replace>\nvalue_{f}_{i} = {i * 2}\n</Replace>\n"
+                "</ModifyCode>\n")
+    return "".join(parts)
+
+
+def snapshot(root):
+    return {name: open(os.path.join(root, name), encoding="utf-8").read() for name in sorted(os.listdir(root))}
+
+
+def apply(root, response, parse_result, workers):
+    processor = response_processor.ClaudeResponseProcessor(root)
+    processor.file_editor = SlowFileEditor(root)
+    processor.response_parser.parse_response = lambda _response: parse_result
+    response_processor.EDIT_WORKERS = workers
+    start = time.perf_counter()
+    results = processor.process_response(response)
+    return time.perf_counter() - start, results
+
+
+def run(template, response, parse_result, workers, repeat):
+    best = None
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as root:
+            shutil.copytree(template, root, dirs_exist_ok=True)
+            # The processor logs every file; keep that out of the timing
+            with contextlib.redirect_stdout(io.StringIO()):
+                elapsed, results = apply(root, response, parse_result, workers)
+            if best is None or elapsed < best[0]:
+                best = (elapsed, results, snapshot(root))
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=300)
+    parser.add_argument("--blocks", type=int, default=5, help="Edit blocks per file")
+    parser.add_argument("--lines", type=int, default=3000, help="Lines per file")
+    parser.add_argument("--io-delay", type=float, default=0.003, help="Seconds added to every file read and write")
+    parser.add_argument("--workers", type=int, default=8, help="EDIT_WORKERS for the parallel run")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per mode; the fastest is reported")
+    args = parser.parse_args()
+
+    SlowFileEditor.delay = args.io_delay
+    response = make_response(args.files, args.blocks, args.lines)
+    with contextlib.redirect_stdout(io.StringIO()):
+        parse_result = ResponseParser().parse_response(response)
+
+    print(f"{args.files} files of {args.lines} lines, {args.blocks} blocks per file, "
+          f"{args.io_delay * 1000:g} ms per read/write, best of {args.repeat}\n")
+    print(f"{'workers':>7} {'wall ms':>9} {'edited':>7} {'errors':>7} {'speedup':>8}")
+
+    with tempfile.TemporaryDirectory() as template:
+        make_project(template, args.files, args.lines)
+        serial = run(template, response, parse_result, 1, args.repeat)
+        parallel = run(template, response, parse_result, args.workers, args.repeat)
+
+    for workers, result in ((1, serial), (args.workers, parallel)):
+        speedup = serial[0] / result[0] if result[0] else float("inf")
+        print(f"{workers:>7} {result[0] * 1000:>9.1f} {result[1]['success_count']:>7} "
+              f"{result[1]['error_count']:>7} {speedup:>7.1f}x")
+
+    ok = serial[1] == parallel[1] and serial[2] == parallel[2]
+    print("\nresults and files identical in both modes" if ok else "\nFAILED: results or files differ between modes")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
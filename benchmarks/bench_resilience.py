@@ -0,0 +1,220 @@
+#!/usr/bin/env python
+"""
+bench_resilience.py - Retries, backoff and circuit breaking against injected faults
+
+Runs AIProvider("openai") against the local stand-in server with fault
+injection turned on, and checks how the resilience layer behaves:
+  1. transient 503s are retried and the request succeeds
+  2. a 429 with Retry-After is not retried before the requested delay
+  3. a stream failing before its first chunk is retried without duplicate output
+  4. a stream failing after its first chunk is not retried
+  5. during an outage the circuit opens and calls fail fast, then a trial
+     call closes it again once the server recovers
+  6. a half-open trial stream closed by the caller does not leave the
+     circuit stuck half-open
+  7. the same for async trial calls and streams cancelled by their task
+
+Usage:
+  python benchmarks/bench_resilience.py
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("OPENAI_API_KEY", "standin")
+
+from benchmarks.standin_server import DEFAULT_CHUNKS, start_standin_server  # noqa: E402
+from features.ai.clients import client_registry, load_sdk  # noqa: E402
+from features.ai.providers import AIProvider  # noqa: E402
+from features.ai.resilience import CircuitBreaker, CircuitOpenError, RetryPolicy, get_resilience  # noqa: E402
+
+MESSAGES = [{"role": "user", "content": "ping"}]
+EXPECTED_TEXT = "".join(DEFAULT_CHUNKS)
+
+
+def use_server(**options):
+    """Start a stand-in server and point the shared openai client and resilience layer at it."""
+    server = start_standin_server(**options)
+    client_registry.reset("openai")
+    client_registry.get("openai", lambda: load_sdk("openai").OpenAI(
+        api_key="standin", base_url=server.base_url, max_retries=0))
+
+    layer = get_resilience("openai")
+    layer.policy = RetryPolicy(max_attempts=4, base_delay=0.05, max_delay=2.0)
+    layer.breaker = CircuitBreaker(failure_threshold=3, reset_timeout=1.0)
+    return server
+
+
+def check(label, ok, detail):
+    print(f"  [{'ok' if ok else 'FAIL'}] {label}: {detail}")
+    return ok
+
+
+def transient_errors():
+    server = use_server(fail_first=2, fail_status=503)
+    start = time.perf_counter()
+    response = AIProvider("openai").get_response(MESSAGES)
+    elapsed = time.perf_counter() - start
+    server.shutdown()
+    return check("transient 503s", response["text"] == EXPECTED_TEXT and server.request_count == 3,
+                 f"{server.request_count} attempts, {elapsed * 1000:.0f} ms")
+
+
+def retry_after():
+    server = use_server(fail_first=1, fail_status=429, retry_after=0.3)
+    start = time.perf_counter()
+    AIProvider("openai").get_response(MESSAGES)
+    elapsed = time.perf_counter() - start
+    server.shutdown()
+    return check("429 with Retry-After 0.3s", elapsed >= 0.3 and server.request_count == 2,
+                 f"{server.request_count} attempts, {elapsed * 1000:.0f} ms")
+
+
+def stream_before_first_chunk():
+    server = use_server(fail_first=2, fail_status=502)
+    text = "".join(AIProvider("openai").stream_response(MESSAGES))
+    server.shutdown()
+    return check("stream fails before first chunk", text == EXPECTED_TEXT,
+                 f"{server.request_count} attempts, output {text!r}")
+
+
+def stream_after_first_chunk():
+    server = use_server(fail_mid_stream=True)
+    chunks = []
+    error = None
+    try:
+        for chunk in AIProvider("openai").stream_response(MESSAGES):
+            chunks.append(chunk)
+    except Exception as e:
+        error = e
+    server.shutdown()
+    return check("stream fails after first chunk", error is not None and server.request_count == 1,
+                 f"{server.request_count} attempt, {len(chunks)} chunk(s) before the error")
+
+
+def outage():
+    server = use_server(fail_rate=1.0, fail_status=500)
+    provider = AIProvider("openai")
+    breaker = get_resilience("openai").breaker
+
+    try:
+        provider.get_response(MESSAGES)
+    except Exception:
+        pass
+    requests_during_outage = server.request_count
+
+    start = time.perf_counter()
+    fast_failures = 0
+    for _ in range(20):
+        try:
+            provider.get_response(MESSAGES)
+        except CircuitOpenError:
+            fast_failures += 1
+    fail_fast_ms = (time.perf_counter() - start) * 1000 / 20
+    ok = check("outage opens the circuit",
+               fast_failures == 20 and server.request_count == requests_during_outage,
+               f"{requests_during_outage} requests sent, then 20 calls failed fast "
+               f"in {fail_fast_ms:.3f} ms each without reaching the server")
+
+    # Recover: after reset_timeout a single trial call goes through and closes the circuit
+    server.fail_rate = 0.0
+    time.sleep(breaker.reset_timeout)
+    response = provider.get_response(MESSAGES)
+    server.shutdown()
+    return check("recovery closes the circuit",
+                 ok and response["text"] == EXPECTED_TEXT and breaker.state == "closed",
+                 f"breaker {breaker.state}")
+
+
+def closed_trial_stream():
+    layer = get_resilience("openai")
+    layer.breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.01)
+
+    def trial(chunks):
+        layer.breaker.record_failure()
+        time.sleep(0.02)
+        stream = layer.stream(lambda: iter(chunks))
+        try:
+            next(stream)
+        except StopIteration:
+            pass
+        # Client disconnect, losing hedge or cancel: the caller closes the stream
+        stream.close()
+        return layer.breaker.state
+
+    after_chunk = trial(["a", "b"])
+    ok = check("trial stream closed after a chunk", after_chunk == "closed", f"breaker {after_chunk}")
+
+    # Closed before any chunk: the trial is abandoned and the circuit reopens for a new one
+    layer.breaker.record_failure()
+    time.sleep(0.02)
+    layer.breaker.before_call("openai")
+    layer.breaker.record_abandoned(False)
+    reopened = layer.breaker.state
+    time.sleep(0.02)
+    try:
+        layer.breaker.before_call("openai")
+        allowed = True
+    except CircuitOpenError:
+        allowed = False
+    return check("trial abandoned before a chunk", ok and reopened == "open" and allowed,
+                 f"breaker {reopened}, next trial {'allowed' if allowed else 'refused'}")
+
+
+def cancelled_async_trials():
+    layer = get_resilience("openai")
+    layer.breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.01)
+
+    async def slow_response():
+        await asyncio.sleep(10)
+
+    async def slow_stream():
+        yield "a"
+        await asyncio.sleep(10)
+        yield "b"
+
+    async def consume_stream():
+        async for _ in layer.astream(slow_stream):
+            pass
+
+    async def trial(coroutine_factory):
+        layer.breaker.record_failure()
+        await asyncio.sleep(0.02)
+        # fan_out_stream cancels every task when the client disconnects
+        task = asyncio.ensure_future(coroutine_factory())
+        await asyncio.sleep(0.05)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        return layer.breaker.state
+
+    call_state = asyncio.run(trial(lambda: layer.acall(slow_response)))
+    stream_state = asyncio.run(trial(consume_stream))
+    return check("cancelled async trials", call_state == "open" and stream_state == "closed",
+                 f"call without response: breaker {call_state}, stream after a chunk: breaker {stream_state}")
+
+
+def main():
+    print("=== Resilience against injected faults ===")
+    results = [
+        transient_errors(),
+        retry_after(),
+        stream_before_first_chunk(),
+        stream_after_first_chunk(),
+        outage(),
+        closed_trial_stream(),
+        cancelled_async_trials(),
+    ]
+    client_registry.reset("openai")
+    if not all(results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+#!/usr/bin/env python
+"""
+standin_server.py - Local OpenAI-compatible stand-in server for benchmarks
+
+Serves /v1/chat/completions (streaming and non-streaming) with canned output,
+so provider code paths can be measured without network access or API keys.
+
+Options simulate real-world costs:
+  --latency          seconds before the first byte of every response
+  --handshake-delay  seconds added once per new TCP connection, standing in
+                     for the TLS handshake of a real API endpoint
+
+Fault injection, for exercising retries and circuit breakers:
+  --fail-first       answer the first N requests with --fail-status
+  --fail-rate        answer this fraction of requests with --fail-status
+  --fail-status      HTTP status of injected failures (default 503)
+  --retry-after      Retry-After header (seconds) sent with injected failures
+  --fail-mid-stream  drop streamed connections after the first chunk
+
+Run standalone:
+  python benchmarks/standin_server.py --port 8765
+"""
+
+import argparse
+import json
+import random
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_CHUNKS = ["Hello", " from", " the", " stand-in", " server", "."]
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    """Handles OpenAI-style chat completion requests with canned output"""
+
+    protocol_version = "HTTP/1.1"  # Keep-alive, so connection reuse is observable
+
+    def setup(self):
+        super().setup()
+        # Headers and body are written separately; avoid Nagle/delayed-ACK stalls
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        # Paid once per connection, like a TLS handshake
+        if self.server.handshake_delay:
+            time.sleep(self.server.handshake_delay)
+        self.server.connection_count += 1
+
+    def log_message(self, format, *args):
+        # Keep benchmark output clean
+        pass
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        self.server.request_count += 1
+
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        if self.server.should_fail():
+            self._send_error()
+            return
+
+        try:
+            if body.get("stream"):
+                self._send_stream(body)
+            else:
+                self._send_completion(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client closed the connection mid-response, e.g. a cancelled stream
+            self.server.disconnect_count += 1
+            self.close_connection = True
+
+    def _send_completion(self, body):
+        payload = json.dumps({
+            "id": "chatcmpl-standin",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "standin"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": "".join(self.server.chunks)},
+                "finish_reason": "stop"
+            }],
+            "usage": {"prompt_tokens": 10, "completion_tokens": len(self.server.chunks), "total_tokens": 10 + len(self.server.chunks)}
+        }).encode("utf-8")
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _send_error(self):
+        status = self.server.fail_status
+        payload = json.dumps({"error": {
+            "message": f"Injected failure ({status})",
+            "type": "server_error" if status >= 500 else "rate_limit_error",
+        }}).encode("utf-8")
+
+        self.server.failure_count += 1
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        if self.server.retry_after is not None:
+            self.send_header("Retry-After", str(self.server.retry_after))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _send_stream(self, body):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        for text in self.server.chunks:
+            event = {
+                "id": "chatcmpl-standin",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": body.get("model", "standin"),
+                "choices": [{"index": 0, "delta": {"content": text}, "finish_reason": None}]
+            }
+            self._write_chunk(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+            if self.server.fail_mid_stream:
+                # Cut the connection without finishing the chunked body
+                self.server.failure_count += 1
+                self.close_connection = True
+                return
+            if self.server.chunk_delay:
+                time.sleep(self.server.chunk_delay)
+
+        # OpenAI sends token usage in an extra chunk with no choices when asked to
+        if (body.get("stream_options") or {}).get("include_usage"):
+            event = {
+                "id": "chatcmpl-standin",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": body.get("model", "standin"),
+                "choices": [],
+                "usage": {"prompt_tokens": 10, "completion_tokens": len(self.server.chunks),
+                          "total_tokens": 10 + len(self.server.chunks)}
+            }
+            self._write_chunk(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+
+        # Send the final event together with the terminating chunk, as real
+        # endpoints do, so clients can release the connection back to the pool
+        done = b"data: [DONE]\n\n"
+        self.wfile.write(f"{len(done):x}\r\n".encode("ascii") + done + b"\r\n0\r\n\r\n")
+        self.wfile.flush()
+
+    def _write_chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+
+class StandinServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency=0.0, handshake_delay=0.0, chunk_delay=0.0, chunks=None,
+                 fail_first=0, fail_rate=0.0, fail_status=503, retry_after=None, fail_mid_stream=False):
+        super().__init__(address, StandinHandler)
+        self.latency = latency
+        self.handshake_delay = handshake_delay
+        self.chunk_delay = chunk_delay
+        self.chunks = chunks or DEFAULT_CHUNKS
+        self.fail_first = fail_first
+        self.fail_rate = fail_rate
+        self.fail_status = fail_status
+        self.retry_after = retry_after
+        self.fail_mid_stream = fail_mid_stream
+        self.connection_count = 0
+        self.request_count = 0
+        self.failure_count = 0
+        self.disconnect_count = 0
+
+    def should_fail(self):
+        """Whether the current request gets an injected error response."""
+        if self.request_count <= self.fail_first:
+            return True
+        return self.fail_rate > 0 and random.random() < self.fail_rate
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+
+def start_standin_server(port=0, **options):
+    """
+    Start a stand-in server on a background thread.
+
+    Args:
+        port: Port to listen on (0 picks a free port)
+        **options: latency, handshake_delay, chunk_delay, chunks, and the
+                   fault injection options fail_first, fail_rate, fail_status,
+                   retry_after, fail_mid_stream
+
+    Returns:
+        StandinServer: Running server; call shutdown() when done
+    """
+    server = StandinServer(("127.0.0.1", port), **options)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--handshake-delay", type=float, default=0.0)
+    parser.add_argument("--chunk-delay", type=float, default=0.0)
+    parser.add_argument("--fail-first", type=int, default=0)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    parser.add_argument("--fail-status", type=int, default=503)
+    parser.add_argument("--retry-after", type=float, default=None)
+    parser.add_argument("--fail-mid-stream", action="store_true")
+    args = parser.parse_args()
+
+    server = StandinServer(("127.0.0.1", args.port), latency=args.latency,
+                           handshake_delay=args.handshake_delay, chunk_delay=args.chunk_delay,
+                           fail_first=args.fail_first, fail_rate=args.fail_rate,
+                           fail_status=args.fail_status, retry_after=args.retry_after,
+                           fail_mid_stream=args.fail_mid_stream)
+    print(f"Stand-in server listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1 @@
+# ai feature package
@@ -0,0 +1,213 @@
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+DEFAULT_MAX_IN_FLIGHT = 4
+DEFAULT_QUEUE_TIMEOUT = 60.0
+TPM_WINDOW_SECONDS = 60.0
+
+# Local models serve one request at a time; queueing beats thrashing the GPU
+PROVIDER_DEFAULT_MAX_IN_FLIGHT = {
+    "ollama": 1,
+}
+
+
+class AdmissionTimeout(Exception):
+    """Raised when a request waited in the provider queue longer than allowed."""
+
+    def __init__(self, provider: str, waited: float):
+        super().__init__(
+            f"{provider} is at capacity; request waited {waited:.1f}s in the queue")
+        self.provider = provider
+        self.waited = waited
+
+
+@dataclass
+class ProviderLimits:
+    """Admission limits for one provider. tokens_per_minute=None means no token budget."""
+    max_in_flight: int = DEFAULT_MAX_IN_FLIGHT
+    tokens_per_minute: Optional[int] = None
+    queue_timeout: float = DEFAULT_QUEUE_TIMEOUT
+
+    @classmethod
+    def from_env(cls, provider: str) -> "ProviderLimits":
+        """
+        Read limits from PROMPTER_<PROVIDER>_MAX_IN_FLIGHT, PROMPTER_<PROVIDER>_TPM
+        and PROMPTER_ADMISSION_TIMEOUT.
+        """
+        prefix = f"PROMPTER_{provider.upper()}_"
+        tpm = os.getenv(prefix + "TPM")
+        return cls(
+            max_in_flight=int(os.getenv(prefix + "MAX_IN_FLIGHT",
+                                        PROVIDER_DEFAULT_MAX_IN_FLIGHT.get(provider, DEFAULT_MAX_IN_FLIGHT))),
+            tokens_per_minute=int(tpm) if tpm else None,
+            queue_timeout=float(os.getenv("PROMPTER_ADMISSION_TIMEOUT", DEFAULT_QUEUE_TIMEOUT)),
+        )
+
+
+class Ticket:
+    """An admitted request. Pass it back to AdmissionController.release()."""
+
+    def __init__(self, estimated_tokens: int):
+        self.estimated_tokens = estimated_tokens
+        self.usage_entry = None
+        self.wait_time = 0.0
+
+
+class AdmissionController:
+    """
+    Per-provider admission control.
+
+    At most max_in_flight requests run at once, and the tokens admitted in
+    the last minute stay within tokens_per_minute. Requests over the limit
+    wait in a FIFO queue, so a large request is not starved by a stream of
+    small ones, and give up with AdmissionTimeout after queue_timeout.
+    """
+
+    def __init__(self, provider: str, limits: ProviderLimits = None):
+        self.provider = provider
+        self.limits = limits or ProviderLimits.from_env(provider)
+        self.in_flight = 0
+        self._queue = deque()
+        # [admitted_at, tokens] of requests in the token budget window
+        self._token_window = deque()
+        self._cond = threading.Condition()
+
+        self.admitted = 0
+        self.timeouts = 0
+        self.max_queue_depth = 0
+        self.total_wait = 0.0
+        self._recent_waits = deque(maxlen=1000)
+
+    def acquire(self, estimated_tokens: int = 0) -> Ticket:
+        """
+        Wait for a slot and token budget, in arrival order.
+
+        Args:
+            estimated_tokens: Tokens the request is expected to use
+
+        Returns:
+            Ticket: Release it with release() when the request is done
+
+        Raises:
+            AdmissionTimeout: If the request could not be admitted in time
+        """
+        ticket = Ticket(estimated_tokens)
+        start = time.monotonic()
+        deadline = start + self.limits.queue_timeout
+
+        with self._cond:
+            self._queue.append(ticket)
+            self.max_queue_depth = max(self.max_queue_depth, len(self._queue))
+            try:
+                while True:
+                    now = time.monotonic()
+                    wait = None
+                    if self._queue[0] is ticket:
+                        wait = self._time_until_admissible(ticket, now)
+                        if wait == 0:
+                            break
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        self.timeouts += 1
+                        raise AdmissionTimeout(self.provider, now - start)
+                    # Woken by release(); token budget waits also wake when tokens age out
+                    self._cond.wait(min(remaining, wait) if wait else remaining)
+            finally:
+                self._queue.remove(ticket)
+                # The next request in line may be admissible now
+                self._cond.notify_all()
+
+            self.in_flight += 1
+            ticket.usage_entry = [time.monotonic(), estimated_tokens]
+            self._token_window.append(ticket.usage_entry)
+
+            ticket.wait_time = time.monotonic() - start
+            self.admitted += 1
+            self.total_wait += ticket.wait_time
+            self._recent_waits.append(ticket.wait_time)
+        return ticket
+
+    def release(self, ticket: Ticket, actual_tokens: Optional[int] = None) -> None:
+        """
+        Free the request's slot.
+
+        Args:
+            ticket: Ticket returned by acquire()
+            actual_tokens: Tokens actually used, replacing the estimate in the budget
+        """
+        with self._cond:
+            self.in_flight -= 1
+            if actual_tokens is not None and ticket.usage_entry is not None:
+                ticket.usage_entry[1] = actual_tokens
+            self._cond.notify_all()
+
+    def _time_until_admissible(self, ticket: Ticket, now: float) -> Optional[float]:
+        """0 if the ticket can be admitted now, seconds until the budget frees up, or None to wait for a release."""
+        if self.in_flight >= self.limits.max_in_flight:
+            return None
+
+        budget = self.limits.tokens_per_minute
+        if not budget:
+            return 0
+
+        while self._token_window and now - self._token_window[0][0] >= TPM_WINDOW_SECONDS:
+            self._token_window.popleft()
+        used = sum(tokens for _, tokens in self._token_window)
+        # A request larger than the whole budget is admitted once the window is empty
+        if used + ticket.estimated_tokens <= budget or not self._token_window:
+            return 0
+
+        # Wait until enough of the oldest usage ages out of the window
+        for admitted_at, tokens in self._token_window:
+            used -= tokens
+            if used + ticket.estimated_tokens <= budget:
+                return max(0.001, admitted_at + TPM_WINDOW_SECONDS - now)
+        return max(0.001, self._token_window[-1][0] + TPM_WINDOW_SECONDS - now)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Queue depth, in-flight requests and wait times."""
+        with self._cond:
+            waits = sorted(self._recent_waits)
+            now = time.monotonic()
+            tokens_last_minute = sum(
+                tokens for admitted_at, tokens in self._token_window
+                if now - admitted_at < TPM_WINDOW_SECONDS)
+            return {
+                "max_in_flight": self.limits.max_in_flight,
+                "tokens_per_minute": self.limits.tokens_per_minute,
+                "in_flight": self.in_flight,
+                "queue_depth": len(self._queue),
+                "max_queue_depth": self.max_queue_depth,
+                "tokens_last_minute": tokens_last_minute,
+                "admitted": self.admitted,
+                "timeouts": self.timeouts,
+                "wait_seconds": {
+                    "mean": self.total_wait / self.admitted if self.admitted else 0.0,
+                    "p50": waits[len(waits) // 2] if waits else 0.0,
+                    "p95": waits[min(len(waits) - 1, int(len(waits) * 0.95))] if waits else 0.0,
+                    "max": waits[-1] if waits else 0.0,
+                },
+            }
+
+
+_controllers: Dict[str, AdmissionController] = {}
+_controllers_lock = threading.Lock()
+
+
+def get_admission_controller(provider: str) -> AdmissionController:
+    """Get the process-wide admission controller for a provider."""
+    with _controllers_lock:
+        if provider not in _controllers:
+            _controllers[provider] = AdmissionController(provider)
+        return _controllers[provider]
+
+
+def admission_metrics() -> Dict[str, Dict[str, Any]]:
+    """Admission metrics of every provider used so far."""
+    with _controllers_lock:
+        controllers = list(_controllers.items())
+    return {name: controller.snapshot() for name, controller in controllers}
@@ -0,0 +1,475 @@
+import asyncio
+import os
+import queue
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, Iterator, List, Tuple
+
+from features.ai.admission import AdmissionTimeout, get_admission_controller
+from features.ai.clients import client_registry, load_sdk
+from features.ai.models import get_model_registry
+from features.ai.ollama_warmup import get_ollama_warmer, model_load_info
+from features.ai.providers import (
+    AIProvider, ANTHROPIC_MAX_OUTPUT_TOKENS, ANTHROPIC_MODEL, DEEPSEEK_MODEL, GEMINI_MODEL, MISTRAL_MODEL, OLLAMA_MODEL,
+    OPENAI_MODEL, PROVIDER_MODELS, STANDIN_MODEL, STANDIN_URL_ENV, XAI_MODEL
+)
+from features.ai.resilience import CircuitOpenError, get_resilience
+from features.ai.stream_metrics import StreamMetrics
+from utils.telemetry import get_telemetry
+
+# Providers spoken to through the OpenAI SDK, and their models
+OPENAI_COMPATIBLE_MODELS = {
+    "openai": OPENAI_MODEL,
+    "deepseek": DEEPSEEK_MODEL,
+    "xai": XAI_MODEL,
+    "standin": STANDIN_MODEL,
+}
+
+
+class AsyncRunner:
+    """
+    A long-lived event loop on a daemon thread.
+
+    Async SDK clients are bound to the event loop that created them, so all
+    async provider work runs on this one loop and the clients can be shared
+    like the sync ones. Synchronous code (Flask views) submits coroutines
+    with run() and consumes async generators with iterate().
+    """
+
+    def __init__(self):
+        self._loop = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """The runner's event loop, started on first use."""
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="prompter-async", daemon=True).start()
+                self._loop = loop
+            return self._loop
+
+    def run(self, coroutine, timeout: float = None) -> Any:
+        """Run a coroutine on the loop and wait for its result."""
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result(timeout)
+
+    def iterate(self, agen: AsyncIterator) -> Iterator:
+        """
+        Consume an async generator from synchronous code.
+
+        Items are handed over through a queue as the generator produces
+        them. Closing the returned iterator early (e.g. on client disconnect)
+        cancels the generator's task.
+        """
+        items = queue.Queue()
+
+        async def pump():
+            try:
+                async for item in agen:
+                    items.put(("item", item))
+                items.put(("done", None))
+            except asyncio.CancelledError:
+                items.put(("done", None))
+                raise
+            except Exception as e:
+                items.put(("error", e))
+            finally:
+                await agen.aclose()
+
+        future = asyncio.run_coroutine_threadsafe(pump(), self.loop)
+        try:
+            while True:
+                kind, payload = items.get()
+                if kind == "done":
+                    return
+                if kind == "error":
+                    raise payload
+                yield payload
+        finally:
+            future.cancel()
+
+
+# Shared by all async providers in this process
+async_runner = AsyncRunner()
+
+
+class AsyncAIProvider(AIProvider):
+    """
+    asyncio implementation of the provider interface.
+
+    Uses the SDKs' async clients (AsyncOpenAI, AsyncAnthropic, ollama's
+    AsyncClient, Mistral's and Gemini's *_async methods), so an in-flight
+    stream costs a coroutine instead of a thread. Message preparation,
+    usage accounting, the response cache, admission control and the
+    retry/circuit breaker layer are shared with the sync AIProvider.
+    Must be used on async_runner's loop, where the async clients live.
+    """
+
+    def __init__(self, provider: str):
+        super().__init__(provider)
+        # Task running the current stream, so cancel() can interrupt a pending await
+        self._task = None
+        self._task_loop = None
+
+    def cancel(self) -> None:
+        """Stop the current stream. Safe to call from any thread."""
+        super().cancel()
+        with self._upstream_lock:
+            task, loop = self._task, self._task_loop
+        if task is not None:
+            loop.call_soon_threadsafe(task.cancel)
+
+    def _get_async_client(self):
+        """Get the shared async client for the current provider."""
+        return client_registry.get(("async", self.provider), self._create_async_client)
+
+    def _create_async_client(self):
+        """Create a new async client for the current provider."""
+        try:
+            sdk = load_sdk(self.provider)
+            # SDK-level retries are disabled; get_resilience() retries every provider the same way
+            if self.provider == "openai":
+                return sdk.AsyncOpenAI(max_retries=0)
+            elif self.provider == "anthropic":
+                return sdk.AsyncAnthropic(max_retries=0)
+            elif self.provider == "gemini":
+                sdk.configure()
+                return sdk.GenerativeModel(model_name=GEMINI_MODEL)
+            elif self.provider == "ollama":
+                return sdk.AsyncClient()
+            elif self.provider == "mistral":
+                return sdk.Mistral(api_key=os.getenv("MISTRAL_API_KEY"))
+            elif self.provider == "deepseek":
+                return sdk.AsyncOpenAI(
+                    api_key=os.getenv("DEEPSEEK_API_KEY"),
+                    base_url="https://api.deepseek.com",
+                    max_retries=0
+                )
+            elif self.provider == "xai":
+                return sdk.AsyncOpenAI(
+                    api_key=os.getenv("XAI_API_KEY"),
+                    base_url="https://api.x.ai/v1",
+                    max_retries=0
+                )
+            elif self.provider == "standin":
+                return sdk.AsyncOpenAI(
+                    api_key="standin",
+                    base_url=os.getenv(STANDIN_URL_ENV),
+                    max_retries=0
+                )
+        except Exception as e:
+            raise ValueError(
+                f"Error initializing async client for {self.provider}: {str(e)}")
+
+    def _openai_params(self) -> Dict[str, Any]:
+        """Model and extra parameters for OpenAI-compatible providers."""
+        model = OPENAI_COMPATIBLE_MODELS[self.provider]
+        params = {"model": model}
+        # o-series models support reasoning effort
+        if self.provider == "openai" and model.startswith('o') and any(char.isdigit() for char in model):
+            params["reasoning_effort"] = self.reasoning_effort
+        return params
+
+    def _gemini_chat(self, messages: list[Dict[str, str]]):
+        """Start a Gemini chat over all but the last message; returns (chat, last_message)."""
+        history, system_prompt = self._prepare_messages(messages[:-1])
+        client = self._get_async_client()
+        if system_prompt:
+            client = load_sdk("gemini").GenerativeModel(
+                model_name=GEMINI_MODEL,
+                system_instruction=system_prompt
+            )
+        return client.start_chat(history=history), messages[-1]["content"] if messages else ""
+
+    async def _arequest_from_provider(self, messages: list[Dict[str, str]]) -> Dict[str, Any]:
+        """Make one complete request with the provider's async client."""
+        client = self._get_async_client()
+        try:
+            if self.provider in OPENAI_COMPATIBLE_MODELS:
+                completion = await client.chat.completions.create(messages=messages, **self._openai_params())
+                if not completion.choices or not completion.choices[0].message.content:
+                    raise ValueError(f"Empty content in {self.provider} response")
+                return {
+                    "text": completion.choices[0].message.content,
+                    "input_tokens": completion.usage.prompt_tokens,
+                    "output_tokens": completion.usage.completion_tokens
+                }
+            elif self.provider == "anthropic":
+                filtered_messages, system_prompt = self._prepare_messages(messages)
+                message = await client.messages.create(
+                    model=ANTHROPIC_MODEL,
+                    max_tokens=ANTHROPIC_MAX_OUTPUT_TOKENS,
+                    messages=self._anthropic_cached_messages(filtered_messages),
+                    system=system_prompt if system_prompt else "You are a helpful assistant."
+                )
+                text = "\n".join(part.text for part in message.content if hasattr(part, 'text'))
+                if not text:
+                    raise ValueError("No text content in Anthropic response")
+                return {"text": text, **self._anthropic_usage(message.usage)}
+            elif self.provider == "gemini":
+                chat, last_message = self._gemini_chat(messages)
+                response = await chat.send_message_async(last_message)
+                if not response.text:
+                    raise ValueError("Empty content in Gemini response")
+                input_text = "\n".join(msg["content"] for msg in messages)
+                # Tokenizing can take a while on long prompts; keep it off the event loop
+                input_tokens, output_tokens = await asyncio.to_thread(self._count_tokens, input_text, response.text)
+                return {"text": response.text, "input_tokens": input_tokens, "output_tokens": output_tokens}
+            elif self.provider == "ollama":
+                response = await client.chat(model=OLLAMA_MODEL, messages=messages,
+                                             keep_alive=self.ollama_keep_alive)
+                text = response.message.content
+                if not text:
+                    raise ValueError("Empty content in Ollama response")
+                input_tokens, output_tokens = await asyncio.to_thread(
+                    self._count_tokens, "\n".join(msg["content"] for msg in messages), text)
+                load_info = model_load_info(response)
+                get_ollama_warmer().record_use(load_info)
+                return {"text": text, "input_tokens": input_tokens, "output_tokens": output_tokens, **load_info}
+            elif self.provider == "mistral":
+                completion = await client.chat.complete_async(model=MISTRAL_MODEL, messages=messages)
+                if not completion.choices or not completion.choices[0].message.content:
+                    raise ValueError("Empty content in Mistral response")
+                return {
+                    "text": completion.choices[0].message.content,
+                    "input_tokens": completion.usage.prompt_tokens,
+                    "output_tokens": completion.usage.completion_tokens
+                }
+            raise ValueError(f"Unsupported provider: {self.provider}")
+        except Exception as e:
+            raise ValueError(f"{self.provider} API error: {str(e)}") from e
+
+    async def _astream_from_provider(self, messages: list[Dict[str, str]]) -> AsyncIterator[str]:
+        """Stream from the provider's async client."""
+        if self.cancelled:
+            return
+        client = self._get_async_client()
+        try:
+            if self.provider in OPENAI_COMPATIBLE_MODELS:
+                response = await client.chat.completions.create(
+                    messages=messages,
+                    stream=True,
+                    stream_options={"include_usage": True},
+                    **self._openai_params()
+                )
+                try:
+                    async for chunk in response:
+                        self._record_openai_usage(chunk)
+                        if chunk.choices and chunk.choices[0].delta.content:
+                            yield chunk.choices[0].delta.content
+                finally:
+                    await response.close()
+            elif self.provider == "anthropic":
+                filtered_messages, system_prompt = self._prepare_messages(messages)
+                async with client.messages.stream(
+                    max_tokens=ANTHROPIC_MAX_OUTPUT_TOKENS,
+                    messages=self._anthropic_cached_messages(filtered_messages),
+                    model=ANTHROPIC_MODEL,
+                    system=system_prompt if system_prompt else "You are a helpful assistant."
+                ) as stream:
+                    async for text in stream.text_stream:
+                        if text:
+                            yield text
+                    self.last_usage = self._anthropic_usage((await stream.get_final_message()).usage)
+            elif self.provider == "gemini":
+                chat, last_message = self._gemini_chat(messages)
+                response = await chat.send_message_async(last_message, stream=True)
+                async for chunk in response:
+                    usage = getattr(chunk, 'usage_metadata', None)
+                    if usage and usage.candidates_token_count:
+                        self.last_usage = {
+                            "input_tokens": usage.prompt_token_count,
+                            "output_tokens": usage.candidates_token_count
+                        }
+                    if chunk.text:
+                        yield chunk.text
+            elif self.provider == "ollama":
+                stream = await client.chat(model=OLLAMA_MODEL, messages=messages, stream=True,
+                                           keep_alive=self.ollama_keep_alive)
+                async for chunk in stream:
+                    if chunk.done:
+                        load_info = model_load_info(chunk)
+                        get_ollama_warmer().record_use(load_info)
+                        if chunk.eval_count:
+                            self.last_usage = {
+                                "input_tokens": chunk.prompt_eval_count,
+                                "output_tokens": chunk.eval_count,
+                                **load_info
+                            }
+                    if chunk.message and chunk.message.content:
+                        yield chunk.message.content
+            elif self.provider == "mistral":
+                stream = await client.chat.stream_async(model=MISTRAL_MODEL, messages=messages)
+                async for chunk in stream:
+                    usage = getattr(chunk.data, 'usage', None)
+                    if usage:
+                        self.last_usage = {
+                            "input_tokens": usage.prompt_tokens,
+                            "output_tokens": usage.completion_tokens
+                        }
+                    if chunk.data.choices and chunk.data.choices[0].delta.content:
+                        yield chunk.data.choices[0].delta.content
+            else:
+                raise ValueError(f"Unsupported provider: {self.provider}")
+        except Exception as e:
+            raise Exception(f"Error during streaming from {self.provider}: {str(e)}") from e
+
+    async def _acquire_admission(self, messages: list[Dict[str, str]]):
+        """Wait for admission without blocking the event loop; returns (controller, ticket)."""
+        admission = get_admission_controller(self.provider)
+        acquire = asyncio.ensure_future(asyncio.to_thread(admission.acquire, self._estimate_tokens(messages)))
+        try:
+            return admission, await asyncio.shield(acquire)
+        except asyncio.CancelledError:
+            # The queue wait cannot be interrupted; give the slot back once it is granted
+            acquire.add_done_callback(
+                lambda future: future.exception() is None and admission.release(future.result()))
+            raise
+
+    async def get_response_async(self, messages: list[Dict[str, str]]) -> Dict[str, Any]:
+        """Async version of get_response()."""
+        with get_telemetry().timed("ai.response", provider=self.provider) as event:
+            response_data = await self._get_response_async(messages)
+            event.update(input_tokens=response_data.get("input_tokens"),
+                         output_tokens=response_data.get("output_tokens"),
+                         size=len(response_data["text"].encode('utf-8')),
+                         cache_hit=self.last_cache_hit)
+            return response_data
+
+    async def _get_response_async(self, messages: list[Dict[str, str]]) -> Dict[str, Any]:
+        start_time = time.time()
+        self.last_cache_hit = False
+
+        cache_key = self._cache_key(messages) if self.response_cache else None
+        if cache_key:
+            cached = self.response_cache.get_response(cache_key)
+            if cached:
+                self.last_cache_hit = True
+                cached["cache_hit"] = True
+                cached["time_taken"] = time.time() - start_time
+                return cached
+
+        try:
+            admission, ticket = await self._acquire_admission(messages)
+            response_data = None
+            try:
+                response_data = await get_resilience(self.provider).acall(
+                    lambda: self._arequest_from_provider(messages))
+            finally:
+                admission.release(ticket, self._usage_tokens(response_data))
+
+            response_data["time_taken"] = time.time() - start_time
+            get_model_registry().record_response(self.provider, response_data["time_taken"])
+            if cache_key:
+                self.response_cache.put_response(cache_key, response_data)
+            return response_data
+
+        except (AdmissionTimeout, CircuitOpenError):
+            raise
+        except Exception as e:
+            raise ValueError(
+                f"Error getting response from {self.provider}: {str(e)}"
+            ) from e
+
+    async def stream_response_async(self, messages: list[Dict[str, str]]) -> AsyncIterator[str]:
+        """Async version of stream_response()."""
+        with get_telemetry().timed("ai.stream", provider=self.provider) as event:
+            size = 0
+            try:
+                async for chunk in self._stream_response_async(messages):
+                    size += len(chunk.encode('utf-8'))
+                    yield chunk
+            except asyncio.CancelledError:
+                event["status"] = "cancelled"
+                raise
+            finally:
+                event.update(size=size, cache_hit=self.last_cache_hit, **self._telemetry_usage())
+            if self.cancelled:
+                event["status"] = "cancelled"
+
+    async def _stream_response_async(self, messages: list[Dict[str, str]]) -> AsyncIterator[str]:
+        self.last_cache_hit = False
+        self.last_usage = None
+        cache_key = self._cache_key(messages, stream=True) if self.response_cache else None
+        if cache_key:
+            cached = self.response_cache.get(cache_key)
+            if cached and cached.get("chunks") is not None:
+                self.last_cache_hit = True
+                self.last_usage = cached.get("usage")
+                for chunk in cached["chunks"]:
+                    yield chunk
+                return
+
+        with self._upstream_lock:
+            self._task, self._task_loop = asyncio.current_task(), asyncio.get_running_loop()
+        chunks = []
+        admission, ticket = await self._acquire_admission(messages)
+        try:
+            # Retries only until the first chunk; fails fast while the provider is down
+            async for chunk in get_resilience(self.provider).astream(lambda: self._astream_from_provider(messages)):
+                if self.cancelled:
+                    break
+                if cache_key:
+                    chunks.append(chunk)
+                yield chunk
+        finally:
+            with self._upstream_lock:
+                self._task = self._task_loop = None
+            admission.release(ticket, self._usage_tokens(self.last_usage))
+
+        # A cancelled stream is incomplete; never cache it
+        if cache_key and chunks and not self.cancelled:
+            self.response_cache.put_chunks(cache_key, chunks, self.last_usage)
+
+
+async def fan_out_stream(providers: List[AsyncAIProvider],
+                         messages: list[Dict[str, str]]) -> AsyncIterator[Tuple[str, str, Any]]:
+    """
+    Stream one prompt from several providers at once.
+
+    Yields (provider, kind, payload) in arrival order, where kind is
+    "chunk" (payload: text), "metrics" (payload: the provider's stream
+    metrics, sent when its stream ends) or "error" (payload: message).
+
+    Args:
+        providers: Providers to query, one stream each
+        messages: Messages sent to every provider
+    """
+    events = asyncio.Queue()
+
+    async def run(ai_provider: AsyncAIProvider):
+        metrics = StreamMetrics(ai_provider.provider, PROVIDER_MODELS.get(ai_provider.provider))
+        metrics.start()
+        try:
+            async for chunk in ai_provider.stream_response_async(messages):
+                metrics.record_chunk(chunk)
+                events.put_nowait((ai_provider.provider, "chunk", chunk))
+            result = metrics.finish(ai_provider.last_usage)
+            result["cache_hit"] = ai_provider.last_cache_hit
+            get_model_registry().record_stream(result)
+            events.put_nowait((ai_provider.provider, "metrics", result))
+        except Exception as e:
+            events.put_nowait((ai_provider.provider, "error", str(e)))
+        finally:
+            events.put_nowait((ai_provider.provider, None, None))
+
+    tasks = [asyncio.create_task(run(ai_provider)) for ai_provider in providers]
+    try:
+        running = len(tasks)
+        while running:
+            provider, kind, payload = await events.get()
+            if kind is None:
+                running -= 1
+                continue
+            yield provider, kind, payload
+    finally:
+        # Stops the streams still running if the consumer went away
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def fan_out(providers: List[AsyncAIProvider], messages: list[Dict[str, str]]) -> Iterator[Tuple[str, str, Any]]:
+    """Synchronous wrapper of fan_out_stream() for WSGI views; runs on async_runner's loop."""
+    return async_runner.iterate(fan_out_stream(providers, messages))
@@ -0,0 +1,94 @@
+import importlib
+import threading
+from types import ModuleType
+from typing import Any, Callable, Dict, Hashable
+
+# SDK module used by each provider. Modules are imported on first use only, so
+# starting the server never pays for SDKs of providers that are not used.
+PROVIDER_SDK_MODULES = {
+    "openai": "openai",
+    "deepseek": "openai",  # OpenAI-compatible API
+    "xai": "openai",  # OpenAI-compatible API
+    "anthropic": "anthropic",
+    "gemini": "google.generativeai",
+    "mistral": "mistralai",
+    "ollama": "ollama",
+    "standin": "openai",  # Local OpenAI-compatible stand-in server
+}
+
+
+def load_sdk(provider: str) -> ModuleType:
+    """
+    Import and return the SDK module for a provider.
+    Imports are cached by Python and guarded by the import lock, so this is
+    cheap after the first call and safe from multiple threads.
+
+    Args:
+        provider: Provider name, see PROVIDER_SDK_MODULES
+
+    Returns:
+        The imported SDK module
+    """
+    try:
+        module_name = PROVIDER_SDK_MODULES[provider]
+    except KeyError:
+        raise ValueError(f"No SDK registered for provider: {provider}")
+    return importlib.import_module(module_name)
+
+
+class ClientRegistry:
+    """
+    Process-wide registry of long-lived provider SDK clients.
+
+    Each client is created once on first use and then shared by every request,
+    so its HTTP connection pool (and the TLS sessions in it) stays warm between
+    calls. The SDK clients are thread-safe, which makes sharing them across
+    Flask's request threads safe; creation itself is guarded by a lock.
+    """
+
+    def __init__(self):
+        self._clients: Dict[Hashable, Any] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """
+        Get the client for a key, creating it with factory on first use.
+
+        Args:
+            key: Identifier of the client, usually the provider name
+            factory: Callable that builds a new client
+
+        Returns:
+            The shared client instance
+        """
+        client = self._clients.get(key)
+        if client is not None:
+            return client
+
+        with self._lock:
+            # Another thread may have created it while we waited for the lock
+            client = self._clients.get(key)
+            if client is None:
+                client = factory()
+                self._clients[key] = client
+            return client
+
+    def reset(self, key: Hashable = None) -> None:
+        """
+        Drop and close one client, or all clients if no key is given.
+        The next get() builds a fresh client.
+        """
+        with self._lock:
+            keys = [key] if key is not None else list(self._clients)
+            for k in keys:
+                client = self._clients.pop(k, None)
+                close = getattr(client, 'close', None)
+                if callable(close):
+                    try:
+                        close()
+                    except Exception:
+                        pass
+
+
+# Shared by all AIProvider instances in this process
+client_registry = ClientRegistry()
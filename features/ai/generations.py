@@ -0,0 +1,68 @@
+import re
+import threading
+import uuid
+from typing import Dict, List, Optional, Set
+
+# Client-chosen generation ids are used in URLs; keep them simple
+GENERATION_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+
+class GenerationRegistry:
+    """
+    Tracks in-progress streamed generations so they can be cancelled by id.
+
+    Each generation maps to the AIProvider instances serving it (two in
+    hedge mode). Cancelling closes their upstream SDK streams right away.
+    """
+
+    def __init__(self):
+        self._generations: Dict[str, List] = {}
+        # Generations stopped through cancel(), as opposed to providers
+        # cancelled internally (e.g. the losing stream of a hedge)
+        self._cancelled: Set[str] = set()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def new_id(requested: Optional[str] = None) -> str:
+        """Use the client's id if it is well-formed, otherwise generate one."""
+        if requested and GENERATION_ID_PATTERN.match(requested):
+            return requested
+        return uuid.uuid4().hex
+
+    def register(self, generation_id: str, providers: List) -> None:
+        with self._lock:
+            self._generations[generation_id] = list(providers)
+
+    def unregister(self, generation_id: str) -> None:
+        with self._lock:
+            self._generations.pop(generation_id, None)
+            self._cancelled.discard(generation_id)
+
+    def cancel(self, generation_id: str) -> bool:
+        """
+        Cancel a generation.
+
+        Returns:
+            bool: False if no generation with this id is running
+        """
+        with self._lock:
+            providers = self._generations.get(generation_id)
+            if providers is None:
+                return False
+            self._cancelled.add(generation_id)
+        for provider in providers:
+            provider.cancel()
+        return True
+
+    def was_cancelled(self, generation_id: str) -> bool:
+        """Whether the generation was stopped through cancel()."""
+        with self._lock:
+            return generation_id in self._cancelled
+
+    def active_count(self) -> int:
+        with self._lock:
+            return len(self._generations)
+
+
+# Shared by all streaming requests in this process
+generation_registry = GenerationRegistry()
@@ -0,0 +1,145 @@
+import os
+import queue
+import threading
+import time
+from typing import Dict, Iterator, List, Optional
+
+DEFAULT_HEDGE_DELAY = float(os.getenv('PROMPTER_HEDGE_DELAY', 2.0))
+
+
+class _Contender:
+    """Pulls one provider's stream on a worker thread and forwards it to a shared queue."""
+
+    def __init__(self, provider, messages: List[Dict[str, str]], events: queue.Queue):
+        self.provider = provider
+        self.messages = messages
+        self.events = events
+        self.cancelled = threading.Event()
+        self.started = False
+        self.failed = False
+        self.finished = False
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> None:
+        self.started = True
+        self.thread.start()
+
+    def cancel(self) -> None:
+        """Stop forwarding and close the provider's upstream stream."""
+        if not self.cancelled.is_set():
+            self.cancelled.set()
+            self.provider.cancel()
+
+    def _run(self) -> None:
+        stream = self.provider.stream_response(self.messages)
+        try:
+            for chunk in stream:
+                if self.cancelled.is_set():
+                    return
+                self.events.put((self, "chunk", chunk))
+            if self.cancelled.is_set():
+                return
+            self.events.put((self, "done", None))
+        except Exception as e:
+            self.events.put((self, "error", e))
+        finally:
+            # Runs the provider's cleanup (admission release, upstream close) on this thread
+            stream.close()
+
+
+class HedgedStream:
+    """
+    Streams from a primary provider, hedged by a secondary one.
+
+    The secondary request starts only if the primary has not produced its
+    first chunk within hedge_delay seconds (or fails before it does). The
+    first provider to produce a chunk wins; the other one is cancelled and
+    its output discarded, so the caller sees a single uninterrupted stream.
+    """
+
+    def __init__(self, primary, secondary, messages: List[Dict[str, str]],
+                 hedge_delay: float = DEFAULT_HEDGE_DELAY):
+        """
+        Args:
+            primary: AIProvider tried first
+            secondary: AIProvider started when the primary is slow to respond
+            messages: Messages sent to both providers
+            hedge_delay: Seconds to wait for the primary's first chunk
+        """
+        self.hedge_delay = hedge_delay
+        self._events = queue.Queue()
+        self._primary = _Contender(primary, messages, self._events)
+        self._secondary = _Contender(secondary, messages, self._events)
+        self._winner: Optional[_Contender] = None
+
+    @property
+    def winner(self):
+        """The AIProvider whose output was streamed, or None if neither produced any."""
+        return self._winner.provider if self._winner else None
+
+    @property
+    def hedged(self) -> bool:
+        """Whether the secondary request was started."""
+        return self._secondary.started
+
+    def summary(self) -> Dict[str, object]:
+        """Hedging outcome for the metrics event."""
+        return {
+            "primary": self._primary.provider.provider,
+            "secondary": self._secondary.provider.provider,
+            "hedge_delay": self.hedge_delay,
+            "hedged": self.hedged,
+            "winner": self.winner.provider if self.winner else None,
+        }
+
+    def __iter__(self) -> Iterator[str]:
+        contenders = (self._primary, self._secondary)
+        try:
+            self._primary.start()
+            deadline = time.monotonic() + self.hedge_delay
+
+            # Race until one contender produces a chunk (or finishes)
+            while self._winner is None:
+                timeout = None if self._secondary.started else max(0.0, deadline - time.monotonic())
+                try:
+                    contender, kind, payload = self._events.get(timeout=timeout)
+                except queue.Empty:
+                    self._secondary.start()
+                    continue
+
+                if kind != "chunk":
+                    contender.finished = True
+                if kind == "error":
+                    contender.failed = True
+                    if not self._secondary.started:
+                        # The primary failed before its first chunk: hedge right away
+                        self._secondary.start()
+                    elif all(c.failed for c in contenders):
+                        raise payload
+                    continue
+
+                self._winner = contender
+                for other in contenders:
+                    if other is not contender:
+                        other.cancel()
+                if kind == "done":
+                    return
+                yield payload
+
+            # Forward the rest of the winner's stream
+            while True:
+                contender, kind, payload = self._events.get()
+                if contender is not self._winner:
+                    continue
+                if kind != "chunk":
+                    contender.finished = True
+                if kind == "done":
+                    return
+                if kind == "error":
+                    raise payload
+                yield payload
+        finally:
+            # Stops the loser, or both if the caller stopped reading early
+            for contender in contenders:
+                if contender.started and not contender.finished:
+                    contender.cancel()
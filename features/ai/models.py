@@ -0,0 +1,243 @@
+import json
+import os
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional
+
+from features.ai.stream_metrics import get_metrics_log
+from utils.tokenizers import tokenizer_registry
+
+
+@dataclass(frozen=True)
+class ModelInfo:
+    """
+    Static facts about the model Prompter uses for a provider. The typical_*
+    figures seed the router until real measurements are available.
+    """
+    provider: str
+    model: str
+    description: str
+    context_window: int
+    max_output_tokens: int
+    typical_time_to_first_token: float
+    typical_tokens_per_second: float
+
+
+# The model used for each provider. Context windows and output limits are
+# the providers' published limits for these model versions.
+MODELS: Dict[str, ModelInfo] = {
+    "openai": ModelInfo("openai", "o3-mini", "Latest OpenAI model with reasoning capabilities",
+                        context_window=200000, max_output_tokens=100000,
+                        typical_time_to_first_token=4.0, typical_tokens_per_second=150.0),
+    "anthropic": ModelInfo("anthropic", "claude-3-7-sonnet-20250219", "Claude 3.7 Sonnet model",
+                           context_window=200000, max_output_tokens=8192,
+                           typical_time_to_first_token=1.5, typical_tokens_per_second=60.0),
+    "gemini": ModelInfo("gemini", "gemini-2.5-pro-exp-03-25", "Google's latest Gemini model",
+                        context_window=1048576, max_output_tokens=65536,
+                        typical_time_to_first_token=5.0, typical_tokens_per_second=100.0),
+    # Llama 3's own limit; Ollama may be configured with a smaller num_ctx
+    "ollama": ModelInfo("ollama", "llama3", "Local Llama 3 model via Ollama",
+                        context_window=8192, max_output_tokens=2048,
+                        typical_time_to_first_token=0.5, typical_tokens_per_second=30.0),
+    "deepseek": ModelInfo("deepseek", "deepseek-reasoner", "Deepseek's reasoning-focused model",
+                          context_window=64000, max_output_tokens=8000,
+                          typical_time_to_first_token=8.0, typical_tokens_per_second=25.0),
+    "xai": ModelInfo("xai", "grok-2-latest", "xAI's Grok 2 model",
+                     context_window=131072, max_output_tokens=8192,
+                     typical_time_to_first_token=1.0, typical_tokens_per_second=60.0),
+    "mistral": ModelInfo("mistral", "mistral-large-latest", "Mistral's latest large model",
+                         context_window=131072, max_output_tokens=8192,
+                         typical_time_to_first_token=1.0, typical_tokens_per_second=40.0),
+    "standin": ModelInfo("standin", "standin", "Local stand-in server for offline testing",
+                         context_window=128000, max_output_tokens=4096,
+                         typical_time_to_first_token=0.05, typical_tokens_per_second=1000.0),
+}
+
+# Output tokens kept free in the context window when checking whether a prompt fits
+RESERVED_OUTPUT_TOKENS = 4096
+# Local token counts only approximate most providers' tokenizers
+TOKEN_COUNT_MARGIN = 1.05
+# Answer length assumed when comparing expected response times
+EXPECTED_OUTPUT_TOKENS = 1000
+# Weight of the newest measurement in the moving averages
+EWMA_ALPHA = 0.2
+# Metrics log entries read at startup to seed the measured latency
+HISTORY_ENTRIES = 1000
+
+
+def _ewma(current: Optional[float], value: float) -> float:
+    return value if current is None else current + EWMA_ALPHA * (value - current)
+
+
+@dataclass
+class ModelStats:
+    """Measured latency and throughput of one provider's model (moving averages)."""
+    time_to_first_token: Optional[float] = None
+    tokens_per_second: Optional[float] = None
+    response_time: Optional[float] = None
+    samples: int = 0
+
+
+class ModelRegistry:
+    """
+    Model facts plus measured performance, and the "auto" router built on them.
+
+    Measurements come from stream metrics (time to first chunk, tokens per
+    second) and complete responses (total time). At startup the registry is
+    seeded from the tail of the stream metrics log, so history survives
+    restarts.
+    """
+
+    def __init__(self, models: Dict[str, ModelInfo] = None, history_path: str = None):
+        self.models = models or MODELS
+        self.history_path = history_path
+        self._stats: Dict[str, ModelStats] = {provider: ModelStats() for provider in self.models}
+        self._lock = threading.Lock()
+        self._history_loaded = False
+
+    def get(self, provider: str) -> Optional[ModelInfo]:
+        return self.models.get(provider)
+
+    def _load_history(self) -> None:
+        """Seed the moving averages from the metrics log, once."""
+        if self._history_loaded:
+            return
+        self._history_loaded = True
+        if not self.history_path or not os.path.exists(self.history_path):
+            return
+        try:
+            with open(self.history_path, 'r', encoding='utf-8') as f:
+                lines = deque(f, maxlen=HISTORY_ENTRIES)
+        except OSError as e:
+            print(f"Error reading model latency history: {str(e)}")
+            return
+        for line in lines:
+            try:
+                self._record_stream(json.loads(line))
+            except ValueError:
+                continue
+
+    def _stats_for(self, provider: str) -> Optional[ModelStats]:
+        with self._lock:
+            self._load_history()
+        return self._stats.get(provider)
+
+    def record_stream(self, metrics: Dict[str, Any]) -> None:
+        """Record a finished stream's metrics (the dict from StreamMetrics.finish())."""
+        with self._lock:
+            self._load_history()
+            self._record_stream(metrics)
+
+    def _record_stream(self, metrics: Dict[str, Any]) -> None:
+        # Replayed or cut-short streams say nothing about the model's speed
+        if metrics.get("cache_hit") or metrics.get("cancelled"):
+            return
+        stats = self._stats.get(metrics.get("provider"))
+        if stats is None or not metrics.get("chunk_count"):
+            return
+        if metrics.get("time_to_first_chunk") is not None:
+            stats.time_to_first_token = _ewma(stats.time_to_first_token, metrics["time_to_first_chunk"])
+        if metrics.get("tokens_per_second"):
+            stats.tokens_per_second = _ewma(stats.tokens_per_second, metrics["tokens_per_second"])
+        if metrics.get("time_taken") is not None:
+            stats.response_time = _ewma(stats.response_time, metrics["time_taken"])
+        stats.samples += 1
+
+    def record_response(self, provider: str, time_taken: float) -> None:
+        """Record the total time of a complete (non-streamed) response."""
+        with self._lock:
+            self._load_history()
+            stats = self._stats.get(provider)
+            if stats is not None:
+                stats.response_time = _ewma(stats.response_time, time_taken)
+                stats.samples += 1
+
+    def prompt_budget(self, provider: str) -> int:
+        """Largest prompt, in tokens, that leaves room for the answer in the provider's context window."""
+        info = self.models[provider]
+        reserved = min(info.max_output_tokens, RESERVED_OUTPUT_TOKENS)
+        return int((info.context_window - reserved) / TOKEN_COUNT_MARGIN)
+
+    def fits(self, provider: str, prompt_tokens: int) -> bool:
+        """Whether a prompt of this many tokens fits the provider's context window, with room for the answer."""
+        return prompt_tokens <= self.prompt_budget(provider)
+
+    def expected_time(self, provider: str, output_tokens: int = EXPECTED_OUTPUT_TOKENS) -> float:
+        """Expected seconds to stream an answer: measured figures where available, typical ones otherwise."""
+        info = self.models[provider]
+        stats = self._stats_for(provider)
+        ttft = stats.time_to_first_token if stats.time_to_first_token is not None else info.typical_time_to_first_token
+        tps = stats.tokens_per_second or info.typical_tokens_per_second
+        return ttft + output_tokens / tps
+
+    def route(self, prompt: str, providers: Iterable[str],
+              output_tokens: int = EXPECTED_OUTPUT_TOKENS) -> Dict[str, Any]:
+        """
+        Pick the fastest provider whose model fits the prompt.
+
+        Args:
+            prompt: The assembled prompt
+            providers: Candidate providers (those with API keys set)
+            output_tokens: Expected answer length, used to compare speeds
+
+        Returns:
+            dict: "provider" (None if no model fits) and, per candidate, its
+                  prompt token count, whether it fits and its expected time
+        """
+        candidates = []
+        for provider in providers:
+            if provider not in self.models:
+                continue
+            prompt_tokens = tokenizer_registry.count_for_provider(prompt, provider)
+            candidates.append({
+                "provider": provider,
+                "model": self.models[provider].model,
+                "prompt_tokens": prompt_tokens,
+                "context_window": self.models[provider].context_window,
+                "fits": self.fits(provider, prompt_tokens),
+                "expected_time": self.expected_time(provider, output_tokens),
+            })
+
+        fitting = [candidate for candidate in candidates if candidate["fits"]]
+        best = min(fitting, key=lambda candidate: candidate["expected_time"]) if fitting else None
+        return {
+            "provider": best["provider"] if best else None,
+            "candidates": sorted(candidates, key=lambda candidate: candidate["expected_time"]),
+        }
+
+    def describe(self, providers: Iterable[str] = None) -> Dict[str, Dict[str, Any]]:
+        """Model facts and measured performance, for the models endpoint."""
+        result = {}
+        for provider in providers if providers is not None else self.models:
+            info = self.models[provider]
+            stats = self._stats_for(provider)
+            result[provider] = {
+                "model": info.model,
+                "description": info.description,
+                "context_window": info.context_window,
+                "max_output_tokens": info.max_output_tokens,
+                "time_to_first_token": stats.time_to_first_token,
+                "tokens_per_second": stats.tokens_per_second,
+                "response_time": stats.response_time,
+                "samples": stats.samples,
+            }
+        return result
+
+
+_model_registry: Optional[ModelRegistry] = None
+_model_registry_lock = threading.Lock()
+
+
+def get_model_registry() -> ModelRegistry:
+    """Get the process-wide model registry, seeded from the stream metrics log."""
+    global _model_registry
+    with _model_registry_lock:
+        if _model_registry is None:
+            _model_registry = ModelRegistry(history_path=get_metrics_log().path)
+        return _model_registry
+
+
+def provider_names() -> List[str]:
+    """Names of every supported provider."""
+    return list(MODELS)
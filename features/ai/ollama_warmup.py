@@ -0,0 +1,157 @@
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from features.ai.clients import client_registry, load_sdk
+
+# How long Ollama keeps the model in memory after a request (Ollama duration syntax)
+OLLAMA_KEEP_ALIVE = os.getenv('PROMPTER_OLLAMA_KEEP_ALIVE', '30m')
+# Seconds between scheduled warm-ups; 0 disables the schedule
+OLLAMA_WARM_INTERVAL = float(os.getenv('PROMPTER_OLLAMA_WARM_INTERVAL', 600))
+# A load taking longer than this means the model had to be loaded from disk
+COLD_LOAD_SECONDS = 0.5
+
+
+def ollama_preload_enabled() -> bool:
+    """Whether PROMPTER_OLLAMA_PRELOAD asks for the model to be loaded at startup."""
+    return os.getenv('PROMPTER_OLLAMA_PRELOAD', '').lower() in ('1', 'true', 'yes')
+
+
+def model_load_info(response) -> Dict[str, Any]:
+    """
+    Warm/cold information from an Ollama response (or final stream chunk).
+
+    Returns:
+        dict: load_duration in seconds and model_warm, or empty if the
+              response does not report a load duration
+    """
+    load_duration = getattr(response, 'load_duration', None)
+    if load_duration is None:
+        return {}
+    seconds = load_duration / 1e9
+    return {"load_duration": seconds, "model_warm": seconds < COLD_LOAD_SECONDS}
+
+
+class OllamaWarmer:
+    """
+    Keeps the configured Ollama model loaded.
+
+    warm() sends a prompt-less generate request, which makes Ollama load
+    the model and keep it for keep_alive without generating anything. With
+    the schedule running, the model is re-warmed every interval seconds
+    unless a real request used it more recently.
+    """
+
+    def __init__(self, model: str, keep_alive: str = OLLAMA_KEEP_ALIVE,
+                 interval: float = OLLAMA_WARM_INTERVAL):
+        self.model = model
+        self.keep_alive = keep_alive
+        self.interval = interval
+        self.state = "unknown"  # unknown, warming, warm, error
+        self.last_warmed = None
+        self.last_used = None
+        self.last_load_duration = None
+        self.last_error = None
+        self.warm_count = 0
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _client(self):
+        # Same shared client the sync AIProvider uses for Ollama
+        return client_registry.get("ollama", lambda: load_sdk("ollama").Client())
+
+    def warm(self) -> bool:
+        """
+        Load the model now. Blocks until Ollama has loaded it.
+
+        Returns:
+            bool: True if the model is loaded
+        """
+        with self._lock:
+            if self.state == "warming":
+                return False
+            self.state = "warming"
+
+        try:
+            response = self._client().generate(model=self.model, prompt="", keep_alive=self.keep_alive)
+            info = model_load_info(response)
+            with self._lock:
+                self.state = "warm"
+                self.last_warmed = time.time()
+                self.last_load_duration = info.get("load_duration")
+                self.last_error = None
+                self.warm_count += 1
+            print(f"Ollama model {self.model} warm (load took {self.last_load_duration or 0:.2f}s)")
+            return True
+        except Exception as e:
+            with self._lock:
+                self.state = "error"
+                self.last_error = str(e)
+            print(f"Error warming Ollama model {self.model}: {str(e)}")
+            return False
+
+    def warm_in_background(self) -> threading.Thread:
+        """Warm the model on a daemon thread so the caller is not delayed."""
+        thread = threading.Thread(target=self.warm, daemon=True)
+        thread.start()
+        return thread
+
+    def record_use(self, load_info: Dict[str, Any]) -> None:
+        """Note a real request; it resets Ollama's keep-alive timer like a warm-up does."""
+        with self._lock:
+            self.last_used = time.time()
+            if load_info:
+                self.last_load_duration = load_info["load_duration"]
+            if self.state != "warming":
+                self.state = "warm"
+
+    def start(self) -> None:
+        """Warm the model now and, if an interval is set, keep re-warming it in the background."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="ollama-warmer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    def _run(self) -> None:
+        self.warm()
+        while self.interval > 0 and not self._stopped.wait(self.interval):
+            with self._lock:
+                last_activity = max(filter(None, (self.last_warmed, self.last_used)), default=0)
+            # A real request within the interval already kept the model loaded
+            if time.time() - last_activity >= self.interval:
+                self.warm()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Warm-up state for the status endpoint."""
+        with self._lock:
+            return {
+                "model": self.model,
+                "state": self.state,
+                "keep_alive": self.keep_alive,
+                "interval": self.interval,
+                "scheduled": self._thread is not None and not self._stopped.is_set(),
+                "last_warmed": self.last_warmed,
+                "last_used": self.last_used,
+                "last_load_duration": self.last_load_duration,
+                "warm_count": self.warm_count,
+                "last_error": self.last_error,
+            }
+
+
+_warmer: Optional[OllamaWarmer] = None
+_warmer_lock = threading.Lock()
+
+
+def get_ollama_warmer() -> OllamaWarmer:
+    """Get the process-wide warmer for the configured Ollama model."""
+    global _warmer
+    with _warmer_lock:
+        if _warmer is None:
+            from features.ai.providers import OLLAMA_MODEL
+            _warmer = OllamaWarmer(OLLAMA_MODEL)
+        return _warmer
@@ -1,32 +1,63 @@
+import threading
 import time
-from openai import OpenAI
-from mistralai import Mistral
-import anthropic
-import google.generativeai as genai
-import ollama
-import tiktoken
 from typing import Dict, Any, Literal
 import json
 import os
 import logging
-
-OPENAI_MODEL = "o3-mini"
-ANTHROPIC_MODEL = "claude-3-7-sonnet-20250219"
-GEMINI_MODEL = "gemini-2.5-pro-exp-03-25"
-OLLAMA_MODEL = "llama3"
-DEEPSEEK_MODEL = "deepseek-reasoner"
-XAI_MODEL = "grok-2-latest"
-MISTRAL_MODEL = "mistral-large-latest"
+from features.ai.admission import AdmissionTimeout, get_admission_controller
+from features.ai.clients import client_registry, load_sdk
+from features.ai.models import MODELS, get_model_registry
+from features.ai.ollama_warmup import OLLAMA_KEEP_ALIVE, get_ollama_warmer, model_load_info
+from features.ai.resilience import CircuitOpenError, get_resilience
+from features.ai.response_cache import get_response_cache, response_cache_enabled_by_default
+from utils.telemetry import get_telemetry
+from utils.tokenizers import tokenizer_registry
+
+# Model names come from the model registry (features/ai/models.py)
+OPENAI_MODEL = MODELS["openai"].model
+ANTHROPIC_MODEL = MODELS["anthropic"].model
+GEMINI_MODEL = MODELS["gemini"].model
+OLLAMA_MODEL = MODELS["ollama"].model
+DEEPSEEK_MODEL = MODELS["deepseek"].model
+XAI_MODEL = MODELS["xai"].model
+MISTRAL_MODEL = MODELS["mistral"].model
+STANDIN_MODEL = MODELS["standin"].model
+ANTHROPIC_MAX_OUTPUT_TOKENS = MODELS["anthropic"].max_output_tokens
 
 DEFAULT_REASONING_EFFORT = "medium"  # Options: low, medium, high
 
+# Assembled prompts put the stable file context first and the user's request
+# after this heading; everything before it is sent as a cacheable prefix.
+PROMPT_INSTRUCTIONS_MARKER = "### User Instructions:"
+# Anthropic ignores cache breakpoints on prefixes shorter than 1024 tokens
+ANTHROPIC_MIN_CACHEABLE_CHARS = 4096
+
+PROVIDER_MODELS = {provider: info.model for provider, info in MODELS.items()}
+
+# Local OpenAI-compatible stand-in (benchmarks/standin_server.py) for offline
+# testing; the "standin" provider is available only when this is set
+STANDIN_URL_ENV = "PROMPTER_STANDIN_URL"
+
 
 class AIProvider:
-    def __init__(self, provider: Literal["openai", "anthropic", "gemini", "ollama", "deepseek", "xai", "mistral"]):
+    def __init__(self, provider: Literal["openai", "anthropic", "gemini", "ollama", "deepseek", "xai", "mistral", "standin"]):
         self.provider = provider
         self.system_prompt = None
         self.reasoning_effort = DEFAULT_REASONING_EFFORT
         self.logger = logging.getLogger(f"ai_provider.{provider}")
+        self.response_cache = get_response_cache() if response_cache_enabled_by_default() else None
+        self.last_cache_hit = False
+        # Token usage reported by the provider for the last stream, if any
+        self.last_usage = None
+        # Count tokens through the provider's API where it offers that (Gemini)
+        # instead of the local approximation; costs a round trip per count
+        self.exact_token_counts = os.getenv('PROMPTER_EXACT_TOKEN_COUNTS', '').lower() in ('1', 'true', 'yes')
+        # Sent with every Ollama request so the model stays loaded between prompts
+        self.ollama_keep_alive = OLLAMA_KEEP_ALIVE
+        # Set by cancel(); the SDK stream currently being read, so it can be closed from another thread
+        self._cancelled = threading.Event()
+        self._upstream = None
+        self._upstream_lock = threading.Lock()
 
         # Validate that the provider has necessary API keys (except for ollama)
         if not self._check_api_key_available():
@@ -57,6 +88,8 @@ class AIProvider:
             return os.getenv("DEEPSEEK_API_KEY") is not None
         elif self.provider == "xai":
             return os.getenv("XAI_API_KEY") is not None
+        elif self.provider == "standin":
+            return os.getenv(STANDIN_URL_ENV) is not None
 
         # Default to False for unknown providers
         return False
@@ -69,29 +102,102 @@ class AIProvider:
             self.reasoning_effort = effort
             self.logger.info(f"Set reasoning effort to: {effort}")
 
+    def enable_response_cache(self, enabled: bool = True):
+        """
+        Turn the disk-backed response cache on or off for this provider.
+        Identical requests (same provider, model, reasoning effort and messages)
+        are then answered from the cache instead of calling the API.
+        """
+        self.response_cache = get_response_cache() if enabled else None
+
+    def _cache_key(self, messages: list[Dict[str, str]], stream: bool = False) -> str:
+        return self.response_cache.make_key(
+            self.provider, PROVIDER_MODELS.get(self.provider), self.reasoning_effort, messages, stream)
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self) -> None:
+        """
+        Stop the current stream. Safe to call from any thread: the upstream
+        SDK stream is closed immediately, so the provider stops generating
+        (and billing) instead of running to completion.
+        """
+        self._cancelled.set()
+        with self._upstream_lock:
+            upstream, self._upstream = self._upstream, None
+        self._close_upstream(upstream)
+
+    def _set_upstream(self, upstream) -> None:
+        """Remember the SDK stream being read; close it at once if already cancelled."""
+        with self._upstream_lock:
+            self._upstream = None if self._cancelled.is_set() else upstream
+        if self._cancelled.is_set():
+            self._close_upstream(upstream)
+
+    @staticmethod
+    def _close_upstream(upstream) -> None:
+        if upstream is None:
+            return
+        # OpenAI/Anthropic streams have close(); others expose the HTTP response
+        close = getattr(upstream, 'close', None) or getattr(getattr(upstream, 'response', None), 'close', None)
+        if callable(close):
+            try:
+                close()
+            except Exception:
+                pass
+
+    @staticmethod
+    def _estimate_tokens(messages: list[Dict[str, str]]) -> int:
+        """Rough prompt size used to reserve the provider's tokens-per-minute budget."""
+        return sum(len(str(msg.get("content", ""))) for msg in messages) // 4
+
+    @staticmethod
+    def _usage_tokens(usage: Dict[str, Any]) -> int | None:
+        """Total tokens from a usage dict, or None if the provider reported none."""
+        if not usage or usage.get("output_tokens") is None:
+            return None
+        return (usage.get("input_tokens") or 0) + usage["output_tokens"] + \
+            (usage.get("cache_creation_input_tokens") or 0) + (usage.get("cache_read_input_tokens") or 0)
+
     def _get_client(self):
-        """Get a fresh client connection for the current provider."""
+        """Get the shared, long-lived client for the current provider."""
+        return client_registry.get(self.provider, self._create_client)
+
+    def _create_client(self):
+        """Create a new client for the current provider. Called once per process by the client registry."""
         try:
+            sdk = load_sdk(self.provider)
+            # SDK-level retries are disabled; get_resilience() retries every provider the same way
             if self.provider == "openai":
-                return OpenAI()
+                return sdk.OpenAI(max_retries=0)
             elif self.provider == "anthropic":
-                return anthropic.Anthropic()
+                return sdk.Anthropic(max_retries=0)
             elif self.provider == "gemini":
-                genai.configure()
-                return genai.GenerativeModel(model_name=GEMINI_MODEL)
+                sdk.configure()
+                return sdk.GenerativeModel(model_name=GEMINI_MODEL)
             elif self.provider == "ollama":
-                return None  # Ollama doesn't need a persistent client
+                return sdk.Client()
             elif self.provider == "mistral":
-                return Mistral(api_key=os.getenv("MISTRAL_API_KEY"))
+                return sdk.Mistral(api_key=os.getenv("MISTRAL_API_KEY"))
             elif self.provider == "deepseek":
-                return OpenAI(
+                return sdk.OpenAI(
                     api_key=os.getenv("DEEPSEEK_API_KEY"),
-                    base_url="https://api.deepseek.com"
+                    base_url="https://api.deepseek.com",
+                    max_retries=0
                 )
             elif self.provider == "xai":
-                return OpenAI(
+                return sdk.OpenAI(
                     api_key=os.getenv("XAI_API_KEY"),
-                    base_url="https://api.x.ai/v1"
+                    base_url="https://api.x.ai/v1",
+                    max_retries=0
+                )
+            elif self.provider == "standin":
+                return sdk.OpenAI(
+                    api_key="standin",
+                    base_url=os.getenv(STANDIN_URL_ENV),
+                    max_retries=0
                 )
         except Exception as e:
             raise ValueError(
@@ -101,193 +207,277 @@ class AIProvider:
     # [All other methods in the original file would remain here]
     def _handle_openai_response(self, messages: list[Dict[str, str]]) -> Dict[str, Any]:
         try:
-            with self._get_client() as client:
-                # Check if we're using an o-series model which supports reasoning effort
-                extra_params = {}
-                if OPENAI_MODEL.startswith('o') and any(char.isdigit() for char in OPENAI_MODEL):
-                    extra_params["reasoning_effort"] = self.reasoning_effort
-                    self.logger.info(
-                        f"Using reasoning effort: {self.reasoning_effort} for model {OPENAI_MODEL}")
-
-                completion = client.chat.completions.create(
-                    model=OPENAI_MODEL,
-                    messages=messages,
-                    **extra_params
-                )
+            client = self._get_client()
+            # Check if we're using an o-series model which supports reasoning effort
+            extra_params = {}
+            if OPENAI_MODEL.startswith('o') and any(char.isdigit() for char in OPENAI_MODEL):
+                extra_params["reasoning_effort"] = self.reasoning_effort
+                self.logger.info(
+                    f"Using reasoning effort: {self.reasoning_effort} for model {OPENAI_MODEL}")
+
+            completion = client.chat.completions.create(
+                model=OPENAI_MODEL,
+                messages=messages,
+                **extra_params
+            )
 
-                if not completion or not hasattr(completion, 'choices'):
-                    raise ValueError(f"Invalid OpenAI response structure")
+            if not completion or not hasattr(completion, 'choices'):
+                raise ValueError(f"Invalid OpenAI response structure")
 
-                if not completion.choices:
-                    raise ValueError("No choices in OpenAI response")
+            if not completion.choices:
+                raise ValueError("No choices in OpenAI response")
 
-                text = completion.choices[0].message.content
-                if not text:
-                    raise ValueError("Empty content in OpenAI response")
+            text = completion.choices[0].message.content
+            if not text:
+                raise ValueError("Empty content in OpenAI response")
 
-                return {
-                    "text": text,
-                    "input_tokens": completion.usage.prompt_tokens,
-                    "output_tokens": completion.usage.completion_tokens
-                }
+            return {
+                "text": text,
+                "input_tokens": completion.usage.prompt_tokens,
+                "output_tokens": completion.usage.completion_tokens
+            }
         except Exception as e:
             raise ValueError(f"OpenAI API error: {str(e)}")
 
     def _handle_openai_stream(self, messages: list[Dict[str, str]]):
         try:
-            with self._get_client() as client:
-                # Check if we're using an o-series model which supports reasoning effort
-                extra_params = {}
-                if OPENAI_MODEL.startswith('o') and any(char.isdigit() for char in OPENAI_MODEL):
-                    extra_params["reasoning_effort"] = self.reasoning_effort
-                    self.logger.info(
-                        f"Using reasoning effort: {self.reasoning_effort} for model {OPENAI_MODEL}")
-
-                response = client.chat.completions.create(
-                    model=OPENAI_MODEL,
-                    messages=messages,
-                    stream=True,
-                    **extra_params
-                )
+            client = self._get_client()
+            # Check if we're using an o-series model which supports reasoning effort
+            extra_params = {}
+            if OPENAI_MODEL.startswith('o') and any(char.isdigit() for char in OPENAI_MODEL):
+                extra_params["reasoning_effort"] = self.reasoning_effort
+                self.logger.info(
+                    f"Using reasoning effort: {self.reasoning_effort} for model {OPENAI_MODEL}")
+
+            response = client.chat.completions.create(
+                model=OPENAI_MODEL,
+                messages=messages,
+                stream=True,
+                stream_options={"include_usage": True},
+                **extra_params
+            )
 
-                if not response:
-                    self.logger.error(
-                        f"Raw OpenAI stream response: {response}")
-                    raise ValueError("Empty stream from OpenAI")
+            if not response:
+                self.logger.error(
+                    f"Raw OpenAI stream response: {response}")
+                raise ValueError("Empty stream from OpenAI")
+            self._set_upstream(response)
 
-                for chunk in response:
-                    if chunk.choices[0].delta.content is not None:
-                        yield chunk.choices[0].delta.content
+            for chunk in response:
+                self._record_openai_usage(chunk)
+                if chunk.choices and chunk.choices[0].delta.content is not None:
+                    yield chunk.choices[0].delta.content
 
         except Exception as e:
             raise ValueError(f"OpenAI streaming error: {str(e)}")
 
     def _handle_mistral_response(self, messages: list[Dict[str, str]]) -> Dict[str, Any]:
         try:
-            with self._get_client() as client:
-                completion = client.chat.complete(
-                    model=MISTRAL_MODEL,
-                    messages=messages
-                )
+            client = self._get_client()
+            completion = client.chat.complete(
+                model=MISTRAL_MODEL,
+                messages=messages
+            )
+
+            if not completion or not hasattr(completion, 'choices'):
+                self.logger.error(f"Raw Mistral response: {completion}")
+                raise ValueError("Invalid Mistral response structure")
+
+            if not completion.choices:
+                self.logger.error(f"Raw Mistral response: {completion}")
+                raise ValueError("No choices in Mistral response")
+
+            text = completion.choices[0].message.content
+            if not text:
+                self.logger.error(f"Raw Mistral response: {completion}")
+                raise ValueError("Empty content in Mistral response")
 
-                if not completion or not hasattr(completion, 'choices'):
-                    self.logger.error(f"Raw Mistral response: {completion}")
-                    raise ValueError("Invalid Mistral response structure")
-
-                if not completion.choices:
-                    self.logger.error(f"Raw Mistral response: {completion}")
-                    raise ValueError("No choices in Mistral response")
-
-                text = completion.choices[0].message.content
-                if not text:
-                    self.logger.error(f"Raw Mistral response: {completion}")
-                    raise ValueError("Empty content in Mistral response")
-
-                # Mistral uses prompt_tokens and completion_tokens in usage
-                return {
-                    "text": text,
-                    "input_tokens": completion.usage.prompt_tokens,
-                    "output_tokens": completion.usage.completion_tokens
-                }
+            # Mistral uses prompt_tokens and completion_tokens in usage
+            return {
+                "text": text,
+                "input_tokens": completion.usage.prompt_tokens,
+                "output_tokens": completion.usage.completion_tokens
+            }
         except Exception as e:
             raise ValueError(f"Mistral API error: {str(e)}")
 
     def _handle_mistral_stream(self, messages: list[Dict[str, str]]):
         try:
-            with self._get_client() as client:
-                stream = client.chat.stream(
-                    model=MISTRAL_MODEL,
-                    messages=messages
-                )
+            client = self._get_client()
+            stream = client.chat.stream(
+                model=MISTRAL_MODEL,
+                messages=messages
+            )
 
-                if not stream:
-                    self.logger.error(
-                        f"Raw Mistral stream response: {stream}")
-                    raise ValueError("Empty stream from Mistral")
+            if not stream:
+                self.logger.error(
+                    f"Raw Mistral stream response: {stream}")
+                raise ValueError("Empty stream from Mistral")
+            self._set_upstream(stream)
 
-                for chunk in stream:
-                    if chunk.data.choices[0].delta.content is not None:
-                        yield chunk.data.choices[0].delta.content
+            for chunk in stream:
+                usage = getattr(chunk.data, 'usage', None)
+                if usage:
+                    self.last_usage = {
+                        "input_tokens": usage.prompt_tokens,
+                        "output_tokens": usage.completion_tokens
+                    }
+                if chunk.data.choices and chunk.data.choices[0].delta.content is not None:
+                    yield chunk.data.choices[0].delta.content
 
         except Exception as e:
             raise ValueError(f"Mistral streaming error: {str(e)}")
 
     def _handle_xai_response(self, messages: list[Dict[str, str]]) -> Dict[str, Any]:
         try:
-            with self._get_client() as client:
-                completion = client.chat.completions.create(
-                    model=XAI_MODEL,
-                    messages=messages
-                )
+            client = self._get_client()
+            completion = client.chat.completions.create(
+                model=XAI_MODEL,
+                messages=messages
+            )
 
-                if not completion or not hasattr(completion, 'choices'):
-                    self.logger.error(f"Raw XAI response: {completion}")
-                    raise ValueError("Invalid XAI response structure")
+            if not completion or not hasattr(completion, 'choices'):
+                self.logger.error(f"Raw XAI response: {completion}")
+                raise ValueError("Invalid XAI response structure")
 
-                if not completion.choices:
-                    self.logger.error(f"Raw XAI response: {completion}")
-                    raise ValueError("No choices in XAI response")
+            if not completion.choices:
+                self.logger.error(f"Raw XAI response: {completion}")
+                raise ValueError("No choices in XAI response")
 
-                text = completion.choices[0].message.content
-                if not text:
-                    self.logger.error(f"Raw XAI response: {completion}")
-                    raise ValueError("Empty content in XAI response")
+            text = completion.choices[0].message.content
+            if not text:
+                self.logger.error(f"Raw XAI response: {completion}")
+                raise ValueError("Empty content in XAI response")
 
-                return {
-                    "text": text,
-                    "input_tokens": completion.usage.prompt_tokens,
-                    "output_tokens": completion.usage.completion_tokens
-                }
+            return {
+                "text": text,
+                "input_tokens": completion.usage.prompt_tokens,
+                "output_tokens": completion.usage.completion_tokens
+            }
         except Exception as e:
             raise ValueError(f"XAI API error: {str(e)}")
 
     def _handle_xai_stream(self, messages: list[Dict[str, str]]):
         try:
-            with self._get_client() as client:
-                response = client.chat.completions.create(
-                    model=XAI_MODEL,
-                    messages=messages,
-                    stream=True
-                )
+            client = self._get_client()
+            response = client.chat.completions.create(
+                model=XAI_MODEL,
+                messages=messages,
+                stream=True,
+                stream_options={"include_usage": True}
+            )
 
-                if not response:
-                    self.logger.error(f"Raw XAI stream response: {response}")
-                    raise ValueError("Empty stream from XAI")
+            if not response:
+                self.logger.error(f"Raw XAI stream response: {response}")
+                raise ValueError("Empty stream from XAI")
+            self._set_upstream(response)
 
-                for chunk in response:
-                    if chunk.choices[0].delta.content is not None:
-                        yield chunk.choices[0].delta.content
+            for chunk in response:
+                self._record_openai_usage(chunk)
+                if chunk.choices and chunk.choices[0].delta.content is not None:
+                    yield chunk.choices[0].delta.content
 
         except Exception as e:
             raise ValueError(f"XAI streaming error: {str(e)}")
 
+    def _anthropic_cached_messages(self, messages: list[Dict[str, str]]) -> list[Dict[str, Any]]:
+        """Mark the stable prefix of the last user message for Anthropic prompt caching.
+
+        The prefix (file contents and directory structure) is everything before
+        PROMPT_INSTRUCTIONS_MARKER, or the whole message if there is no marker.
+        Follow-up requests on the same context then read the prefix from the
+        cache instead of processing it again.
+
+        Args:
+            messages: Messages without system prompt
+
+        Returns:
+            Messages with the prefix in a content block carrying cache_control
+        """
+        if not messages or messages[-1]["role"] != "user" or not isinstance(messages[-1]["content"], str):
+            return messages
+
+        content = messages[-1]["content"]
+        split_at = content.rfind(PROMPT_INSTRUCTIONS_MARKER)
+        if split_at < 0:
+            split_at = len(content)
+        prefix, suffix = content[:split_at], content[split_at:]
+        if len(prefix) < ANTHROPIC_MIN_CACHEABLE_CHARS:
+            return messages
+
+        blocks = [{"type": "text", "text": prefix, "cache_control": {"type": "ephemeral"}}]
+        if suffix:
+            blocks.append({"type": "text", "text": suffix})
+        return messages[:-1] + [{"role": "user", "content": blocks}]
+
+    @staticmethod
+    def _anthropic_usage(usage) -> Dict[str, int]:
+        """Token usage including prompt cache writes and reads."""
+        return {
+            "input_tokens": usage.input_tokens,
+            "output_tokens": usage.output_tokens,
+            "cache_creation_input_tokens": getattr(usage, "cache_creation_input_tokens", None) or 0,
+            "cache_read_input_tokens": getattr(usage, "cache_read_input_tokens", None) or 0
+        }
+
+    def _handle_standin_response(self, messages: list[Dict[str, str]]) -> Dict[str, Any]:
+        try:
+            completion = self._get_client().chat.completions.create(
+                model=STANDIN_MODEL,
+                messages=messages
+            )
+            return {
+                "text": completion.choices[0].message.content,
+                "input_tokens": completion.usage.prompt_tokens,
+                "output_tokens": completion.usage.completion_tokens
+            }
+        except Exception as e:
+            raise ValueError(f"Stand-in API error: {str(e)}")
+
+    def _handle_standin_stream(self, messages: list[Dict[str, str]]):
+        try:
+            response = self._get_client().chat.completions.create(
+                model=STANDIN_MODEL,
+                messages=messages,
+                stream=True,
+                stream_options={"include_usage": True}
+            )
+            self._set_upstream(response)
+
+            for chunk in response:
+                self._record_openai_usage(chunk)
+                if chunk.choices and chunk.choices[0].delta.content is not None:
+                    yield chunk.choices[0].delta.content
+
+        except Exception as e:
+            raise ValueError(f"Stand-in streaming error: {str(e)}")
+
     def _handle_anthropic_response(self, messages: list[Dict[str, str]], system_prompt: str) -> Dict[str, Any]:
         try:
-            with self._get_client() as client:
-                message = client.messages.create(
-                    model=ANTHROPIC_MODEL,
-                    max_tokens=8192,
-                    messages=messages,
-                    system=system_prompt if system_prompt else "You are a helpful assistant."
-                )
+            client = self._get_client()
+            message = client.messages.create(
+                model=ANTHROPIC_MODEL,
+                max_tokens=ANTHROPIC_MAX_OUTPUT_TOKENS,
+                messages=self._anthropic_cached_messages(messages),
+                system=system_prompt if system_prompt else "You are a helpful assistant."
+            )
 
-                if not message or not hasattr(message, 'content'):
-                    self.logger.error(f"Raw Anthropic response: {message}")
-                    raise ValueError("Invalid Anthropic response structure")
+            if not message or not hasattr(message, 'content'):
+                self.logger.error(f"Raw Anthropic response: {message}")
+                raise ValueError("Invalid Anthropic response structure")
 
-                response_parts = [
-                    part.text for part in message.content if hasattr(part, 'text')]
-                if not response_parts:
-                    self.logger.error(f"Raw Anthropic response: {message}")
-                    raise ValueError("No text content in Anthropic response")
+            response_parts = [
+                part.text for part in message.content if hasattr(part, 'text')]
+            if not response_parts:
+                self.logger.error(f"Raw Anthropic response: {message}")
+                raise ValueError("No text content in Anthropic response")
 
-                text = "\n".join(response_parts)
+            text = "\n".join(response_parts)
 
-                return {
-                    "text": text,
-                    "input_tokens": message.usage.input_tokens,
-                    "output_tokens": message.usage.output_tokens
-                }
+            return {
+                "text": text,
+                **self._anthropic_usage(message.usage)
+            }
         except Exception as e:
             raise ValueError(f"Anthropic API error: {str(e)}")
 
@@ -295,19 +485,21 @@ class AIProvider:
         try:
             client = self._get_client()
             with client.messages.stream(
-                max_tokens=8192,
-                messages=messages,
+                max_tokens=ANTHROPIC_MAX_OUTPUT_TOKENS,
+                messages=self._anthropic_cached_messages(messages),
                 model=ANTHROPIC_MODEL,
                 system=system_prompt if system_prompt else "You are a helpful assistant."
             ) as stream:
                 if not stream:
                     self.logger.error(f"Raw Anthropic stream: {stream}")
                     raise ValueError("Empty stream from Anthropic")
+                self._set_upstream(stream)
 
                 for text in stream.text_stream:
                     if text:
                         yield text
-            client.close()  # Explicitly close the client after streaming
+
+                self.last_usage = self._anthropic_usage(stream.get_final_message().usage)
 
         except Exception as e:
             raise ValueError(f"Anthropic streaming error: {str(e)}")
@@ -316,7 +508,7 @@ class AIProvider:
         try:
             client = self._get_client()
             if system_prompt:
-                client = genai.GenerativeModel(
+                client = load_sdk("gemini").GenerativeModel(
                     model_name=GEMINI_MODEL,
                     system_instruction=system_prompt
                 )
@@ -354,7 +546,7 @@ class AIProvider:
         try:
             client = self._get_client()
             if system_prompt:
-                client = genai.GenerativeModel(
+                client = load_sdk("gemini").GenerativeModel(
                     model_name=GEMINI_MODEL,
                     system_instruction=system_prompt
                 )
@@ -366,8 +558,15 @@ class AIProvider:
             response = chat.send_message(last_message, stream=True)
             if not response:
                 raise ValueError("Empty stream from Gemini")
+            self._set_upstream(response)
 
             for chunk in response:
+                usage = getattr(chunk, 'usage_metadata', None)
+                if usage and usage.candidates_token_count:
+                    self.last_usage = {
+                        "input_tokens": usage.prompt_token_count,
+                        "output_tokens": usage.candidates_token_count
+                    }
                 if chunk and hasattr(chunk, 'text') and chunk.text:
                     yield chunk.text
 
@@ -381,9 +580,10 @@ class AIProvider:
 
     def _handle_ollama_response(self, messages: list[Dict[str, str]]) -> Dict[str, Any]:
         try:
-            response = ollama.chat(
+            response = self._get_client().chat(
                 model=OLLAMA_MODEL,
-                messages=messages
+                messages=messages,
+                keep_alive=self.ollama_keep_alive
             )
 
             if not response or not hasattr(response, 'message'):
@@ -396,10 +596,15 @@ class AIProvider:
             total_input = "\n".join([msg["content"] for msg in messages])
             input_tokens, output_tokens = self._count_tokens(total_input, text)
 
+            # Whether the model was already loaded (warm) or had to be loaded (cold)
+            load_info = model_load_info(response)
+            get_ollama_warmer().record_use(load_info)
+
             return {
                 "text": text,
                 "input_tokens": input_tokens,
-                "output_tokens": output_tokens
+                "output_tokens": output_tokens,
+                **load_info
             }
         except Exception as e:
             raise ValueError(f"Ollama API error: {str(e)}")
@@ -414,16 +619,28 @@ class AIProvider:
             Text chunks from the streaming response
         """
         try:
-            stream = ollama.chat(
+            stream = self._get_client().chat(
                 model=OLLAMA_MODEL,
                 messages=messages,
-                stream=True
+                stream=True,
+                keep_alive=self.ollama_keep_alive
             )
 
             if not stream:
                 raise ValueError("Empty stream from Ollama")
+            self._set_upstream(stream)
 
             for chunk in stream:
+                if chunk and chunk.done:
+                    # The final chunk reports usage and how long loading the model took
+                    load_info = model_load_info(chunk)
+                    get_ollama_warmer().record_use(load_info)
+                    if chunk.eval_count:
+                        self.last_usage = {
+                            "input_tokens": chunk.prompt_eval_count,
+                            "output_tokens": chunk.eval_count,
+                            **load_info
+                        }
                 if chunk and chunk.message and chunk.message.content:
                     yield chunk.message.content
 
@@ -431,104 +648,91 @@ class AIProvider:
             raise ValueError(f"Ollama streaming error: {str(e)}")
 
     def _handle_deepseek_response(self, messages: list[Dict[str, str]]) -> Dict[str, Any]:
-        max_retries = 1
-        retry_count = 0
-        last_error = None
+        try:
+            client = self._get_client()
+            completion = client.chat.completions.create(
+                model=DEEPSEEK_MODEL,
+                messages=messages
+            )
 
-        while retry_count <= max_retries:
-            try:
-                with self._get_client() as client:
-                    completion = client.chat.completions.create(
-                        model=DEEPSEEK_MODEL,
-                        messages=messages
-                    )
-
-                    if not completion or not hasattr(completion, 'choices'):
-                        raise ValueError("Invalid Deepseek response structure")
-
-                    if not completion.choices:
-                        raise ValueError("No choices in Deepseek response")
-
-                    text = completion.choices[0].message.content
-                    if not text:
-                        raise ValueError("Empty content in Deepseek response")
-
-                    return {
-                        "text": text,
-                        "input_tokens": completion.usage.prompt_tokens,
-                        "output_tokens": completion.usage.completion_tokens
-                    }
-            except Exception as e:
-                last_error = e
-                retry_count += 1
-                if retry_count <= max_retries:
-                    time.sleep(2)  # Add a short delay before retrying
-                else:
-                    raise ValueError(
-                        f"Deepseek API error after {max_retries} retries: {str(e)}"
-                    ) from last_error
+            if not completion or not hasattr(completion, 'choices'):
+                raise ValueError("Invalid Deepseek response structure")
 
-    def _handle_deepseek_stream(self, messages: list[Dict[str, str]]):
-        max_retries = 1
-        retry_count = 0
-        last_error = None
+            if not completion.choices:
+                raise ValueError("No choices in Deepseek response")
 
-        while retry_count <= max_retries:
-            try:
-                with self._get_client() as client:
-                    response = client.chat.completions.create(
-                        model=DEEPSEEK_MODEL,
-                        messages=messages,
-                        stream=True
-                    )
+            text = completion.choices[0].message.content
+            if not text:
+                raise ValueError("Empty content in Deepseek response")
 
-                    if not response:
-                        raise ValueError("Empty response stream from Deepseek")
+            return {
+                "text": text,
+                "input_tokens": completion.usage.prompt_tokens,
+                "output_tokens": completion.usage.completion_tokens
+            }
+        except Exception as e:
+            raise ValueError(f"Deepseek API error: {str(e)}")
 
-                    for chunk in response:
-                        if not chunk or not hasattr(chunk, 'choices') or not chunk.choices:
-                            continue
+    def _handle_deepseek_stream(self, messages: list[Dict[str, str]]):
+        try:
+            client = self._get_client()
+            response = client.chat.completions.create(
+                model=DEEPSEEK_MODEL,
+                messages=messages,
+                stream=True,
+                stream_options={"include_usage": True}
+            )
 
-                        choice = chunk.choices[0]
-                        if not hasattr(choice, 'delta') or not hasattr(choice.delta, 'content'):
-                            continue
+            if not response:
+                raise ValueError("Empty response stream from Deepseek")
+            self._set_upstream(response)
 
-                        content = choice.delta.content
-                        if not content:
-                            continue
+            for chunk in response:
+                self._record_openai_usage(chunk)
+                if not chunk or not hasattr(chunk, 'choices') or not chunk.choices:
+                    continue
 
-                        yield content
+                choice = chunk.choices[0]
+                if not hasattr(choice, 'delta') or not hasattr(choice.delta, 'content'):
+                    continue
 
-                    # If we get here successfully, break out of the retry loop
-                    break
+                content = choice.delta.content
+                if not content:
+                    continue
 
-            except Exception as e:
-                last_error = e
-                retry_count += 1
-                if retry_count <= max_retries:
-                    time.sleep(2)  # Add a short delay before retrying
-                else:
-                    raise ValueError(
-                        f"Deepseek streaming error after {max_retries} retries: {str(e)}"
-                    ) from last_error
+                yield content
+
+        except Exception as e:
+            raise ValueError(f"Deepseek streaming error: {str(e)}")
+
+    def _record_openai_usage(self, chunk) -> None:
+        """Keep the usage block sent with the last chunk of OpenAI-compatible streams."""
+        usage = getattr(chunk, 'usage', None)
+        if usage:
+            self.last_usage = {
+                "input_tokens": usage.prompt_tokens,
+                "output_tokens": usage.completion_tokens
+            }
 
     def _count_tokens(self, input_text: str, output_text: str = "") -> tuple[int, int]:
-        """Count tokens for input and output text."""
-        try:
-            if self.provider == "gemini":
+        """Count tokens for input and output text.
+
+        Uses the shared tokenizer registry's offline approximation for this
+        provider. With exact_token_counts set, Gemini counts are fetched from
+        its API instead, falling back to the local count if that fails.
+        """
+        if self.exact_token_counts and self.provider == "gemini":
+            try:
                 client = self._get_client()
                 input_count = client.count_tokens(input_text).total_tokens
                 output_count = client.count_tokens(
                     output_text).total_tokens if output_text else 0
-                del client
-            else:
-                encoding = tiktoken.encoding_for_model("gpt-4")
-                input_count = len(encoding.encode(input_text))
-                output_count = len(encoding.encode(
-                    output_text)) if output_text else 0
-            return input_count, output_count
-        except Exception as e:
-            return 0, 0
+                return input_count, output_count
+            except Exception as e:
+                self.logger.warning(f"Remote token count failed, using local count: {str(e)}")
+
+        return (tokenizer_registry.count_for_provider(input_text, self.provider),
+                tokenizer_registry.count_for_provider(output_text, self.provider))
 
     def _prepare_messages(self, messages: list[Dict[str, str]]) -> tuple[list[Dict[str, str]], str | None]:
         """Prepare messages based on provider format and extract system prompt."""
@@ -569,59 +773,160 @@ class AIProvider:
             response = self.get_response(
                 [{"role": "user", "content": message}])
             return response
+        except (AdmissionTimeout, CircuitOpenError):
+            raise
         except Exception as e:
             raise ValueError(
                 f"Error prompting {self.provider}: {str(e)}"
             )
 
     def get_response(self, messages: list[Dict[str, str]]) -> Dict[str, Any]:
+        """Get a complete response, recording its duration, tokens and size in the telemetry store."""
+        with get_telemetry().timed("ai.response", provider=self.provider) as event:
+            response_data = self._get_response(messages)
+            event.update(input_tokens=response_data.get("input_tokens"),
+                         output_tokens=response_data.get("output_tokens"),
+                         size=len(response_data["text"].encode('utf-8')),
+                         cache_hit=self.last_cache_hit)
+            return response_data
+
+    def _get_response(self, messages: list[Dict[str, str]]) -> Dict[str, Any]:
         start_time = time.time()
+        self.last_cache_hit = False
+
+        cache_key = self._cache_key(messages) if self.response_cache else None
+        if cache_key:
+            cached = self.response_cache.get_response(cache_key)
+            if cached:
+                self.last_cache_hit = True
+                cached["cache_hit"] = True
+                cached["time_taken"] = time.time() - start_time
+                return cached
 
         try:
             for idx, msg in enumerate(messages):
                 content_lines = msg['content'].split('\n')
 
+            # Waits for a free slot and token budget, then retries transient
+            # failures with backoff and fails fast while the provider is down
+            admission = get_admission_controller(self.provider)
+            ticket = admission.acquire(self._estimate_tokens(messages))
             response_data = None
-            if self.provider == "openai":
-                response_data = self._handle_openai_response(messages)
-            elif self.provider == "anthropic":
-                filtered_messages, system_prompt = self._prepare_messages(
-                    messages)
-                response_data = self._handle_anthropic_response(
-                    filtered_messages, system_prompt)
-            elif self.provider == "gemini":
-                messages_list, system_prompt = self._prepare_messages(
-                    messages[:-1])
-                last_message = messages[-1]["content"] if messages else ""
-                response_data = self._handle_gemini_response(
-                    messages_list, system_prompt, last_message)
-            elif self.provider == "ollama":
-                response_data = self._handle_ollama_response(messages)
-            elif self.provider == "mistral":
-                response_data = self._handle_mistral_response(messages)
-            elif self.provider == "xai":
-                response_data = self._handle_xai_response(messages)
-            elif self.provider == "deepseek":
-                response_data = self._handle_deepseek_response(messages)
+            try:
+                response_data = get_resilience(self.provider).call(
+                    lambda: self._request_from_provider(messages))
+            finally:
+                admission.release(ticket, self._usage_tokens(response_data))
 
             if not response_data:
                 raise ValueError(
                     f"No response data received from {self.provider}")
 
             response_data["time_taken"] = time.time() - start_time
+            get_model_registry().record_response(self.provider, response_data["time_taken"])
+
+            if cache_key:
+                self.response_cache.put_response(cache_key, response_data)
 
             response_lines = response_data['text'].split('\n')
 
             return response_data
 
+        except (AdmissionTimeout, CircuitOpenError):
+            raise
         except Exception as e:
             raise ValueError(
                 f"Error getting response from {self.provider}: {str(e)}"
             ) from e
 
+    def _request_from_provider(self, messages: list[Dict[str, str]]) -> Dict[str, Any]:
+        """Dispatch a complete request to the provider-specific handler."""
+        response_data = None
+        if self.provider == "openai":
+            response_data = self._handle_openai_response(messages)
+        elif self.provider == "anthropic":
+            filtered_messages, system_prompt = self._prepare_messages(
+                messages)
+            response_data = self._handle_anthropic_response(
+                filtered_messages, system_prompt)
+        elif self.provider == "gemini":
+            messages_list, system_prompt = self._prepare_messages(
+                messages[:-1])
+            last_message = messages[-1]["content"] if messages else ""
+            response_data = self._handle_gemini_response(
+                messages_list, system_prompt, last_message)
+        elif self.provider == "ollama":
+            response_data = self._handle_ollama_response(messages)
+        elif self.provider == "mistral":
+            response_data = self._handle_mistral_response(messages)
+        elif self.provider == "xai":
+            response_data = self._handle_xai_response(messages)
+        elif self.provider == "deepseek":
+            response_data = self._handle_deepseek_response(messages)
+        elif self.provider == "standin":
+            response_data = self._handle_standin_response(messages)
+        return response_data
+
     def stream_response(self, messages: list[Dict[str, str]]):
-        """Stream responses from the AI provider with enhanced error handling."""
-        start_time = time.time()
+        """Stream responses from the AI provider with enhanced error handling.
+
+        With the response cache enabled, a cached stream is replayed chunk by
+        chunk, and a stream that completes normally is stored for next time.
+        Each stream is recorded in the telemetry store.
+        """
+        with get_telemetry().timed("ai.stream", provider=self.provider) as event:
+            size = 0
+            try:
+                for chunk in self._stream_response(messages):
+                    size += len(chunk.encode('utf-8'))
+                    yield chunk
+            finally:
+                event.update(size=size, cache_hit=self.last_cache_hit, **self._telemetry_usage())
+            if self.cancelled:
+                event["status"] = "cancelled"
+
+    def _telemetry_usage(self) -> Dict[str, Any]:
+        """Token counts of the last stream, if the provider reported them."""
+        usage = self.last_usage or {}
+        return {"input_tokens": usage.get("input_tokens"), "output_tokens": usage.get("output_tokens")}
+
+    def _stream_response(self, messages: list[Dict[str, str]]):
+        self.last_cache_hit = False
+        self.last_usage = None
+        cache_key = self._cache_key(messages, stream=True) if self.response_cache else None
+        if cache_key:
+            cached = self.response_cache.get(cache_key)
+            if cached and cached.get("chunks") is not None:
+                self.last_cache_hit = True
+                self.last_usage = cached.get("usage")
+                yield from cached["chunks"]
+                return
+
+        chunks = []
+        admission = get_admission_controller(self.provider)
+        ticket = admission.acquire(self._estimate_tokens(messages))
+        try:
+            # Retries only until the first chunk; fails fast while the provider is down
+            for chunk in get_resilience(self.provider).stream(lambda: self._stream_from_provider(messages)):
+                if self.cancelled:
+                    break
+                if cache_key:
+                    chunks.append(chunk)
+                yield chunk
+        finally:
+            with self._upstream_lock:
+                upstream, self._upstream = self._upstream, None
+            self._close_upstream(upstream)
+            admission.release(ticket, self._usage_tokens(self.last_usage))
+
+        # A cancelled stream is incomplete; never cache it
+        if cache_key and chunks and not self.cancelled:
+            self.response_cache.put_chunks(cache_key, chunks, self.last_usage)
+
+    def _stream_from_provider(self, messages: list[Dict[str, str]]):
+        """Dispatch a streaming request to the provider-specific handler."""
+        if self.cancelled:
+            return
         try:
             if self.provider == "openai":
                 yield from self._handle_openai_stream(messages)
@@ -642,7 +947,12 @@ class AIProvider:
                 yield from self._handle_xai_stream(messages)
             elif self.provider == "deepseek":
                 yield from self._handle_deepseek_stream(messages)
+            elif self.provider == "standin":
+                yield from self._handle_standin_stream(messages)
 
         except Exception as e:
+            if self.cancelled:
+                # Closing the upstream stream makes the SDK raise; that is expected
+                return
             error_msg = f"Error during streaming from {self.provider}: {str(e)}"
             raise Exception(error_msg)
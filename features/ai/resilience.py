@@ -0,0 +1,325 @@
+import asyncio
+import email.utils
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterable, AsyncIterator, Awaitable, Callable, Dict, Iterable, Iterator, Optional
+
+logger = logging.getLogger("ai_provider.resilience")
+
+# Rate limits, timeouts and server-side errors; anything else (bad request,
+# auth) will fail the same way again and is raised immediately
+RETRYABLE_STATUS_CODES = {408, 409, 425, 429, 500, 502, 503, 504, 529}
+
+
+class CircuitOpenError(Exception):
+    """Raised without calling the provider while its circuit breaker is open."""
+
+    def __init__(self, provider: str, retry_in: float):
+        super().__init__(
+            f"{provider} is failing and temporarily disabled; retry in {retry_in:.0f}s")
+        self.provider = provider
+        self.retry_in = retry_in
+
+
+@dataclass
+class RetryPolicy:
+    """Exponential backoff with full jitter, capped at max_delay."""
+    max_attempts: int = 4
+    base_delay: float = 0.5
+    max_delay: float = 20.0
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """
+        Seconds to wait before the next attempt.
+
+        Args:
+            attempt: Number of attempts made so far (1 after the first failure)
+            retry_after: Delay requested by the server, if any
+
+        Returns:
+            float: Delay in seconds
+        """
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+        if retry_after is not None:
+            # Never retry earlier than the server asked for
+            delay = max(delay, retry_after)
+        return delay
+
+
+class CircuitBreaker:
+    """
+    Per-provider circuit breaker.
+
+    After failure_threshold consecutive failures the circuit opens and calls
+    fail fast for reset_timeout seconds. Then a single trial call is let
+    through (half-open): success closes the circuit, failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def before_call(self, provider: str) -> None:
+        """Raise CircuitOpenError if calls should not reach the provider now."""
+        with self._lock:
+            if self.state == "closed":
+                return
+            elapsed = time.monotonic() - self.opened_at
+            if self.state == "open" and elapsed >= self.reset_timeout:
+                self.state = "half_open"
+                return
+            raise CircuitOpenError(provider, max(0.0, self.reset_timeout - elapsed))
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+
+    def record_abandoned(self, responded: bool) -> None:
+        """
+        Resolve a call the caller gave up on (stream closed, task cancelled).
+        It counts as a success if the provider had started responding. An
+        abandoned half-open trial without a response reopens the circuit, so
+        a later call gets to be the trial instead of the breaker staying
+        half-open for good.
+        """
+        if responded:
+            self.record_success()
+            return
+        with self._lock:
+            if self.state == "half_open":
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"state": self.state, "consecutive_failures": self.failures}
+
+
+def _exception_chain(exc: BaseException) -> Iterator[BaseException]:
+    """Yield exc and the exceptions it wraps; handlers re-raise SDK errors as ValueError."""
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        yield exc
+        exc = exc.__cause__ or exc.__context__
+
+
+def get_status_code(exc: BaseException) -> Optional[int]:
+    """HTTP status code of the first error in the chain that carries one."""
+    for error in _exception_chain(exc):
+        for attr in ("status_code", "status", "code"):
+            value = getattr(error, attr, None)
+            if isinstance(value, int) and 100 <= value < 600:
+                return value
+        response = getattr(error, "response", None)
+        status = getattr(response, "status_code", None)
+        if isinstance(status, int):
+            return status
+    return None
+
+
+def get_retry_after(exc: BaseException) -> Optional[float]:
+    """Seconds from a Retry-After (or retry-after-ms) response header in the chain."""
+    for error in _exception_chain(exc):
+        headers = getattr(getattr(error, "response", None), "headers", None)
+        if not headers:
+            continue
+        try:
+            value = headers.get("retry-after-ms")
+            if value is not None:
+                return float(value) / 1000
+            value = headers.get("retry-after")
+            if value is None:
+                continue
+            try:
+                return max(0.0, float(value))
+            except ValueError:
+                retry_at = email.utils.parsedate_to_datetime(value)
+                return max(0.0, retry_at.timestamp() - time.time())
+        except (TypeError, ValueError):
+            continue
+    return None
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Whether a failure is transient: a retryable status, or a connection or timeout error."""
+    status = get_status_code(exc)
+    if status is not None:
+        return status in RETRYABLE_STATUS_CODES
+    for error in _exception_chain(exc):
+        if isinstance(error, (ConnectionError, TimeoutError)):
+            return True
+        name = type(error).__name__
+        if "Timeout" in name or "Connection" in name:
+            return True
+    return False
+
+
+class ProviderResilience:
+    """Retry policy and circuit breaker applied to every call to one provider."""
+
+    def __init__(self, provider: str, policy: RetryPolicy = None, breaker: CircuitBreaker = None):
+        self.provider = provider
+        self.policy = policy or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+
+    def call(self, func: Callable[[], Any]) -> Any:
+        """
+        Call func, retrying transient failures.
+
+        Args:
+            func: Makes one complete request to the provider
+
+        Returns:
+            The result of func
+        """
+        attempt = 0
+        while True:
+            self.breaker.before_call(self.provider)
+            attempt += 1
+            try:
+                result = func()
+            except Exception as e:
+                self._handle_failure(e, attempt)
+                continue
+            self.breaker.record_success()
+            return result
+
+    def stream(self, stream_factory: Callable[[], Iterable[str]]) -> Iterator[str]:
+        """
+        Yield from a provider stream, retrying transient failures that happen
+        before the first chunk. Once a chunk has been sent a retry would
+        duplicate output, so later failures are raised to the caller.
+
+        Args:
+            stream_factory: Starts a new stream from the provider
+        """
+        attempt = 0
+        while True:
+            self.breaker.before_call(self.provider)
+            attempt += 1
+            started = False
+            try:
+                for chunk in stream_factory():
+                    started = True
+                    yield chunk
+            except GeneratorExit:
+                self.breaker.record_abandoned(started)
+                raise
+            except Exception as e:
+                if started:
+                    self.breaker.record_failure()
+                    raise
+                self._handle_failure(e, attempt)
+                continue
+            self.breaker.record_success()
+            return
+
+    async def acall(self, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Async version of call(); waits between attempts without blocking the event loop.
+
+        Args:
+            func: Returns a coroutine making one complete request to the provider
+
+        Returns:
+            The result of the coroutine
+        """
+        attempt = 0
+        while True:
+            self.breaker.before_call(self.provider)
+            attempt += 1
+            try:
+                result = await func()
+            except asyncio.CancelledError:
+                self.breaker.record_abandoned(False)
+                raise
+            except Exception as e:
+                await asyncio.sleep(self._retry_delay(e, attempt))
+                continue
+            self.breaker.record_success()
+            return result
+
+    async def astream(self, stream_factory: Callable[[], AsyncIterable[str]]) -> AsyncIterator[str]:
+        """
+        Async version of stream(): retries transient failures before the first chunk only.
+
+        Args:
+            stream_factory: Starts a new async stream from the provider
+        """
+        attempt = 0
+        while True:
+            self.breaker.before_call(self.provider)
+            attempt += 1
+            started = False
+            try:
+                async for chunk in stream_factory():
+                    started = True
+                    yield chunk
+            except (GeneratorExit, asyncio.CancelledError):
+                self.breaker.record_abandoned(started)
+                raise
+            except Exception as e:
+                if started:
+                    self.breaker.record_failure()
+                    raise
+                await asyncio.sleep(self._retry_delay(e, attempt))
+                continue
+            self.breaker.record_success()
+            return
+
+    def _handle_failure(self, error: Exception, attempt: int) -> None:
+        """Record the failure and sleep before the next attempt, or re-raise."""
+        time.sleep(self._retry_delay(error, attempt))
+
+    def _retry_delay(self, error: Exception, attempt: int) -> float:
+        """Record the failure and return the delay before the next attempt, or re-raise."""
+        if not is_retryable(error):
+            # The provider answered, so it is up; the request itself is at fault
+            self.breaker.record_success()
+            raise error
+
+        self.breaker.record_failure()
+        retry_after = get_retry_after(error)
+        if attempt >= self.policy.max_attempts or (
+                retry_after is not None and retry_after > self.policy.max_delay):
+            raise error
+
+        delay = self.policy.backoff(attempt, retry_after)
+        logger.warning(
+            f"{self.provider} request failed (status {get_status_code(error)}), "
+            f"attempt {attempt}/{self.policy.max_attempts}; retrying in {delay:.2f}s")
+        return delay
+
+
+_resilience: Dict[str, ProviderResilience] = {}
+_resilience_lock = threading.Lock()
+
+
+def get_resilience(provider: str) -> ProviderResilience:
+    """Get the process-wide resilience layer for a provider, so breaker state is shared across requests."""
+    with _resilience_lock:
+        if provider not in _resilience:
+            _resilience[provider] = ProviderResilience(provider)
+        return _resilience[provider]
+
+
+def circuit_states() -> Dict[str, Dict[str, Any]]:
+    """Circuit breaker state of every provider used so far."""
+    with _resilience_lock:
+        return {name: layer.breaker.snapshot() for name, layer in _resilience.items()}
@@ -0,0 +1,172 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from utils.helpers import get_data_dir
+
+DEFAULT_TTL_SECONDS = 24 * 60 * 60
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+
+
+class ResponseCache:
+    """
+    Disk-backed cache of AI responses for identical requests.
+
+    Entries are JSON files named by a hash of provider, model, reasoning effort
+    and messages. Expired entries are dropped on read and during eviction, and
+    the oldest entries are evicted once the cache exceeds max_bytes. Writes
+    keep a running estimate of the cache size, so the directory is only
+    scanned on the first write and when the estimate crosses max_bytes.
+    """
+
+    def __init__(self, cache_dir: str, ttl_seconds: int = DEFAULT_TTL_SECONDS,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # Bytes on disk as of the last scan plus writes since; None until the first scan.
+        # Removals outside evict() are not subtracted, so it errs on the high side.
+        self._size_estimate: Optional[int] = None
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(provider: str, model: str, reasoning_effort: str, messages: List[Dict[str, Any]],
+                 stream: bool = False) -> str:
+        """Build the cache key for a request. Streamed and complete responses are cached separately."""
+        payload = json.dumps({
+            'stream': stream,
+            'provider': provider,
+            'model': model,
+            'reasoning_effort': reasoning_effort,
+            'messages': messages
+        }, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a cached entry.
+
+        Returns:
+            Dict: The stored entry, or None if missing, expired or unreadable
+        """
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if time.time() - entry.get('created', 0) > self.ttl_seconds:
+            self._remove(path)
+            return None
+        return entry
+
+    def get_response(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get a cached complete response, or None."""
+        entry = self.get(key)
+        return entry.get('response') if entry else None
+
+    def put_response(self, key: str, response: Dict[str, Any]) -> None:
+        """Store a complete response."""
+        self._put(key, {'created': time.time(), 'response': response})
+
+    def put_chunks(self, key: str, chunks: List[str], usage: Optional[Dict[str, int]] = None) -> None:
+        """Store the chunks (and provider token usage) of a completed stream so it can be replayed."""
+        self._put(key, {'created': time.time(), 'chunks': chunks, 'usage': usage})
+
+    def _put(self, key: str, entry: Dict[str, Any]) -> None:
+        """Write an entry atomically, then evict if the cache may have grown too large."""
+        path = self._path(key)
+        data = json.dumps(entry, ensure_ascii=False).encode('utf-8')
+        growth = 0
+        tmp_path = None
+        try:
+            tmp_fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            with os.fdopen(tmp_fd, 'wb') as f:
+                f.write(data)
+            try:
+                replaced = os.path.getsize(path)
+            except OSError:
+                replaced = 0
+            os.replace(tmp_path, path)
+            tmp_path = None
+            growth = len(data) - replaced
+        except OSError as e:
+            print(f"Error writing response cache entry: {str(e)}")
+        finally:
+            if tmp_path:
+                self._remove(tmp_path)
+
+        with self._lock:
+            if self._size_estimate is not None:
+                self._size_estimate += growth
+            over_limit = self._size_estimate is None or self._size_estimate > self.max_bytes
+        if over_limit:
+            self.evict()
+
+    def evict(self) -> None:
+        """Remove expired entries, then the oldest ones until the size limit is met."""
+        with self._lock:
+            now = time.time()
+            entries = []
+            for entry in os.scandir(self.cache_dir):
+                if not entry.name.endswith('.json'):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                if now - stat.st_mtime > self.ttl_seconds:
+                    self._remove(entry.path)
+                else:
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+            total_size = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total_size <= self.max_bytes:
+                    break
+                self._remove(path)
+                total_size -= size
+            self._size_estimate = total_size
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """
+    Get the process-wide response cache.
+    Configured with PROMPTER_RESPONSE_CACHE_TTL (seconds) and
+    PROMPTER_RESPONSE_CACHE_MAX_MB environment variables.
+    """
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ResponseCache(
+                get_data_dir('response_cache'),
+                ttl_seconds=int(os.getenv('PROMPTER_RESPONSE_CACHE_TTL', DEFAULT_TTL_SECONDS)),
+                max_bytes=int(float(os.getenv('PROMPTER_RESPONSE_CACHE_MAX_MB',
+                                              DEFAULT_MAX_BYTES / (1024 * 1024))) * 1024 * 1024)
+            )
+        return _default_cache
+
+
+def response_cache_enabled_by_default() -> bool:
+    """Whether caching is switched on for every request via PROMPTER_RESPONSE_CACHE."""
+    return os.getenv('PROMPTER_RESPONSE_CACHE', '').lower() in ('1', 'true', 'yes', 'on')
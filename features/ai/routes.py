@@ -1,8 +1,17 @@
 from flask import request, jsonify, current_app, Response, stream_with_context
 import os
-import time
 import json
-from features.ai.providers import AIProvider
+from features.ai.providers import AIProvider, PROVIDER_MODELS, STANDIN_URL_ENV
+from features.ai.admission import AdmissionTimeout, admission_metrics
+from features.ai.async_providers import AsyncAIProvider, fan_out
+from features.ai.generations import generation_registry
+from features.ai.hedging import DEFAULT_HEDGE_DELAY, HedgedStream
+from features.ai.models import get_model_registry, provider_names
+from features.ai.ollama_warmup import get_ollama_warmer
+from features.ai.resilience import CircuitOpenError, circuit_states
+from features.ai.sse import SSEStream, format_event
+from features.ai.stream_metrics import StreamMetrics, get_metrics_log
+from utils.tokenizers import tokenizer_registry
 
 
 def register_ai_integration_routes(app):
@@ -21,8 +30,11 @@ def register_ai_integration_routes(app):
         Expected request format:
         {
             "prompt": "User's prompt text here",
-            "provider": "openai" | "anthropic" | "gemini" | "ollama" | "deepseek" | "xai" | "mistral",
-            "reasoning_effort": "low" | "medium" | "high" (optional, default is "medium")
+            "provider": "openai" | "anthropic" | "gemini" | "ollama" | "deepseek" | "xai" | "mistral"
+                        | "auto" (the fastest available model that fits the prompt),
+            "reasoning_effort": "low" | "medium" | "high" (optional, default is "medium"),
+            "use_cache": true | false (optional, reuse the response of an identical earlier request),
+            "exact_token_counts": true | false (optional, count tokens through the provider's API where available)
         }
 
         Returns:
@@ -43,9 +55,13 @@ def register_ai_integration_routes(app):
             if not prompt:
                 return jsonify({"error": "No prompt provided"}), 400
 
+            # Resolve "auto" and refuse prompts the model cannot take
+            provider, routing, fit_error = select_provider(provider, prompt)
+            if fit_error:
+                return jsonify({"error": fit_error, "routing": routing}), 400
+
             # Validate provider
-            valid_providers = ["openai", "anthropic",
-                               "gemini", "ollama", "deepseek", "xai", "mistral"]
+            valid_providers = provider_names()
             if provider not in valid_providers:
                 return jsonify({"error": f"Invalid provider. Must be one of: {', '.join(valid_providers)}"}), 400
 
@@ -64,6 +80,13 @@ def register_ai_integration_routes(app):
             # Set reasoning effort
             ai_provider.set_reasoning_effort(reasoning_effort)
 
+            # Opt in to the response cache for this request
+            if data.get('use_cache'):
+                ai_provider.enable_response_cache()
+
+            if data.get('exact_token_counts'):
+                ai_provider.exact_token_counts = True
+
             # Log processing info
             print(
                 f"Processing prompt with {provider} provider, reasoning effort: {reasoning_effort}")
@@ -79,11 +102,28 @@ def register_ai_integration_routes(app):
                 "input_tokens": response_data.get("input_tokens", 0),
                 "output_tokens": response_data.get("output_tokens", 0),
                 "time_taken": response_data.get("time_taken", 0),
-                "provider": provider
+                "provider": provider,
+                "cache_hit": ai_provider.last_cache_hit
             }
+            if routing:
+                result["routing"] = routing
+
+            # Anthropic prompt cache usage for the file-context prefix, and
+            # whether a local Ollama model was already loaded
+            for key in ("cache_creation_input_tokens", "cache_read_input_tokens", "load_duration", "model_warm"):
+                if key in response_data:
+                    result[key] = response_data[key]
 
             return jsonify(result)
 
+        except CircuitOpenError as e:
+            # The provider is failing; tell the client when to try again
+            print(f"Error getting AI response: {str(e)}")
+            return jsonify({"error": str(e)}), 503, {"Retry-After": str(int(e.retry_in) + 1)}
+        except AdmissionTimeout as e:
+            # Too many concurrent requests for this provider; the queue wait timed out
+            print(f"Error getting AI response: {str(e)}")
+            return jsonify({"error": str(e)}), 429, {"Retry-After": "5"}
         except Exception as e:
             error_message = f"Error getting AI response: {str(e)}"
             print(error_message)
@@ -97,10 +137,23 @@ def register_ai_integration_routes(app):
         Expected request format:
         {
             "prompt": "User's prompt text here",
-            "provider": "openai" | "anthropic" | "gemini" | "ollama" | "deepseek" | "xai" | "mistral",
-            "reasoning_effort": "low" | "medium" | "high" (optional, default is "medium")
+            "provider": "openai" | "anthropic" | "gemini" | "ollama" | "deepseek" | "xai" | "mistral"
+                        | "auto" (the fastest available model that fits the prompt),
+            "reasoning_effort": "low" | "medium" | "high" (optional, default is "medium"),
+            "use_cache": true | false (optional, reuse the response of an identical earlier request),
+            "hedge_provider": secondary provider (optional, enables hedge mode),
+            "hedge_delay": seconds to wait for the first chunk before starting hedge_provider (optional),
+            "generation_id": id for /api/cancel_generation/<id> (optional, generated if omitted)
         }
 
+        The first event is "generation" with the generation id. Cancelling it,
+        or disconnecting, closes the upstream provider stream immediately and
+        records the partial usage.
+
+        In hedge mode the secondary provider is started if the primary has not
+        produced a first chunk within hedge_delay; the first to respond wins,
+        the other is cancelled, and the metrics event reports the winner.
+
         Returns:
             Streamed response with text/event-stream content type
         """
@@ -119,9 +172,13 @@ def register_ai_integration_routes(app):
             if not prompt:
                 return jsonify({"error": "No prompt provided"}), 400
 
+            # Resolve "auto" and refuse prompts the model cannot take
+            provider, routing, fit_error = select_provider(provider, prompt)
+            if fit_error:
+                return jsonify({"error": fit_error, "routing": routing}), 400
+
             # Validate provider
-            valid_providers = ["openai", "anthropic",
-                               "gemini", "ollama", "deepseek", "xai", "mistral"]
+            valid_providers = provider_names()
             if provider not in valid_providers:
                 return jsonify({"error": f"Invalid provider. Must be one of: {', '.join(valid_providers)}"}), 400
 
@@ -134,11 +191,29 @@ def register_ai_integration_routes(app):
             if reasoning_effort not in valid_efforts:
                 return jsonify({"error": f"Invalid reasoning effort. Must be one of: {', '.join(valid_efforts)}"}), 400
 
-            # Initialize the AI provider
+            # Validate the hedge provider, if hedge mode was requested
+            hedge_provider = data.get('hedge_provider')
+            if hedge_provider:
+                if hedge_provider not in valid_providers or hedge_provider == provider:
+                    return jsonify({"error": "Invalid hedge provider. Must be a different valid provider"}), 400
+                if not is_provider_available(hedge_provider):
+                    return jsonify({"error": f"The {hedge_provider} provider is not available. API key is missing."}), 400
+                try:
+                    hedge_delay = float(data.get('hedge_delay', DEFAULT_HEDGE_DELAY))
+                except (TypeError, ValueError):
+                    return jsonify({"error": "hedge_delay must be a number of seconds"}), 400
+
+            # Initialize the AI provider(s)
             ai_provider = AIProvider(provider)
+            hedge_ai_provider = AIProvider(hedge_provider) if hedge_provider else None
 
-            # Set reasoning effort
-            ai_provider.set_reasoning_effort(reasoning_effort)
+            for candidate in filter(None, (ai_provider, hedge_ai_provider)):
+                # Set reasoning effort
+                candidate.set_reasoning_effort(reasoning_effort)
+
+                # Opt in to the response cache for this request
+                if data.get('use_cache'):
+                    candidate.enable_response_cache()
 
             # Log processing info
             print(
@@ -146,44 +221,95 @@ def register_ai_integration_routes(app):
             print(f"Prompt content: {prompt[:100]}..." if len(
                 prompt) > 100 else prompt)
 
+            # Clients may choose the id so they can cancel before the first event arrives
+            generation_id = generation_registry.new_id(data.get('generation_id'))
+            generation_providers = [p for p in (ai_provider, hedge_ai_provider) if p]
+
             def generate():
-                try:
-                    # Create a list with a single message
-                    messages = [{"role": "user", "content": prompt}]
+                # Create a list with a single message
+                messages = [{"role": "user", "content": prompt}]
+
+                # Time-to-first-chunk, inter-chunk gaps and output tokens
+                stream_metrics = StreamMetrics(provider, PROVIDER_MODELS.get(provider))
+                stream_metrics.start()
+                stream = None
+                sse = None
+                completed = False
+
+                def collect_metrics(cancel_reason=None):
+                    # In hedge mode, report on whichever provider answered
+                    answered_by = ai_provider
+                    if hedge_ai_provider and stream is not None:
+                        answered_by = stream.winner or ai_provider
+                        stream_metrics.provider = answered_by.provider
+                        stream_metrics.model = PROVIDER_MODELS.get(answered_by.provider)
+
+                    # Prefer the provider's token usage; cancelled streams rarely report any
+                    metrics = stream_metrics.finish(answered_by.last_usage)
+                    metrics["generation_id"] = generation_id
+                    metrics["reasoning_effort"] = reasoning_effort
+                    metrics["cache_hit"] = answered_by.last_cache_hit
+                    if hedge_ai_provider and stream is not None:
+                        metrics["hedge"] = stream.summary()
+                    if sse is not None:
+                        metrics["sse"] = sse.summary()
+                    if routing:
+                        metrics["routing"] = routing
+                    if cancel_reason:
+                        metrics["cancelled"] = cancel_reason
+                        if "input_tokens" not in metrics:
+                            metrics["input_tokens"] = tokenizer_registry.count_for_provider(
+                                prompt, answered_by.provider)
+                    get_metrics_log().append(metrics)
+                    # Feeds the latency figures the "auto" router compares
+                    get_model_registry().record_stream(metrics)
+                    return metrics
 
-                    # Start time for metrics
-                    start_time = time.time()
-                    total_tokens = 0
+                try:
+                    if hedge_ai_provider:
+                        stream = HedgedStream(ai_provider, hedge_ai_provider, messages, hedge_delay)
+                    else:
+                        stream = ai_provider.stream_response(messages)
 
-                    # Stream the response
-                    for chunk in ai_provider.stream_response(messages):
-                        # Count tokens in the chunk (approximate)
-                        chunk_tokens = len(chunk.split())
-                        total_tokens += chunk_tokens
+                    # Coalesces provider chunks into fewer events and sends heartbeats
+                    sse = SSEStream(stream, on_chunk=stream_metrics.record_chunk)
 
-                        # Format as Server-Sent Events
-                        yield f"data: {chunk}\n\n"
+                    # Tell the client which id to pass to /api/cancel_generation
+                    yield sse.frame(json.dumps({'generation_id': generation_id}), "generation")
 
-                    # Calculate elapsed time
-                    elapsed_time = time.time() - start_time
+                    # Stream the response
+                    yield from sse.data_events()
 
                     # Send metrics as a final event
-                    metrics = {
-                        "output_tokens": total_tokens,
-                        "time_taken": elapsed_time,
-                        "provider": provider
-                    }
+                    # Not ai_provider.cancelled: a hedge cancels the primary when the secondary wins
+                    metrics = collect_metrics(
+                        "requested" if generation_registry.was_cancelled(generation_id) else None)
+                    completed = True
 
-                    yield f"event: metrics\ndata: {json.dumps(metrics)}\n\n"
+                    yield sse.frame(json.dumps(metrics), "metrics")
 
                     # Send a completion event
-                    yield "event: done\ndata: \n\n"
-
+                    yield sse.frame("", "done")
+
+                except GeneratorExit:
+                    # The client went away; stop the upstream generation instead of draining it
+                    if not completed:
+                        for generation_provider in generation_providers:
+                            generation_provider.cancel()
+                        if sse is not None:
+                            # The worker thread closes the provider stream
+                            sse.close()
+                        collect_metrics("client_disconnected")
+                        print(f"Client disconnected, cancelled generation {generation_id}")
+                    raise
                 except Exception as e:
                     error_msg = f"Error during streaming: {str(e)}"
                     print(error_msg)
-                    yield f"event: error\ndata: {error_msg}\n\n"
+                    yield format_event(error_msg, "error")
+                finally:
+                    generation_registry.unregister(generation_id)
 
+            generation_registry.register(generation_id, generation_providers)
             return Response(
                 stream_with_context(generate()),
                 content_type='text/event-stream'
@@ -193,6 +319,192 @@ def register_ai_integration_routes(app):
             print(error_message)
             return jsonify({"error": error_message}), 500
 
+    @app.route('/api/fan_out_stream', methods=['POST'])
+    def fan_out_stream_response():
+        """
+        Stream one prompt from several providers concurrently.
+
+        All provider streams run as coroutines on one shared event loop, so
+        the request holds a single thread however many providers it queries.
+
+        Expected request format:
+        {
+            "prompt": "User's prompt text here",
+            "providers": ["openai", "anthropic", ...],
+            "reasoning_effort": "low" | "medium" | "high" (optional, default is "medium"),
+            "use_cache": true | false (optional),
+            "generation_id": "client-chosen id" (optional)
+        }
+
+        Returns:
+            Server-sent events: "generation" with the id, "chunk" events with
+            {"provider", "text"} as they arrive, a "metrics" event per provider
+            when its stream ends (or an "error" event), then "done"
+        """
+        try:
+            data = request.get_json()
+
+            if not data:
+                return jsonify({"error": "No data provided"}), 400
+
+            prompt = data.get('prompt')
+            providers = data.get('providers') or []
+            reasoning_effort = data.get('reasoning_effort', 'medium')
+
+            if not prompt:
+                return jsonify({"error": "No prompt provided"}), 400
+
+            valid_providers = provider_names()
+            if not isinstance(providers, list) or not providers or len(set(providers)) != len(providers):
+                return jsonify({"error": "providers must be a non-empty list of distinct providers"}), 400
+            for provider in providers:
+                if provider not in valid_providers:
+                    return jsonify({"error": f"Invalid provider {provider}. Must be one of: {', '.join(valid_providers)}"}), 400
+                if not is_provider_available(provider):
+                    return jsonify({"error": f"The {provider} provider is not available. API key is missing."}), 400
+
+            if reasoning_effort not in ["low", "medium", "high"]:
+                return jsonify({"error": "Invalid reasoning effort. Must be one of: low, medium, high"}), 400
+
+            ai_providers = [AsyncAIProvider(provider) for provider in providers]
+            for ai_provider in ai_providers:
+                ai_provider.set_reasoning_effort(reasoning_effort)
+                if data.get('use_cache'):
+                    ai_provider.enable_response_cache()
+
+            print(f"Fanning out prompt to {', '.join(providers)}, reasoning effort: {reasoning_effort}")
+
+            generation_id = generation_registry.new_id(data.get('generation_id'))
+
+            def generate():
+                messages = [{"role": "user", "content": prompt}]
+                try:
+                    yield format_event(json.dumps({'generation_id': generation_id}), "generation")
+
+                    for provider, kind, payload in fan_out(ai_providers, messages):
+                        if kind == "chunk":
+                            yield format_event(json.dumps({"provider": provider, "text": payload}), "chunk")
+                        elif kind == "metrics":
+                            payload["generation_id"] = generation_id
+                            payload["reasoning_effort"] = reasoning_effort
+                            payload["fan_out"] = providers
+                            get_metrics_log().append(payload)
+                            yield format_event(json.dumps(payload), "metrics")
+                        else:
+                            print(f"Fan-out error from {provider}: {payload}")
+                            yield format_event(json.dumps({"provider": provider, "error": payload}), "error")
+
+                    yield format_event("", "done")
+                except GeneratorExit:
+                    # Closing the fan-out iterator cancels the provider streams
+                    print(f"Client disconnected, cancelled fan-out {generation_id}")
+                    raise
+                except Exception as e:
+                    error_msg = f"Error during fan-out streaming: {str(e)}"
+                    print(error_msg)
+                    yield format_event(error_msg, "error")
+                finally:
+                    generation_registry.unregister(generation_id)
+
+            generation_registry.register(generation_id, ai_providers)
+            return Response(
+                stream_with_context(generate()),
+                content_type='text/event-stream'
+            )
+        except Exception as e:
+            error_message = f"Error streaming AI responses: {str(e)}"
+            print(error_message)
+            return jsonify({"error": error_message}), 500
+
+    @app.route('/api/cancel_generation/<generation_id>', methods=['POST'])
+    def cancel_generation(generation_id):
+        """
+        Cancel an in-progress streamed generation.
+
+        Args:
+            generation_id: Id from the stream's "generation" event
+
+        Returns:
+            JSON response confirming the cancellation, or 404 if it is not running
+        """
+        try:
+            if not generation_registry.cancel(generation_id):
+                return jsonify({"error": f"No active generation with id {generation_id}"}), 404
+            print(f"Cancelled generation {generation_id}")
+            return jsonify({"generation_id": generation_id, "cancelled": True})
+        except Exception as e:
+            error_message = f"Error cancelling generation: {str(e)}"
+            print(error_message)
+            return jsonify({"error": error_message}), 500
+
+    @app.route('/api/ollama/warmup', methods=['GET', 'POST'])
+    def ollama_warmup():
+        """
+        GET: report whether the Ollama model is loaded.
+        POST: load it now in the background, e.g. before a burst of prompts.
+
+        Returns:
+            JSON response with the warm-up state
+        """
+        try:
+            warmer = get_ollama_warmer()
+            if request.method == 'POST':
+                warmer.warm_in_background()
+            return jsonify(warmer.snapshot())
+        except Exception as e:
+            error_message = f"Error warming up Ollama: {str(e)}"
+            print(error_message)
+            return jsonify({"error": error_message}), 500
+
+    @app.route('/api/provider_metrics', methods=['GET'])
+    def get_provider_metrics():
+        """
+        Return per-provider admission metrics (queue depth, in-flight requests,
+        wait times) and circuit breaker states.
+
+        Returns:
+            JSON response containing provider metrics
+        """
+        try:
+            return jsonify({
+                "admission": admission_metrics(),
+                "circuits": circuit_states()
+            })
+        except Exception as e:
+            error_message = f"Error getting provider metrics: {str(e)}"
+            print(error_message)
+            return jsonify({"error": error_message}), 500
+
+    def select_provider(provider, prompt):
+        """
+        Resolve "auto" to the fastest available model that fits the prompt,
+        and check that an explicitly chosen model can take the prompt at all.
+
+        Args:
+            provider: Requested provider name or "auto"
+            prompt: The assembled prompt
+
+        Returns:
+            Tuple of (provider, routing decision or None, error message or None)
+        """
+        registry = get_model_registry()
+        if provider == "auto":
+            available = [name for name in provider_names() if is_provider_available(name)]
+            routing = registry.route(prompt, available)
+            if routing["provider"] is None:
+                return None, routing, ("The prompt is too large for the context window of every available "
+                                       "model; use /api/map_reduce to split it")
+            print(f"Routing prompt to {routing['provider']}")
+            return routing["provider"], routing, None
+
+        info = registry.get(provider)
+        if info is not None:
+            prompt_tokens = tokenizer_registry.count_for_provider(prompt, provider)
+            if prompt_tokens > info.context_window:
+                return provider, None, (f"The prompt has about {prompt_tokens} tokens, more than the "
+                                        f"{info.context_window}-token context window of {info.model}")
+        return provider, None, None
+
     def is_provider_available(provider):
         """
         Check if the provider has its API key set in environment variables.
@@ -219,6 +531,10 @@ def register_ai_integration_routes(app):
         if provider == "gemini":
             return os.getenv("GEMINI_API_KEY") is not None
 
+        # The offline stand-in server is only used when its URL is configured
+        if provider == "standin":
+            return os.getenv(STANDIN_URL_ENV) is not None
+
         # Mistral uses MISTRAL_API_KEY (as seen in the providers.py code)
         if provider == "mistral":
             return os.getenv("MISTRAL_API_KEY") is not None
@@ -243,43 +559,9 @@ def register_ai_integration_routes(app):
             JSON response containing available AI models
         """
         try:
-            # Define all possible models
-            all_models = {
-                "openai": {
-                    "model": "o3-mini",
-                    "description": "Latest OpenAI model with reasoning capabilities"
-                },
-                "anthropic": {
-                    "model": "claude-3-7-sonnet-20250219",
-                    "description": "Claude 3.7 Sonnet model"
-                },
-                "gemini": {
-                    "model": "gemini-2.5-pro-exp-03-25",
-                    "description": "Google's latest Gemini model"
-                },
-                "ollama": {
-                    "model": "llama3",
-                    "description": "Local Llama 3 model via Ollama"
-                },
-                "deepseek": {
-                    "model": "deepseek-reasoner",
-                    "description": "Deepseek's reasoning-focused model"
-                },
-                "xai": {
-                    "model": "grok-2-latest",
-                    "description": "xAI's Grok 2 model"
-                },
-                "mistral": {
-                    "model": "mistral-large-latest",
-                    "description": "Mistral's latest large model"
-                }
-            }
-
-            # Filter models to only include those with API keys set
-            available_models = {}
-            for provider, model_info in all_models.items():
-                if is_provider_available(provider):
-                    available_models[provider] = model_info
+            # Only models whose API keys are set, with their limits and measured speed
+            available_models = get_model_registry().describe(
+                [provider for provider in provider_names() if is_provider_available(provider)])
 
             # Determine a default provider (preferring Anthropic if available)
             default_provider = "anthropic" if "anthropic" in available_models else next(
@@ -295,6 +577,8 @@ def register_ai_integration_routes(app):
                 "available_models": available_models,
                 "default_provider": default_provider,
                 "default_reasoning_effort": "medium",
+                # "auto" picks the fastest of these models that fits the prompt
+                "routing_modes": ["auto"],
                 "api_endpoints": api_endpoints
             })
 
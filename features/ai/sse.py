@@ -0,0 +1,172 @@
+import os
+import queue
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
+
+# Provider chunks arriving within this window are sent as one event
+DEFAULT_COALESCE_WINDOW = float(os.getenv('PROMPTER_SSE_COALESCE_WINDOW', 0.03))
+# ...unless the batch grows past this many bytes first
+DEFAULT_MAX_BATCH_BYTES = 4096
+# Comment lines sent while the provider is silent keep proxies from timing out the connection
+DEFAULT_HEARTBEAT_INTERVAL = 15.0
+
+# Line breaks as defined by the SSE spec; str.splitlines() also splits on other characters
+_LINE_BREAK = re.compile(r'\r\n|\r|\n')
+
+
+def format_event(data: str, event: Optional[str] = None) -> str:
+    """
+    Encode one SSE event. Each line of data gets its own "data:" field, so the
+    client can restore the original text by joining them with newlines.
+
+    Args:
+        data: Event payload, may contain newlines
+        event: Event type; omitted for the default "message" type
+
+    Returns:
+        str: The encoded event, terminated by a blank line
+    """
+    lines = [f"event: {event}"] if event else []
+    lines.extend(f"data: {line}" for line in _LINE_BREAK.split(data))
+    return "\n".join(lines) + "\n\n"
+
+
+class SSEStream:
+    """
+    Frames a stream of text chunks as Server-Sent Events.
+
+    The chunk source is read on a worker thread, so the writer can flush on
+    a timer: chunks arriving within coalesce_window (or up to max_batch_bytes)
+    are merged into one event, the first chunk is sent at once, and a
+    heartbeat comment is sent whenever the source is silent for
+    heartbeat_interval. Event and byte counts are kept for summary().
+    """
+
+    def __init__(self, chunks: Iterable[str], coalesce_window: float = DEFAULT_COALESCE_WINDOW,
+                 max_batch_bytes: int = DEFAULT_MAX_BATCH_BYTES,
+                 heartbeat_interval: float = DEFAULT_HEARTBEAT_INTERVAL,
+                 on_chunk: Optional[Callable[[str], None]] = None):
+        """
+        Args:
+            chunks: Source of text chunks, e.g. AIProvider.stream_response()
+            coalesce_window: Seconds to wait for more chunks before flushing a batch
+            max_batch_bytes: Flush a batch as soon as it reaches this many UTF-8 bytes
+            heartbeat_interval: Seconds of silence before a heartbeat is sent
+            on_chunk: Called with every source chunk as it arrives (on the worker thread)
+        """
+        self.chunks = chunks
+        self.coalesce_window = coalesce_window
+        self.max_batch_bytes = max_batch_bytes
+        self.heartbeat_interval = heartbeat_interval
+        self.on_chunk = on_chunk
+
+        self.chunk_count = 0
+        self.data_event_count = 0
+        self.event_count = 0
+        self.heartbeat_count = 0
+        self.bytes_sent = 0
+        self.start_time = time.perf_counter()
+
+        self._queue = queue.Queue()
+        self._stopped = threading.Event()
+        self._worker = None
+
+    def frame(self, data: str, event: Optional[str] = None) -> str:
+        """Encode an event and count it."""
+        encoded = format_event(data, event)
+        self.event_count += 1
+        self.bytes_sent += len(encoded.encode('utf-8'))
+        return encoded
+
+    def _flush(self, batch) -> str:
+        self.data_event_count += 1
+        return self.frame("".join(batch))
+
+    def _heartbeat(self) -> str:
+        self.heartbeat_count += 1
+        self.bytes_sent += len(": heartbeat\n\n")
+        return ": heartbeat\n\n"
+
+    def _pump(self) -> None:
+        """Worker thread: move source chunks into the queue."""
+        try:
+            for chunk in self.chunks:
+                if self._stopped.is_set():
+                    break
+                if self.on_chunk:
+                    self.on_chunk(chunk)
+                self._queue.put(("chunk", chunk))
+            self._queue.put(("done", None))
+        except Exception as e:
+            self._queue.put(("error", e))
+        finally:
+            close = getattr(self.chunks, 'close', None)
+            if callable(close):
+                close()
+
+    def data_events(self) -> Iterator[str]:
+        """
+        Yield encoded data events (and heartbeats) until the source is exhausted.
+        Errors from the source are re-raised after the pending batch is sent.
+        """
+        self._worker = threading.Thread(target=self._pump, daemon=True)
+        self._worker.start()
+
+        batch = []
+        batch_bytes = 0
+        batch_started = None
+        try:
+            while True:
+                if batch:
+                    timeout = max(0.0, batch_started + self.coalesce_window - time.monotonic())
+                else:
+                    timeout = self.heartbeat_interval
+                try:
+                    kind, payload = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    if batch:
+                        yield self._flush(batch)
+                        batch, batch_bytes = [], 0
+                    else:
+                        yield self._heartbeat()
+                    continue
+
+                if kind == "chunk":
+                    self.chunk_count += 1
+                    batch.append(payload)
+                    batch_bytes += len(payload.encode('utf-8'))
+                    if len(batch) == 1:
+                        batch_started = time.monotonic()
+                    # The first chunk goes out immediately; coalescing must not delay it
+                    if self.chunk_count == 1 or batch_bytes >= self.max_batch_bytes:
+                        yield self._flush(batch)
+                        batch, batch_bytes = [], 0
+                    continue
+
+                if batch:
+                    yield self._flush(batch)
+                    batch, batch_bytes = [], 0
+                if kind == "error":
+                    raise payload
+                return
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        """Stop reading the source; the worker closes it when its current read returns."""
+        self._stopped.set()
+
+    def summary(self) -> Dict[str, Any]:
+        """Framing statistics for the metrics event."""
+        elapsed = time.perf_counter() - self.start_time
+        return {
+            "chunks": self.chunk_count,
+            "events": self.event_count,
+            "heartbeats": self.heartbeat_count,
+            "bytes": self.bytes_sent,
+            "events_per_second": self.event_count / elapsed if elapsed > 0 else None,
+            "bytes_per_second": self.bytes_sent / elapsed if elapsed > 0 else None,
+            "chunks_per_data_event": self.chunk_count / self.data_event_count if self.data_event_count else None,
+        }
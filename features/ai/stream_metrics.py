@@ -0,0 +1,152 @@
+import json
+import os
+import statistics
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from utils.helpers import get_data_dir
+from utils.tokenizers import tokenizer_registry
+
+
+class IncrementalTokenCounter:
+    """
+    Counts tokens of streamed text as it arrives.
+
+    Text is buffered up to the last newline of each chunk and only complete
+    lines are encoded, so chunks that split a word do not inflate the count
+    and each piece of text is encoded once.
+    """
+
+    def __init__(self, provider: Optional[str] = None):
+        self.provider = provider
+        self.count = 0
+        self._pending = ""
+
+    def feed(self, text: str) -> None:
+        self._pending += text
+        cut = self._pending.rfind("\n")
+        if cut >= 0:
+            self.count += self._encode(self._pending[:cut + 1])
+            self._pending = self._pending[cut + 1:]
+
+    def total(self) -> int:
+        """Token count including any text still waiting for a newline."""
+        return self.count + (self._encode(self._pending) if self._pending else 0)
+
+    def _encode(self, text: str) -> int:
+        return tokenizer_registry.count_for_provider(text, self.provider)
+
+
+class StreamMetrics:
+    """
+    Timing and token metrics for one streamed response.
+
+    Call start() before requesting the stream, record_chunk() for every chunk
+    and finish() at the end to get the summary.
+    """
+
+    def __init__(self, provider: str, model: Optional[str] = None):
+        self.provider = provider
+        self.model = model
+        self.start_time = None
+        self.first_chunk_time = None
+        self.last_chunk_time = None
+        self.chunk_count = 0
+        self.gaps = []
+        self.tokens = IncrementalTokenCounter(provider)
+
+    def start(self) -> None:
+        self.start_time = time.perf_counter()
+
+    def record_chunk(self, text: str) -> None:
+        now = time.perf_counter()
+        if self.first_chunk_time is None:
+            self.first_chunk_time = now
+        else:
+            self.gaps.append(now - self.last_chunk_time)
+        self.last_chunk_time = now
+        self.chunk_count += 1
+        self.tokens.feed(text)
+
+    def finish(self, usage: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
+        """
+        Summarize the stream.
+
+        Args:
+            usage: Token usage reported by the provider, if any. Its output
+                   token count is preferred over the local tokenizer's.
+
+        Returns:
+            Dict: Metrics ready to be sent to the client and stored
+        """
+        end_time = time.perf_counter()
+        if self.start_time is None:
+            self.start_time = end_time
+
+        if usage and usage.get("output_tokens"):
+            output_tokens = usage["output_tokens"]
+            token_source = "provider"
+        else:
+            output_tokens = self.tokens.total()
+            token_source = "tokenizer"
+
+        ttfc = (self.first_chunk_time - self.start_time) if self.first_chunk_time is not None else None
+        # Generation rate is measured from the first chunk, so it is not skewed by queueing and prompt processing
+        generation_time = (self.last_chunk_time - self.first_chunk_time) if self.chunk_count > 1 else 0
+
+        metrics = {
+            "provider": self.provider,
+            "model": self.model,
+            "timestamp": time.time(),
+            "time_taken": end_time - self.start_time,
+            "time_to_first_chunk": ttfc,
+            "chunk_count": self.chunk_count,
+            "output_tokens": output_tokens,
+            "output_tokens_source": token_source,
+            "tokens_per_second": output_tokens / generation_time if generation_time > 0 else None,
+            "inter_chunk_gap": self._gap_stats(),
+        }
+        if usage:
+            # Input tokens and, where reported, prompt cache writes and reads
+            for key, value in usage.items():
+                if key != "output_tokens" and value is not None:
+                    metrics[key] = value
+        return metrics
+
+    def _gap_stats(self) -> Optional[Dict[str, float]]:
+        if not self.gaps:
+            return None
+        gaps = sorted(self.gaps)
+        return {
+            "mean": statistics.mean(gaps),
+            "p50": gaps[len(gaps) // 2],
+            "p95": gaps[min(len(gaps) - 1, int(len(gaps) * 0.95))],
+            "max": gaps[-1],
+        }
+
+
+class MetricsLog:
+    """Append-only JSON lines file of stream metrics, kept for later analysis."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def append(self, metrics: Dict[str, Any]) -> None:
+        try:
+            with self._lock, open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(metrics) + "\n")
+        except OSError as e:
+            print(f"Error writing stream metrics: {str(e)}")
+
+
+_metrics_log = None
+
+
+def get_metrics_log() -> MetricsLog:
+    """Get the process-wide stream metrics log in the data directory."""
+    global _metrics_log
+    if _metrics_log is None:
+        _metrics_log = MetricsLog(os.path.join(get_data_dir('metrics'), 'stream_metrics.jsonl'))
+    return _metrics_log
@@ -25,72 +25,85 @@ class FileEditor:
             Tuple of (is_valid, error_message, error_details)
             where error_details is a dictionary with additional context
         """
+        return self.validate_edits(file_path, [search_text])[1][0]
+
+    def validate_edits(self, file_path: str, search_texts: List[str]) -> Tuple[Optional[str], List[Tuple[bool, Optional[str], Optional[Dict]]]]:
+        """
+        Validate several search patterns against one file, reading it once.
+
+        Every search text is checked against the file as it is now, exactly as
+        validate_edit() would check it on its own.
+
+        Args:
+            file_path: Path to the file to check
+            search_texts: Texts to find (empty or #ENTIRE_FILE is always valid)
+
+        Returns:
+            Tuple of (content, results): the file content if it was read (None
+            otherwise), and one (is_valid, error_message, error_details) tuple
+            per search text
+        """
+        def error(error_type, message, **extra):
+            details = {'type': error_type, 'file': file_path, 'message': message, **extra}
+            return False, message, details
+
         try:
             # Convert to absolute path relative to root
             full_path = (self.root_dir / file_path).resolve()
-            error_details = None
 
             # Validate file location
             if not self._is_safe_path(full_path):
-                error_details = {
-                    'type': 'validation_error',
-                    'file': file_path,
-                    'message': f"File path {file_path} is outside root directory"
-                }
-                return False, error_details['message'], error_details
-
-            # Special cases that are always valid
-            if not search_text.strip() or search_text.strip() == "#ENTIRE_FILE":
-                return True, None, None
-
-            # File must exist for non-empty search text
-            if not full_path.exists():
-                error_details = {
-                    'type': 'validation_error',
-                    'file': file_path,
-                    'message': f"Cannot find search text in non-existent file: {file_path}"
-                }
-                return False, error_details['message'], error_details
-
-            # Read file content
-            try:
-                content = self._read_file(full_path)
-            except UnicodeDecodeError:
-                error_details = {
-                    'type': 'validation_error',
-                    'file': file_path,
-                    'message': f"Unable to read {file_path} - file may be binary or use unknown encoding"
-                }
-                return False, error_details['message'], error_details
-
-            # Normalize line endings for comparison
-            content = content.replace('\r\n', '\n')
-            search_text = search_text.replace('\r\n', '\n')
-
-            # Check if search text exists in content
-            if search_text not in content:
-                # Create search preview for error context
-                search_preview = search_text[:50] + \
-                    "..." if len(search_text) > 50 else search_text
-                search_preview = search_preview.replace('\n', '\\n')
-
-                error_details = {
-                    'type': 'validation_error',
-                    'file': file_path,
-                    'message': f"Could not find exact match for search text in {file_path}",
-                    'search_preview': search_preview
-                }
-                return False, error_details['message'], error_details
-
-            return True, None, None
+                return None, [error('validation_error', f"File path {file_path} is outside root directory")
+                              for _ in search_texts]
+
+            exists = full_path.exists()
+            content = None
+            read_error = None
+            results = []
+            for search_text in search_texts:
+                # Special cases that are always valid
+                if not search_text.strip() or search_text.strip() == "#ENTIRE_FILE":
+                    results.append((True, None, None))
+                    continue
+
+                # File must exist for non-empty search text
+                if not exists:
+                    results.append(error('validation_error',
+                                         f"Cannot find search text in non-existent file: {file_path}"))
+                    continue
+
+                # Read file content once for all search texts
+                if content is None and read_error is None:
+                    try:
+                        content = self._read_file(full_path)
+                    except UnicodeDecodeError:
+                        read_error = f"Unable to read {file_path} - file may be binary or use unknown encoding"
+                if read_error is not None:
+                    results.append(error('validation_error', read_error))
+                    continue
+
+                # Normalize line endings for comparison
+                normalized_content = content.replace('\r\n', '\n')
+                search_text = search_text.replace('\r\n', '\n')
+
+                # Check if search text exists in content
+                if search_text not in normalized_content:
+                    # Create search preview for error context
+                    search_preview = search_text[:50] + \
+                        "..." if len(search_text) > 50 else search_text
+                    search_preview = search_preview.replace('\n', '\\n')
+
+                    results.append(error('validation_error',
+                                         f"Could not find exact match for search text in {file_path}",
+                                         search_preview=search_preview))
+                    continue
+
+                results.append((True, None, None))
+
+            return content, results
 
         except Exception as e:
-            error_details = {
-                'type': 'validation_exception',
-                'file': file_path,
-                'message': str(e)
-            }
-            return False, str(e), error_details
+            return None, [error('validation_exception', str(e)) for _ in search_texts]
 
     def validate_move(self, source_path: str, dest_path: str) -> Tuple[bool, Optional[str]]:
         """
@@ -239,6 +252,65 @@ class FileEditor:
         except Exception as e:
             return False, str(e)
 
+    def apply_edits(self, file_path: str, edits: List[Tuple[str, str]],
+                    content: Optional[str] = None) -> List[Tuple[bool, Optional[str]]]:
+        """
+        Apply several edits to one file: the file is read once, the edits are
+        applied in order to the in-memory content, and the result is written
+        once, atomically. Each edit sees the content as left by the previous
+        ones, as if apply_edit() had been called for each in turn.
+
+        Args:
+            file_path: Path to the file to edit
+            edits: (search_text, replace_text) pairs, in order
+            content: The file's current content, if the caller already read it
+
+        Returns:
+            List of (success, error_message) tuples, one per edit
+        """
+        try:
+            # Convert to absolute path relative to root
+            full_path = (self.root_dir / file_path).resolve()
+
+            # Validate file location
+            if not self._is_safe_path(full_path):
+                return [(False, f"File path {file_path} is outside root directory")] * len(edits)
+
+            exists = content is not None or full_path.exists()
+            if content is None and exists:
+                try:
+                    content = self._read_file(full_path)
+                except UnicodeDecodeError:
+                    return [(False, f"Unable to read {file_path} - file may be binary or use unknown encoding")] * len(edits)
+
+            results = []
+            for search_text, replace_text in edits:
+                # A file that does not exist yet can only be created or appended to
+                if not exists and search_text.strip():
+                    results.append((False, f"Cannot find search text in non-existent file: {file_path}"))
+                    continue
+
+                new_content = self.apply_replacement(content or "", search_text, replace_text)
+                if new_content is None:
+                    results.append((False, f"Could not find exact match for search text in {file_path}"))
+                    continue
+
+                content = new_content
+                exists = True
+                results.append((True, None))
+
+            # Nothing changed, nothing to write
+            if not any(success for success, _ in results):
+                return results
+
+            success, error_msg = self._write_file_safely(full_path, content)
+            if not success:
+                return [(False, error_msg) if ok else (ok, message) for ok, message in results]
+            return results
+
+        except Exception as e:
+            return [(False, str(e))] * len(edits)
+
     def _is_safe_path(self, file_path: Path) -> bool:
         """Check if a file path is within the root directory"""
         try:
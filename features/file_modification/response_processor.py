@@ -1,4 +1,5 @@
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Tuple, Dict, List, Optional
 
@@ -6,6 +7,12 @@ from features.file_modification.models import EditBlock, MoveOperation
 from features.file_modification.response_parser import ResponseParser
 from features.file_modification.file_editor import FileEditor
 
+# Files validated and edited at the same time. Off by default: on a local
+# disk the work is CPU-bound search matching and a pool only adds overhead.
+# Raise it for slow or network filesystems, where file I/O dominates and
+# releases the GIL (see benchmarks/bench_parallel_edits.py).
+EDIT_WORKERS = int(os.getenv('PROMPTER_EDIT_WORKERS', 1))
+
 
 class ClaudeResponseProcessor:
     """Processes Claude's code edit responses and applies the changes to files"""
@@ -73,65 +80,125 @@ class ClaudeResponseProcessor:
                 blocks_by_file[block.file_path] = []
             blocks_by_file[block.file_path].append(block)
 
-        # Process each file
-        for file_path, blocks in blocks_by_file.items():
-            validation_errors = self._validate_file_blocks(file_path, blocks)
-
-            # If any validation errors, record them and skip this file
-            if validation_errors:
-                validation_failure = {
-                    'file': file_path,
-                    'errors': validation_errors,
-                    'block_count': len(blocks)
-                }
-                self.results['validation_failures'].append(validation_failure)
-                self.results['error_count'] += len(validation_errors)
-                self.results['files_skipped'].append(file_path)
-
-                # Add a summary error for this file
-                self.results['errors'].append({
-                    'type': 'file_validation_failed',
-                    'file': file_path,
-                    'message': f"File skipped: {len(validation_errors)} of {len(blocks)} edit blocks failed validation",
-                    'details': [e['message'] for e in validation_errors]
-                })
+        # Process files concurrently; their edits are independent. Paths that
+        # resolve to the same file are kept together in one task, in order.
+        units = {}
+        for file_path in blocks_by_file:
+            units.setdefault(self._file_key(file_path), []).append(file_path)
 
-                continue
+        def process_unit(file_paths):
+            return [self._process_file(file_path, blocks_by_file[file_path]) for file_path in file_paths]
 
-            # All validations passed, apply the edits
-            for block in blocks:
-                try:
-                    success, error_msg = self.file_editor.apply_edit(
-                        block.file_path,
-                        block.search_text,
-                        block.replace_text
-                    )
-
-                    if success:
-                        if block.file_path not in self.results['edited_files']:
-                            self.results['edited_files'].append(
-                                block.file_path)
-                        self.results['success_count'] += 1
-                    else:
-                        self.results['errors'].append({
-                            'type': 'edit_error',
-                            'file': block.file_path,
-                            'message': error_msg,
-                            'line': block.line_number
-                        })
-                        self.results['error_count'] += 1
-
-                except Exception as e:
-                    self.results['errors'].append({
-                        'type': 'execution_error',
-                        'file': block.file_path,
-                        'message': str(e),
-                        'line': block.line_number
-                    })
-                    self.results['error_count'] += 1
+        if len(units) > 1 and EDIT_WORKERS > 1:
+            with ThreadPoolExecutor(max_workers=min(EDIT_WORKERS, len(units))) as executor:
+                unit_outcomes = list(executor.map(process_unit, units.values()))
+        else:
+            unit_outcomes = [process_unit(file_paths) for file_paths in units.values()]
+
+        outcomes = {}
+        for file_paths, file_outcomes in zip(units.values(), unit_outcomes):
+            outcomes.update(zip(file_paths, file_outcomes))
+
+        # Merge in response order, so results do not depend on completion order
+        for file_path in blocks_by_file:
+            outcome = outcomes[file_path]
+            for edited_file in outcome['edited_files']:
+                if edited_file not in self.results['edited_files']:
+                    self.results['edited_files'].append(edited_file)
+            for key in ('errors', 'validation_failures', 'files_skipped'):
+                self.results[key].extend(outcome[key])
+            self.results['success_count'] += outcome['success_count']
+            self.results['error_count'] += outcome['error_count']
 
         return self.results
 
+    def _file_key(self, file_path: str) -> str:
+        """Identity of the file a path refers to, for grouping concurrent work."""
+        try:
+            return str((self.root_dir / file_path).resolve())
+        except Exception:
+            return file_path
+
+    def _process_file(self, file_path: str, blocks: List[EditBlock]) -> Dict:
+        """
+        Validate and apply all edit blocks of one file. Safe to run
+        concurrently for different files: it only touches this file and
+        returns its results instead of recording them in self.results.
+
+        Args:
+            file_path: Path to the file
+            blocks: Edit blocks for the file, in response order
+
+        Returns:
+            Dict: This file's edited_files, errors, validation_failures,
+                  files_skipped, success_count and error_count
+        """
+        outcome = {
+            'edited_files': [],
+            'errors': [],
+            'validation_failures': [],
+            'files_skipped': [],
+            'success_count': 0,
+            'error_count': 0
+        }
+
+        content, validation_errors = self._validate_file_blocks(file_path, blocks)
+
+        # If any validation errors, record them and skip this file
+        if validation_errors:
+            validation_failure = {
+                'file': file_path,
+                'errors': validation_errors,
+                'block_count': len(blocks)
+            }
+            outcome['validation_failures'].append(validation_failure)
+            outcome['error_count'] += len(validation_errors)
+            outcome['files_skipped'].append(file_path)
+
+            # Add a summary error for this file
+            outcome['errors'].append({
+                'type': 'file_validation_failed',
+                'file': file_path,
+                'message': f"File skipped: {len(validation_errors)} of {len(blocks)} edit blocks failed validation",
+                'details': [e['message'] for e in validation_errors]
+            })
+
+            return outcome
+
+        # All validations passed, apply the edits in one read and one write
+        try:
+            edit_results = self.file_editor.apply_edits(
+                file_path,
+                [(block.search_text, block.replace_text) for block in blocks],
+                content
+            )
+        except Exception as e:
+            for block in blocks:
+                outcome['errors'].append({
+                    'type': 'execution_error',
+                    'file': block.file_path,
+                    'message': str(e),
+                    'line': block.line_number
+                })
+            outcome['error_count'] += len(blocks)
+            return outcome
+
+        for block, (success, error_msg) in zip(blocks, edit_results):
+            if success:
+                if block.file_path not in outcome['edited_files']:
+                    outcome['edited_files'].append(block.file_path)
+                outcome['success_count'] += 1
+            else:
+                outcome['errors'].append({
+                    'type': 'edit_error',
+                    'file': block.file_path,
+                    'message': error_msg,
+                    'line': block.line_number
+                })
+                outcome['error_count'] += 1
+
+        return outcome
+
     def _process_move_operations(self, move_operations: List[MoveOperation]) -> None:
         """
         Process file move operations before applying edits.
@@ -193,49 +260,52 @@ class ClaudeResponseProcessor:
                 })
                 self.results['error_count'] += 1
 
-    def _validate_file_blocks(self, file_path: str, blocks: List[EditBlock]) -> List[Dict]:
+    def _validate_file_blocks(self, file_path: str, blocks: List[EditBlock]) -> Tuple[Optional[str], List[Dict]]:
         """
         Validate all search blocks for a file before applying any changes.
-        Uses enhanced validation results from FileEditor.
+        Uses enhanced validation results from FileEditor; the file is read once
+        for all blocks.
 
         Args:
             file_path: Path to the file
             blocks: List of edit blocks for the file
 
         Returns:
-            List of validation error dictionaries
+            Tuple of (content, validation_errors): the file content read during
+            validation (None if it was not read) and the validation error
+            dictionaries
         """
         validation_errors = []
 
-        for i, block in enumerate(blocks):
-            try:
-                is_valid, error_msg, error_details = self.file_editor.validate_edit(
-                    block.file_path,
-                    block.search_text
-                )
+        try:
+            content, results = self.file_editor.validate_edits(
+                file_path,
+                [block.search_text for block in blocks]
+            )
+        except Exception as e:
+            return None, [{
+                'type': 'validation_exception',
+                'file': block.file_path,
+                'message': str(e),
+                'line': block.line_number,
+                'block_index': i
+            } for i, block in enumerate(blocks)]
 
-                if not is_valid:
-                    if error_details:
-                        # Use the rich error details from validate_edit
-                        error_details['line'] = block.line_number
-                        error_details['block_index'] = i
-                        validation_errors.append(error_details)
-                    else:
-                        # Fallback in case error_details is None
-                        validation_errors.append({
-                            'type': 'validation_error',
-                            'file': block.file_path,
-                            'message': error_msg,
-                            'line': block.line_number,
-                            'block_index': i
-                        })
-            except Exception as e:
-                validation_errors.append({
-                    'type': 'validation_exception',
-                    'file': block.file_path,
-                    'message': str(e),
-                    'line': block.line_number,
-                    'block_index': i
-                })
+        for i, (block, (is_valid, error_msg, error_details)) in enumerate(zip(blocks, results)):
+            if not is_valid:
+                if error_details:
+                    # Use the rich error details from validate_edits
+                    error_details['line'] = block.line_number
+                    error_details['block_index'] = i
+                    validation_errors.append(error_details)
+                else:
+                    # Fallback in case error_details is None
+                    validation_errors.append({
+                        'type': 'validation_error',
+                        'file': block.file_path,
+                        'message': error_msg,
+                        'line': block.line_number,
+                        'block_index': i
+                    })
 
-        return validation_errors
\ No newline at end of file
+        return content, validation_errors
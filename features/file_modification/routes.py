@@ -1,4 +1,5 @@
 from flask import request, jsonify, current_app
+from utils.telemetry import timed_route
 
 
 def register_file_modification_routes(app, scanner):
@@ -10,6 +11,7 @@ def register_file_modification_routes(app, scanner):
         scanner: Scanner instance for file operations
     """
     @app.route('/api/process_claude_response', methods=['POST'])
+    @timed_route('edits.process')
     def process_claude_response():
         """Process the response from Claude to modify files using XML format"""
         claude_response = request.form.get('claude_response', '')
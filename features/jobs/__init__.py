@@ -0,0 +1 @@
+# jobs feature package
@@ -0,0 +1,227 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from features.ai.providers import AIProvider
+from features.jobs.models import (
+    TASK_CANCELLED, TASK_COMPLETED, TASK_FAILED, TASK_PENDING, TASK_RUNNING, Job, JobTask
+)
+from utils.helpers import get_data_dir
+
+DEFAULT_JOB_WORKERS = int(os.getenv('PROMPTER_JOB_WORKERS', 4))
+
+
+class JobManager:
+    """
+    Runs batch prompt jobs on a bounded worker pool.
+
+    Every task of every job goes through one shared ThreadPoolExecutor, so
+    at most max_workers prompts are in flight at once no matter how many
+    jobs are submitted; the provider's admission control still applies on
+    top. Job state is written to <jobs_dir>/<id>.json whenever a task
+    changes state, and the prompts once to <id>.prompts.json, so results
+    survive a restart and can be fetched after the job finished.
+    """
+
+    def __init__(self, jobs_dir: str = None, max_workers: int = DEFAULT_JOB_WORKERS,
+                 provider_factory: Callable[[str], AIProvider] = AIProvider):
+        """
+        Args:
+            jobs_dir: Directory for job files (default: <data dir>/jobs)
+            max_workers: Number of prompts run concurrently across all jobs
+            provider_factory: Creates the provider for a task from its name
+        """
+        self.jobs_dir = jobs_dir or get_data_dir('jobs')
+        os.makedirs(self.jobs_dir, exist_ok=True)
+        self.max_workers = max_workers
+        self.provider_factory = provider_factory
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='prompter-job')
+        self._jobs: Dict[str, Job] = {}
+        # Guards job and task state; file writes happen outside it
+        self._lock = threading.Lock()
+        # Serializes writes of the same job file, so an older state cannot overwrite a newer one
+        self._save_lock = threading.Lock()
+        self._load_jobs()
+
+    def submit(self, prompts: List[Tuple[str, Optional[str]]], provider: str,
+               reasoning_effort: str = "medium", name: str = None) -> Job:
+        """
+        Create a job and queue its prompts.
+
+        Args:
+            prompts: (prompt, label) pairs; the label identifies the task in results
+            provider: AI provider every prompt is sent to
+            reasoning_effort: Reasoning effort for the provider
+            name: Optional display name of the job
+
+        Returns:
+            Job: The queued job
+        """
+        job = Job(
+            id=uuid.uuid4().hex,
+            provider=provider,
+            reasoning_effort=reasoning_effort,
+            name=name,
+            created_at=time.time(),
+            tasks=[JobTask(index=i, prompt=prompt, label=label)
+                   for i, (prompt, label) in enumerate(prompts)],
+        )
+        with self._lock:
+            self._jobs[job.id] = job
+
+        self._write_json(self._prompts_path(job.id), [task.prompt for task in job.tasks])
+        self._save(job)
+
+        for task in job.tasks:
+            self._executor.submit(self._run_task, job, task)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list_jobs(self) -> List[Job]:
+        """All known jobs, newest first."""
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return sorted(jobs, key=lambda job: job.created_at, reverse=True)
+
+    def to_dict(self, job: Job, include_results: bool = True) -> Dict:
+        """Serialize a job consistently while workers may be updating it."""
+        with self._lock:
+            return job.to_dict(include_results)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """
+        Cancel a job. Pending tasks are cancelled right away; tasks already
+        running are allowed to finish and keep their result.
+
+        Returns:
+            Job: The job, or None if no job with this id exists
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            job.cancel_requested = True
+            now = time.time()
+            for task in job.tasks:
+                if task.status == TASK_PENDING:
+                    task.status = TASK_CANCELLED
+                    task.finished_at = now
+            self._mark_finished(job)
+        self._save(job)
+        return job
+
+    def _run_task(self, job: Job, task: JobTask) -> None:
+        """Worker: send one prompt to the provider and record the outcome."""
+        with self._lock:
+            if task.status != TASK_PENDING:
+                # Cancelled while queued
+                return
+            task.status = TASK_RUNNING
+            task.started_at = time.time()
+        self._save(job)
+
+        try:
+            ai_provider = self.provider_factory(job.provider)
+            ai_provider.set_reasoning_effort(job.reasoning_effort)
+            response = ai_provider.prompt(task.prompt)
+            with self._lock:
+                task.text = response.get("text")
+                task.input_tokens = response.get("input_tokens", 0)
+                task.output_tokens = response.get("output_tokens", 0)
+                task.status = TASK_COMPLETED
+        except Exception as e:
+            print(f"Job {job.id} task {task.index} failed: {str(e)}")
+            with self._lock:
+                task.error = str(e)
+                task.status = TASK_FAILED
+
+        with self._lock:
+            task.finished_at = time.time()
+            task.time_taken = task.finished_at - task.started_at
+            self._mark_finished(job)
+        self._save(job)
+
+    @staticmethod
+    def _mark_finished(job: Job) -> None:
+        """Record the finish time once every task has finished (caller holds the lock)."""
+        if job.finished_at is None and all(task.finished for task in job.tasks):
+            job.finished_at = time.time()
+
+    def _job_path(self, job_id: str) -> str:
+        return os.path.join(self.jobs_dir, f"{job_id}.json")
+
+    def _prompts_path(self, job_id: str) -> str:
+        return os.path.join(self.jobs_dir, f"{job_id}.prompts.json")
+
+    def _save(self, job: Job) -> None:
+        """Persist the job's state and results (the prompts are stored separately)."""
+        with self._save_lock:
+            with self._lock:
+                data = job.to_dict()
+            try:
+                self._write_json(self._job_path(job.id), data)
+            except OSError as e:
+                print(f"Error saving job {job.id}: {str(e)}")
+
+    def _write_json(self, path: str, data) -> None:
+        """Write a JSON file atomically, so readers never see a partial file."""
+        fd, tmp_path = tempfile.mkstemp(dir=self.jobs_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _load_jobs(self) -> None:
+        """
+        Load jobs saved by previous runs. Their unfinished tasks cannot be
+        resumed (the worker threads are gone), so they are marked failed.
+        """
+        for entry in os.scandir(self.jobs_dir):
+            if not entry.name.endswith('.json') or entry.name.endswith('.prompts.json'):
+                continue
+            try:
+                with open(entry.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                job = Job.from_dict(data)
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                print(f"Error loading job file {entry.name}: {str(e)}")
+                continue
+
+            interrupted = [task for task in job.tasks if not task.finished]
+            for task in interrupted:
+                task.status = TASK_FAILED
+                task.error = "Interrupted by server restart"
+                task.finished_at = time.time()
+            self._mark_finished(job)
+            self._jobs[job.id] = job
+            if interrupted:
+                self._save(job)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker pool; queued tasks that have not started are dropped."""
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+
+_job_manager: Optional[JobManager] = None
+_job_manager_lock = threading.Lock()
+
+
+def get_job_manager() -> JobManager:
+    """Get the process-wide job manager, creating it on first use."""
+    global _job_manager
+    with _job_manager_lock:
+        if _job_manager is None:
+            _job_manager = JobManager()
+        return _job_manager
@@ -0,0 +1,305 @@
+import math
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from features.ai.providers import AIProvider
+from features.prompt_generation.helpers import format_file_entry, format_prompt
+
+# Token budget of one shard's file content. Leaves room in the smallest
+# context windows (64k) for the instructions and the answer.
+DEFAULT_SHARD_TOKENS = int(os.getenv('PROMPTER_SHARD_TOKENS', 48000))
+DEFAULT_FAN_OUT = int(os.getenv('PROMPTER_MAP_REDUCE_FAN_OUT', 4))
+
+MAP_NOTE = (
+    "Note: the selected files were split into {count} parts because together they "
+    "exceed the context window. This is part {number} of {count}. Answer based on the "
+    "files in this part only; the answers for all parts will be combined afterwards."
+)
+
+REDUCE_INSTRUCTION = (
+    "The instructions below were run separately over {count} parts of a set of files "
+    "that was too large to send at once. Combine the partial answers above into one "
+    "complete answer to the instructions: merge overlapping content, resolve "
+    "contradictions and do not mention the parts."
+)
+
+MISSING_PARTS_NOTE = (
+    "However, {missing} of the {count} parts could not be processed and have no "
+    "partial answer. Start your answer by saying that it is incomplete and does "
+    "not cover the files in the missing part(s)."
+)
+
+
+@dataclass
+class Shard:
+    """A group of file entries that fits in one prompt"""
+    index: int
+    entries: List[str] = field(default_factory=list)
+    files: List[str] = field(default_factory=list)
+    tokens: int = 0
+
+
+@dataclass
+class CallResult:
+    """Outcome of one map or reduce call"""
+    provider: str
+    text: Optional[str] = None
+    error: Optional[str] = None
+    input_tokens: int = 0
+    output_tokens: int = 0
+    time_taken: float = 0.0
+
+
+def plan_shards(scanner, files: List[str], max_tokens: int = DEFAULT_SHARD_TOKENS) -> List[Shard]:
+    """
+    Split a file selection into shards of at most max_tokens tokens.
+
+    Files are packed in selection order, so files that were selected
+    together (usually from the same directory) stay in the same shard. A
+    file larger than a whole shard is split by lines into parts.
+
+    Args:
+        scanner: Scanner used to read files and count tokens
+        files: Relative paths of the selected files
+        max_tokens: Token budget of a shard's file entries
+
+    Returns:
+        List[Shard]: Shards in file order
+
+    Raises:
+        ValueError: If a path is outside the project or does not exist
+    """
+    shards: List[Shard] = []
+    current = Shard(index=0)
+
+    def add(entry, file_path, tokens):
+        nonlocal current
+        if current.entries and current.tokens + tokens > max_tokens:
+            shards.append(current)
+            current = Shard(index=len(shards))
+        current.entries.append(entry)
+        if file_path not in current.files:
+            current.files.append(file_path)
+        current.tokens += tokens
+
+    for file_path in files:
+        if not scanner.is_project_path(file_path):
+            raise ValueError(f"File is outside the project directory: {file_path}")
+        content = scanner.get_file_contents(file_path)
+        if content is None:
+            raise ValueError(f"File not found: {file_path}")
+
+        entry = format_file_entry(file_path, content)
+        tokens = scanner.count_text_tokens(entry)
+        if tokens <= max_tokens:
+            add(entry, file_path, tokens)
+            continue
+
+        for entry, tokens in _split_file(scanner, file_path, content, tokens, max_tokens):
+            add(entry, file_path, tokens)
+
+    if current.entries:
+        shards.append(current)
+    return shards
+
+
+def _split_file(scanner, file_path: str, content: str, tokens: int, max_tokens: int):
+    """Split an oversized file into line ranges that each fit in a shard."""
+    lines = content.splitlines(keepends=True)
+    parts = math.ceil(tokens / max_tokens)
+    while True:
+        size = math.ceil(len(lines) / parts)
+        ranges = [(start, min(start + size, len(lines))) for start in range(0, len(lines), size)]
+        entries = []
+        for number, (start, end) in enumerate(ranges, 1):
+            note = f"part {number} of {len(ranges)}, lines {start + 1}-{end}"
+            entry = format_file_entry(file_path, "".join(lines[start:end]).rstrip("\n"), note)
+            entries.append((entry, scanner.count_text_tokens(entry)))
+        # Lines are rarely uniform in size; retry with more parts until all fit
+        if all(count <= max_tokens for _, count in entries) or size == 1:
+            return entries
+        parts += 1
+
+
+def _stage_stats(results: List[CallResult], wall_time: float) -> Dict[str, Any]:
+    """Latency and token totals of one stage."""
+    return {
+        "calls": len(results),
+        "failed": sum(1 for result in results if result.error),
+        "wall_time": wall_time,
+        "max_call_time": max((result.time_taken for result in results), default=0.0),
+        "input_tokens": sum(result.input_tokens for result in results),
+        "output_tokens": sum(result.output_tokens for result in results),
+    }
+
+
+class MapReduce:
+    """
+    Runs an instruction over a selection too large for one context window.
+
+    Map: every shard is sent with the instruction, spread round-robin over
+    the given providers, at most fan_out calls at a time. Reduce: the
+    partial answers are combined by the reduce provider; if they are
+    themselves too large for one prompt they are reduced in groups first,
+    as many rounds as needed.
+    """
+
+    def __init__(self, providers: List[str], instruction: str, reduce_provider: str = None,
+                 reasoning_effort: str = "medium", fan_out: int = DEFAULT_FAN_OUT,
+                 max_tokens: int = DEFAULT_SHARD_TOKENS, count_tokens: Callable[[str], int] = None,
+                 provider_factory: Callable[[str], AIProvider] = AIProvider):
+        """
+        Args:
+            providers: Providers the map calls are spread over
+            instruction: The user's instructions, applied to every shard
+            reduce_provider: Provider of the reduce calls (default: the first provider)
+            reasoning_effort: Reasoning effort for every call
+            fan_out: Maximum number of concurrent calls
+            max_tokens: Token budget of one prompt's content, also used for reduce prompts
+            count_tokens: Token counter for reduce prompts (default: ~4 characters per token)
+            provider_factory: Creates an AIProvider from its name
+        """
+        if not providers:
+            raise ValueError("At least one provider is required")
+        self.providers = providers
+        self.instruction = instruction
+        self.reduce_provider = reduce_provider or providers[0]
+        self.reasoning_effort = reasoning_effort
+        self.fan_out = max(1, fan_out)
+        self.max_tokens = max_tokens
+        self.count_tokens = count_tokens or (lambda text: len(text) // 4)
+        self.provider_factory = provider_factory
+
+    def _call(self, provider: str, prompt: str) -> CallResult:
+        result = CallResult(provider=provider)
+        start = time.perf_counter()
+        try:
+            ai_provider = self.provider_factory(provider)
+            ai_provider.set_reasoning_effort(self.reasoning_effort)
+            response = ai_provider.prompt(prompt)
+            result.text = response.get("text")
+            result.input_tokens = response.get("input_tokens", 0)
+            result.output_tokens = response.get("output_tokens", 0)
+        except Exception as e:
+            print(f"Map-reduce call to {provider} failed: {str(e)}")
+            result.error = str(e)
+        result.time_taken = time.perf_counter() - start
+        return result
+
+    def _map_prompt(self, shard: Shard, count: int) -> str:
+        instruction = self.instruction
+        if count > 1:
+            instruction += "\n\n" + MAP_NOTE.format(count=count, number=shard.index + 1)
+        return format_prompt(shard.entries, instruction)
+
+    def _reduce_prompt(self, partials: List[str], count: int, missing: List[int] = None) -> str:
+        prompt = "".join(f"### Partial answer {number}:\n\n{text}\n\n"
+                         for number, text in enumerate(partials, 1))
+        instruction = REDUCE_INSTRUCTION.format(count=count)
+        if missing:
+            instruction += " " + MISSING_PARTS_NOTE.format(
+                missing="part " + ", ".join(str(number) for number in missing), count=count)
+        instruction += "\n\n" + self.instruction
+        return prompt + format_prompt([], instruction)
+
+    def _group_partials(self, partials: List[str]) -> List[List[str]]:
+        """Group partial answers so each group's reduce prompt fits the budget."""
+        groups, current, tokens = [], [], 0
+        for text in partials:
+            size = self.count_tokens(text)
+            if current and tokens + size > self.max_tokens:
+                groups.append(current)
+                current, tokens = [], 0
+            current.append(text)
+            tokens += size
+        groups.append(current)
+        # Two partials per group at least, or reducing would never converge
+        if len(groups) == len(partials) and len(partials) > 1:
+            groups = [partials[i:i + 2] for i in range(0, len(partials), 2)]
+        return groups
+
+    def run(self, shards: List[Shard]) -> Dict[str, Any]:
+        """
+        Run the map and reduce stages.
+
+        Args:
+            shards: Shards from plan_shards()
+
+        Returns:
+            dict: The final text, per-shard results, per-stage latency and
+                  token totals, and the overall totals. If some map calls
+                  failed, the answer covers the other shards only:
+                  "incomplete" is set and "failed_shards" lists the failed
+                  shard indexes.
+
+        Raises:
+            ValueError: If there are no shards, every map call failed or the
+                        reduce failed
+        """
+        if not shards:
+            raise ValueError("No files to process")
+        start = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.fan_out) as executor:
+            map_start = time.perf_counter()
+            map_results = list(executor.map(
+                lambda shard: self._call(self.providers[shard.index % len(self.providers)],
+                                         self._map_prompt(shard, len(shards))),
+                shards))
+            stages = {"map": _stage_stats(map_results, time.perf_counter() - map_start)}
+
+            partials = [result.text for result in map_results if not result.error]
+            if not partials:
+                raise ValueError(f"Every map call failed; first error: {map_results[0].error}")
+            failed_shards = [shard.index for shard, result in zip(shards, map_results) if result.error]
+            # Parts are numbered from 1 in the prompts
+            missing = [index + 1 for index in failed_shards]
+
+            # One shard needs no reduce; its answer is already complete
+            reduce_results: List[CallResult] = []
+            reduce_rounds = 0
+            reduce_start = time.perf_counter()
+            while len(shards) > 1 and (reduce_rounds == 0 or len(partials) > 1):
+                groups = self._group_partials(partials) if len(partials) > 1 else [partials]
+                results = list(executor.map(
+                    lambda group: self._call(self.reduce_provider,
+                                             self._reduce_prompt(group, len(shards), missing)),
+                    groups))
+                reduce_results.extend(results)
+                reduce_rounds += 1
+                failed = [result for result in results if result.error]
+                if failed:
+                    raise ValueError(f"Reduce call failed: {failed[0].error}")
+                partials = [result.text for result in results]
+
+        if reduce_rounds:
+            stages["reduce"] = _stage_stats(reduce_results, time.perf_counter() - reduce_start)
+            stages["reduce"]["rounds"] = reduce_rounds
+
+        all_results = map_results + reduce_results
+        return {
+            "text": partials[0],
+            "shards": [
+                {
+                    "index": shard.index,
+                    "files": shard.files,
+                    "tokens": shard.tokens,
+                    "provider": result.provider,
+                    "time_taken": result.time_taken,
+                    "input_tokens": result.input_tokens,
+                    "output_tokens": result.output_tokens,
+                    "error": result.error,
+                }
+                for shard, result in zip(shards, map_results)
+            ],
+            "stages": stages,
+            "incomplete": bool(failed_shards),
+            "failed_shards": failed_shards,
+            "fan_out": self.fan_out,
+            "time_taken": time.perf_counter() - start,
+            "input_tokens": sum(result.input_tokens for result in all_results),
+            "output_tokens": sum(result.output_tokens for result in all_results),
+        }
@@ -0,0 +1,123 @@
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+
+# Task states; a task only moves forward through them
+TASK_PENDING = "pending"
+TASK_RUNNING = "running"
+TASK_COMPLETED = "completed"
+TASK_FAILED = "failed"
+TASK_CANCELLED = "cancelled"
+
+TASK_FINISHED_STATES = (TASK_COMPLETED, TASK_FAILED, TASK_CANCELLED)
+
+
+@dataclass
+class JobTask:
+    """One prompt of a batch job and its result"""
+    index: int
+    prompt: str
+    label: Optional[str] = None
+    status: str = TASK_PENDING
+    text: Optional[str] = None
+    error: Optional[str] = None
+    input_tokens: int = 0
+    output_tokens: int = 0
+    time_taken: float = 0.0
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in TASK_FINISHED_STATES
+
+    def to_dict(self, include_prompt: bool = True) -> Dict[str, Any]:
+        data = asdict(self)
+        if not include_prompt:
+            del data['prompt']
+        return data
+
+
+@dataclass
+class Job:
+    """
+    A batch of prompts sent to one provider.
+    The job status is derived from the task states, so it is never out of sync.
+    """
+    id: str
+    provider: str
+    reasoning_effort: str = "medium"
+    name: Optional[str] = None
+    created_at: float = 0.0
+    finished_at: Optional[float] = None
+    cancel_requested: bool = False
+    tasks: List[JobTask] = field(default_factory=list)
+
+    @property
+    def status(self) -> str:
+        """
+        pending, running, cancelled, or once every task has finished:
+        completed, completed_with_errors or failed
+        """
+        counts = self.progress()
+        if counts['finished'] < counts['total']:
+            if self.cancel_requested:
+                return "cancelling"
+            return "running" if counts['finished'] or counts[TASK_RUNNING] else "pending"
+        if self.cancel_requested and counts[TASK_CANCELLED]:
+            return "cancelled"
+        if counts[TASK_FAILED] == 0:
+            return "completed"
+        return "failed" if counts[TASK_COMPLETED] == 0 else "completed_with_errors"
+
+    def progress(self) -> Dict[str, int]:
+        """Number of tasks in each state"""
+        counts = {state: 0 for state in (TASK_PENDING, TASK_RUNNING) + TASK_FINISHED_STATES}
+        for task in self.tasks:
+            counts[task.status] += 1
+        counts['total'] = len(self.tasks)
+        counts['finished'] = sum(counts[state] for state in TASK_FINISHED_STATES)
+        return counts
+
+    def to_dict(self, include_results: bool = True) -> Dict[str, Any]:
+        """
+        Serialize the job. Prompts are left out; they can be large and are
+        stored separately.
+
+        Args:
+            include_results: Include the tasks (texts and errors); the job
+                             list only needs the summary
+
+        Returns:
+            dict: JSON-serializable job data
+        """
+        input_tokens = sum(task.input_tokens for task in self.tasks)
+        output_tokens = sum(task.output_tokens for task in self.tasks)
+        data = {
+            'id': self.id,
+            'name': self.name,
+            'provider': self.provider,
+            'reasoning_effort': self.reasoning_effort,
+            'status': self.status,
+            'created_at': self.created_at,
+            'finished_at': self.finished_at,
+            'cancel_requested': self.cancel_requested,
+            'progress': self.progress(),
+            'input_tokens': input_tokens,
+            'output_tokens': output_tokens,
+        }
+        if include_results:
+            data['tasks'] = [task.to_dict(include_prompt=False) for task in self.tasks]
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Job":
+        return cls(
+            id=data['id'],
+            provider=data['provider'],
+            reasoning_effort=data.get('reasoning_effort', 'medium'),
+            name=data.get('name'),
+            created_at=data.get('created_at', 0.0),
+            finished_at=data.get('finished_at'),
+            cancel_requested=data.get('cancel_requested', False),
+            tasks=[JobTask(prompt=task.pop('prompt', ''), **task) for task in data.get('tasks', [])],
+        )
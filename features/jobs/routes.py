@@ -0,0 +1,217 @@
+from flask import request, jsonify
+from features.ai.models import get_model_registry
+from features.ai.providers import AIProvider
+from features.jobs.manager import get_job_manager
+from features.jobs.map_reduce import DEFAULT_FAN_OUT, DEFAULT_SHARD_TOKENS, MapReduce, plan_shards
+from features.prompt_generation.helpers import format_file_entry, format_prompt
+
+# Upper bound on prompts per job, so one request cannot queue an unbounded batch
+MAX_JOB_TASKS = 500
+
+
+def register_job_routes(app, scanner):
+    """
+    Register routes for batch prompt jobs.
+
+    Args:
+        app: Flask application instance
+        scanner: Scanner instance for reading the files of each group
+    """
+
+    def _read_project_file(file_path):
+        """Read a file of the project, or raise ValueError"""
+        if not scanner.is_project_path(file_path):
+            raise ValueError(f"File is outside the project directory: {file_path}")
+        content = scanner.get_file_contents(file_path)
+        if content is None:
+            raise ValueError(f"File not found: {file_path}")
+        return content
+
+    def _build_group_prompt(files, instruction):
+        """Build a prompt in the same layout as the UI's generated prompts"""
+        entries = [format_file_entry(file_path, _read_project_file(file_path)) for file_path in files]
+        return format_prompt(entries, instruction)
+
+    def _parse_prompts(data):
+        """Get (prompt, label) pairs from a job request, or raise ValueError"""
+        if data.get('prompts') is not None:
+            prompts = []
+            for item in data['prompts']:
+                if isinstance(item, str):
+                    prompts.append((item, None))
+                elif isinstance(item, dict) and item.get('prompt'):
+                    prompts.append((item['prompt'], item.get('label')))
+                else:
+                    raise ValueError("Each prompt must be a string or an object with a 'prompt' field")
+            return prompts
+
+        instruction = data.get('instruction')
+        groups = data.get('groups')
+        if not instruction or not groups:
+            raise ValueError("Provide either 'prompts' or 'instruction' and 'groups'")
+        prompts = []
+        for group in groups:
+            files = group.get('files') if isinstance(group, dict) else None
+            if not files:
+                raise ValueError("Each group must have a non-empty 'files' list")
+            label = group.get('label') or ", ".join(files)
+            prompts.append((_build_group_prompt(files, instruction), label))
+        return prompts
+
+    @app.route('/api/jobs', methods=['POST'])
+    def create_job():
+        """
+        Submit a batch job. Prompts run on a bounded worker pool; poll
+        /api/jobs/<id> for progress and results.
+
+        Expected request format:
+        {
+            "provider": "openai" | "anthropic" | ... (default "anthropic"),
+            "reasoning_effort": "low" | "medium" | "high" (optional),
+            "name": "Document modules" (optional),
+            "prompts": ["prompt", {"prompt": "prompt", "label": "label"}, ...]
+        }
+        or, to run one instruction over groups of project files:
+        {
+            "provider": "openai",
+            "instruction": "Document every public function",
+            "groups": [{"label": "scanner", "files": ["utils/scanner.py"]}, ...]
+        }
+
+        Returns:
+            JSON with the job summary, status 202
+        """
+        try:
+            data = request.get_json()
+            if not data:
+                return jsonify({'error': 'No data provided'}), 400
+
+            provider = data.get('provider', 'anthropic')
+            reasoning_effort = data.get('reasoning_effort', 'medium')
+            if reasoning_effort not in ("low", "medium", "high"):
+                return jsonify({'error': 'Invalid reasoning effort. Must be one of: low, medium, high'}), 400
+
+            try:
+                # Fails early for unknown providers or missing API keys
+                AIProvider(provider)
+                prompts = _parse_prompts(data)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+
+            if not prompts:
+                return jsonify({'error': 'No prompts provided'}), 400
+            if len(prompts) > MAX_JOB_TASKS:
+                return jsonify({'error': f'Too many prompts; a job can have at most {MAX_JOB_TASKS}'}), 400
+
+            manager = get_job_manager()
+            job = manager.submit(prompts, provider, reasoning_effort, data.get('name'))
+            print(f"Submitted job {job.id}: {len(prompts)} prompts for {provider}")
+            return jsonify(manager.to_dict(job, include_results=False)), 202
+
+        except Exception as e:
+            print(f"Error creating job: {str(e)}")
+            return jsonify({'error': str(e)}), 500
+
+    @app.route('/api/jobs', methods=['GET'])
+    def list_jobs():
+        """List jobs (summaries without results), newest first."""
+        manager = get_job_manager()
+        return jsonify({'jobs': [manager.to_dict(job, include_results=False) for job in manager.list_jobs()]})
+
+    @app.route('/api/jobs/<job_id>', methods=['GET'])
+    def get_job(job_id):
+        """
+        Get a job's status, progress and the results of finished tasks.
+        Tasks that have not finished yet are included with their status.
+        """
+        manager = get_job_manager()
+        job = manager.get(job_id)
+        if job is None:
+            return jsonify({'error': f'Unknown job: {job_id}'}), 404
+        return jsonify(manager.to_dict(job))
+
+    @app.route('/api/jobs/<job_id>/cancel', methods=['POST'])
+    def cancel_job(job_id):
+        """Cancel a job's pending tasks; running tasks finish and keep their results."""
+        manager = get_job_manager()
+        job = manager.cancel(job_id)
+        if job is None:
+            return jsonify({'error': f'Unknown job: {job_id}'}), 404
+        return jsonify(manager.to_dict(job, include_results=False))
+
+    @app.route('/api/map_reduce', methods=['POST'])
+    def map_reduce():
+        """
+        Run an instruction over a file selection larger than a context window:
+        the files are split into shards by token count, the instruction runs
+        over every shard in parallel, and the partial answers are combined.
+
+        Expected request format:
+        {
+            "files": ["utils/scanner.py", ...],
+            "instruction": "Summarize the architecture",
+            "providers": ["openai", "anthropic"] (map calls are spread over them),
+            "reduce_provider": "openai" (optional, default the first provider),
+            "reasoning_effort": "low" | "medium" | "high" (optional),
+            "fan_out": 4 (optional, maximum concurrent calls),
+            "shard_tokens": 48000 (optional, token budget per shard; by default
+                            half the smallest provider context window, at most 48000),
+            "plan_only": false (optional, only return the shard plan)
+        }
+
+        Returns:
+            JSON with the final text, per-shard results and per-stage
+            latency and token totals; "incomplete" and "failed_shards" report
+            shards whose map call failed and are missing from the answer
+        """
+        try:
+            data = request.get_json()
+            if not data:
+                return jsonify({'error': 'No data provided'}), 400
+
+            files = data.get('files')
+            instruction = data.get('instruction')
+            if not files or not instruction:
+                return jsonify({'error': "'files' and 'instruction' are required"}), 400
+
+            providers = data.get('providers') or [data.get('provider', 'anthropic')]
+            if isinstance(providers, str):
+                providers = [providers]
+            reduce_provider = data.get('reduce_provider') or providers[0]
+            reasoning_effort = data.get('reasoning_effort', 'medium')
+            if reasoning_effort not in ("low", "medium", "high"):
+                return jsonify({'error': 'Invalid reasoning effort. Must be one of: low, medium, high'}), 400
+
+            try:
+                fan_out = int(data.get('fan_out', DEFAULT_FAN_OUT))
+                # By default, shards fit the smallest context window among the providers
+                default_shard_tokens = min(
+                    [DEFAULT_SHARD_TOKENS] + [get_model_registry().prompt_budget(provider) // 2
+                                              for provider in set(providers) | {reduce_provider}
+                                              if get_model_registry().get(provider)])
+                shard_tokens = int(data.get('shard_tokens', default_shard_tokens))
+                if fan_out < 1 or shard_tokens < 1:
+                    raise ValueError("'fan_out' and 'shard_tokens' must be positive")
+                for provider in set(providers) | {reduce_provider}:
+                    AIProvider(provider)
+                shards = plan_shards(scanner, files, shard_tokens)
+            except (TypeError, ValueError) as e:
+                return jsonify({'error': str(e)}), 400
+
+            if data.get('plan_only'):
+                return jsonify({'shards': [
+                    {'index': shard.index, 'files': shard.files, 'tokens': shard.tokens}
+                    for shard in shards
+                ]})
+
+            print(f"Map-reduce over {len(files)} files in {len(shards)} shards "
+                  f"with {', '.join(providers)} (fan-out {fan_out})")
+            pipeline = MapReduce(providers, instruction, reduce_provider=reduce_provider,
+                                 reasoning_effort=reasoning_effort, fan_out=fan_out,
+                                 max_tokens=shard_tokens, count_tokens=scanner.count_text_tokens)
+            return jsonify(pipeline.run(shards))
+
+        except Exception as e:
+            error_message = f"Error running map-reduce: {str(e)}"
+            print(error_message)
+            return jsonify({'error': error_message}), 500
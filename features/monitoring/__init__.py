@@ -0,0 +1 @@
+# monitoring feature package
@@ -0,0 +1,53 @@
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from utils.tokenizers import tokenizer_registry
+
+
+class StartupWarmup:
+    """
+    Work done once at startup before the service reports ready: loading the
+    tokenizer encodings and walking the project tree once (see
+    Scanner.warm_up()). Runs on a daemon thread so startup is not delayed.
+    """
+
+    def __init__(self, scanner):
+        self.scanner = scanner
+        self.ready = threading.Event()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.error: Optional[str] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self.started_at = time.time()
+        self._thread = threading.Thread(target=self._run, name="startup-warmup", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        try:
+            tokenizer_registry.preload()
+            self.scanner.warm_up()
+        except Exception as e:
+            # A failed warm-up only costs the first requests some latency
+            print(f"Error during startup warm-up: {str(e)}")
+            self.error = str(e)
+        self.finished_at = time.time()
+        self.ready.set()
+
+    def wait(self, timeout: float = None) -> bool:
+        """Block until the warm-up has finished. Returns False on timeout."""
+        return self.ready.wait(timeout)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Warm-up state for the readiness endpoint."""
+        return {
+            "ready": self.ready.is_set(),
+            "duration": (self.finished_at - self.started_at) if self.finished_at else None,
+            "tokenizers_loaded": tokenizer_registry.loaded_encodings(),
+            "index_generation": self.scanner.index_generation,
+            "error": self.error,
+        }
@@ -0,0 +1,152 @@
+"""
+Prometheus text exposition (format 0.0.4) of Prompter's own metrics.
+
+Written by hand rather than with prometheus_client, which is not a
+dependency: a handful of counters, gauges and one histogram family is all
+the scrape endpoint needs.
+"""
+import os
+import sys
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from features.ai.admission import admission_metrics
+from features.ai.generations import generation_registry
+from utils.tokenizers import tokenizer_registry
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+# Request latency histogram buckets, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _number(value: float) -> str:
+    if value == float('inf'):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class RouteLatency:
+    """Request latency histogram per route, method and status code."""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        # (route, method, status) -> [bucket counts..., count, sum]
+        self._series: Dict[Tuple[str, str, str], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, route: str, method: str, status: int, seconds: float) -> None:
+        key = (route, method, str(status))
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * len(self.buckets) + [0, 0.0]
+            for index, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    series[index] += 1
+            series[-2] += 1
+            series[-1] += seconds
+
+    def lines(self, name: str) -> List[str]:
+        with self._lock:
+            series = {key: list(values) for key, values in self._series.items()}
+        lines = [f"# HELP {name} Time from request start to response headers, per route.",
+                 f"# TYPE {name} histogram"]
+        for (route, method, status), values in sorted(series.items()):
+            labels = {"route": route, "method": method, "status": status}
+            for bound, count in zip(self.buckets + (float('inf'),), values[:len(self.buckets)] + [values[-2]]):
+                lines.append(f"{name}_bucket{_labels({**labels, 'le': _number(bound)})} {count}")
+            lines.append(f"{name}_count{_labels(labels)} {values[-2]}")
+            lines.append(f"{name}_sum{_labels(labels)} {_number(values[-1])}")
+        return lines
+
+
+def process_rss_bytes() -> Optional[int]:
+    """Current resident set size of this process, or None if it cannot be read."""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pass
+    if resource is None:
+        return None
+    try:
+        # Peak rather than current RSS, where /proc is unavailable (macOS: bytes, Linux: KiB)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+    except (AttributeError, ValueError):
+        return None
+
+
+def _family(name: str, kind: str, help_text: str, samples: Iterable[Tuple[Dict[str, str], float]]) -> List[str]:
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    lines.extend(f"{name}{_labels(labels)} {_number(value)}" for labels, value in samples)
+    return lines
+
+
+def render_metrics(route_latency: RouteLatency, scanner, warmup=None) -> str:
+    """
+    Render every metric in Prometheus text format.
+
+    Args:
+        route_latency: Per-route latency histogram
+        scanner: Scanner whose cache and index counters are reported
+        warmup: StartupWarmup, for the readiness gauge
+
+    Returns:
+        str: The exposition text
+    """
+    lines = route_latency.lines("prompter_http_request_duration_seconds")
+
+    cache = scanner.cache_stats()
+    lookups = cache["outline_hits"] + cache["outline_misses"]
+    lines += _family("prompter_scanner_cache_hits_total", "counter", "Scanner cache hits.",
+                     [({"cache": "outline"}, cache["outline_hits"])])
+    lines += _family("prompter_scanner_cache_misses_total", "counter", "Scanner cache misses.",
+                     [({"cache": "outline"}, cache["outline_misses"])])
+    lines += _family("prompter_scanner_cache_hit_ratio", "gauge", "Scanner cache hit ratio since startup.",
+                     [({"cache": "outline"}, cache["outline_hits"] / lookups if lookups else 0.0)])
+    lines += _family("prompter_index_generation", "gauge",
+                     "Number of distinct project tree states seen by the scanner.",
+                     [({}, scanner.index_generation)])
+
+    lines += _family("prompter_tokenizer_queue_depth", "gauge",
+                     "Token counts waiting for a tokenizer encoding to load.",
+                     [({}, tokenizer_registry.waiting)])
+    lines += _family("prompter_tokenizer_encodings_loaded", "gauge", "Tokenizer encodings loaded.",
+                     [({}, tokenizer_registry.loaded_encodings())])
+
+    admission = admission_metrics()
+    lines += _family("prompter_provider_requests_in_flight", "gauge",
+                     "Provider requests and streams currently admitted.",
+                     [({"provider": provider}, stats["in_flight"]) for provider, stats in sorted(admission.items())])
+    lines += _family("prompter_provider_queue_depth", "gauge", "Provider requests waiting for admission.",
+                     [({"provider": provider}, stats["queue_depth"]) for provider, stats in sorted(admission.items())])
+    lines += _family("prompter_active_generations", "gauge", "Streamed generations in progress.",
+                     [({}, generation_registry.active_count())])
+
+    rss = process_rss_bytes()
+    if rss is not None:
+        lines += _family("prompter_process_resident_memory_bytes", "gauge", "Resident memory size in bytes.",
+                         [({}, rss)])
+
+    if warmup is not None:
+        lines += _family("prompter_ready", "gauge", "1 once the startup warm-up has finished.",
+                         [({}, int(warmup.ready.is_set()))])
+
+    return "\n".join(lines) + "\n"
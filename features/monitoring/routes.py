@@ -0,0 +1,87 @@
+import time
+
+from flask import Response, current_app, g, request, jsonify
+from features.monitoring.prometheus import CONTENT_TYPE, RouteLatency, render_metrics
+from utils.telemetry import get_telemetry
+
+# Longest a /readyz?wait= request may block
+MAX_READY_WAIT = 30.0
+
+
+def register_monitoring_routes(app, scanner):
+    """
+    Register routes reporting request telemetry, Prometheus metrics and health.
+
+    Args:
+        app: Flask application instance
+        scanner: Scanner instance whose cache and index counters are exported
+    """
+    route_latency = RouteLatency()
+
+    @app.before_request
+    def start_request_timer():
+        g.request_start = time.perf_counter()
+
+    @app.after_request
+    def record_request_latency(response):
+        start = g.get('request_start')
+        if start is not None:
+            # Label by route pattern, not path, so the number of series stays bounded
+            route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+            route_latency.observe(route, request.method, response.status_code, time.perf_counter() - start)
+        return response
+
+    @app.route('/api/metrics', methods=['GET'])
+    def get_metrics():
+        """
+        Latency percentiles (p50/p95/p99) per operation and per provider.
+
+        Query parameters:
+            window: Seconds of history to include (default one day)
+            operation: Only report this operation, e.g. "ai.stream"
+        """
+        try:
+            window = float(request.args.get('window', 86400))
+        except ValueError:
+            return jsonify({'error': 'window must be a number of seconds'}), 400
+        if window <= 0:
+            return jsonify({'error': 'window must be positive'}), 400
+
+        try:
+            return jsonify(get_telemetry().percentiles(window, request.args.get('operation')))
+        except Exception as e:
+            print(f"Error reading telemetry: {str(e)}")
+            return jsonify({'error': str(e)}), 500
+
+    @app.route('/metrics', methods=['GET'])
+    def prometheus_metrics():
+        """Metrics in Prometheus text format, for scraping."""
+        text = render_metrics(route_latency, scanner, current_app.config.get('WARMUP'))
+        return Response(text, content_type=CONTENT_TYPE)
+
+    @app.route('/healthz', methods=['GET'])
+    def healthz():
+        """Liveness: the process is up and serving requests."""
+        return jsonify({'status': 'ok'})
+
+    @app.route('/readyz', methods=['GET'])
+    def readyz():
+        """
+        Readiness: 200 once the startup warm-up has finished, 503 before.
+
+        Query parameters:
+            wait: Seconds to wait for the warm-up before answering (default 0)
+        """
+        warmup = current_app.config.get('WARMUP')
+        if warmup is None:
+            return jsonify({'status': 'ready'})
+
+        try:
+            wait = min(max(float(request.args.get('wait', 0)), 0.0), MAX_READY_WAIT)
+        except ValueError:
+            return jsonify({'error': 'wait must be a number of seconds'}), 400
+
+        ready = warmup.wait(wait) if wait else warmup.ready.is_set()
+        state = warmup.snapshot()
+        state['status'] = 'ready' if ready else 'warming'
+        return jsonify(state), 200 if ready else 503
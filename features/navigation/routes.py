@@ -1,5 +1,7 @@
 import os
 from flask import request, jsonify, current_app
+from utils.conditional import make_etag, not_modified, with_etag
+from utils.telemetry import timed_route
 
 
 def register_navigation_routes(app, scanner):
@@ -12,6 +14,7 @@ def register_navigation_routes(app, scanner):
     """
 
     @app.route('/api/search_files', methods=['POST'])
+    @timed_route('search')
     def search_files():
         """Search for files containing the specified text"""
         search_query = request.form.get('search_query', '')
@@ -29,6 +32,7 @@ def register_navigation_routes(app, scanner):
             return jsonify({'error': str(e)}), 500
 
     @app.route('/api/get_folder_contents', methods=['POST'])
+    @timed_route('tree.folder')
     def get_folder_contents():
         """Get contents of a folder for the dynamic tree view"""
         folder_path = request.form.get('folder_path', '')
@@ -36,6 +40,13 @@ def register_navigation_routes(app, scanner):
         # No need to return an error for the root directory
 
         try:
+            # Listings include recursive token counts, so the whole subtree matters
+            etag = make_etag('folder_contents', folder_path,
+                             scanner.get_tree_fingerprint(folder_path))
+            cached = not_modified(etag)
+            if cached is not None:
+                return cached
+
             dirs, files = scanner.get_folder_contents(folder_path)
 
             # Convert to serializable dictionaries
@@ -59,19 +70,26 @@ def register_navigation_routes(app, scanner):
                     'token_count': f.token_count
                 })
 
-            return jsonify({
+            return with_etag(jsonify({
                 'dirs': dirs_json,
                 'files': files_json
-            })
+            }), etag)
 
         except Exception as e:
             return jsonify({'error': str(e)}), 500
 
     @app.route('/api/get_complete_folder_tree', methods=['POST'])
+    @timed_route('tree.build')
     def get_complete_folder_tree():
         """Get the complete folder tree including all nested directories and files"""
         root_path = request.form.get('root_path', '')
 
+        etag = make_etag('complete_folder_tree', root_path,
+                         scanner.get_tree_fingerprint(root_path))
+        cached = not_modified(etag)
+        if cached is not None:
+            return cached
+
         # Structure to hold the tree
         tree = {'name': root_path or 'Root',
                 'path': root_path, 'dirs': [], 'files': []}
@@ -114,7 +132,7 @@ def register_navigation_routes(app, scanner):
         # Build the complete tree
         build_tree_recursive(root_path, tree)
 
-        return jsonify(tree)
+        return with_etag(jsonify(tree), etag)
 
     @app.route('/api/get_folder_token_count', methods=['POST'])
     def get_folder_token_count():
@@ -1,3 +1,6 @@
+from utils.helpers import get_language_type
+
+
 def _collect_files_recursive(scanner, path, file_list):
     """
     Helper function to collect files recursively from a directory.
@@ -65,3 +68,37 @@ def generate_directory_structure(scanner, max_depth=None):
     _build_tree("")
     
     return "\n".join(result)
+
+
+def format_file_entry(file_path, content, note=None):
+    """
+    Format one file the way the generated prompt lists files.
+
+    Args:
+        file_path: Relative path of the file
+        content: File content (or part of it)
+        note: Optional note shown after the path, e.g. "part 1 of 3"
+
+    Returns:
+        str: The file entry, ending with a blank line
+    """
+    suffix = f" ({note})" if note else ""
+    return f"File: {file_path}{suffix}\n```{get_language_type(file_path)}\n{content}\n```\n\n"
+
+
+def format_prompt(file_entries, instruction):
+    """
+    Assemble a prompt from formatted file entries and the user's instructions,
+    in the same layout as prompts generated in the UI.
+
+    Args:
+        file_entries: Entries from format_file_entry()
+        instruction: The user's instructions
+
+    Returns:
+        str: The prompt
+    """
+    prompt = ""
+    if file_entries:
+        prompt += "### List of files:\n\n" + "".join(file_entries)
+    return prompt + "### User Instructions:\n\n" + instruction + "\n\n"
@@ -1,7 +1,14 @@
 from flask import render_template, request, session, redirect, url_for, jsonify
 from utils.helpers import get_language_type
+from utils.transforms import TRANSFORMS
+from utils.snapshots import SnapshotStore, hash_content
+from utils.conditional import make_etag, not_modified, with_etag
+from utils.telemetry import timed_route
 from features.prompt_generation.helpers import _collect_files_recursive, generate_directory_structure
 
+# Ways a selected file can be rendered into the prompt
+RENDER_MODES = ['full', 'outline']
+
 
 def register_prompt_generation_routes(app, scanner):
     """
@@ -11,6 +18,8 @@ def register_prompt_generation_routes(app, scanner):
         app: Flask application instance
         scanner: Scanner instance for file operations
     """
+    # Content-hash snapshots of assembled file data for "changes only" prompts
+    snapshot_store = SnapshotStore()
 
     @app.route('/')
     def index():
@@ -21,26 +30,100 @@ def register_prompt_generation_routes(app, scanner):
         return render_template('main.html')
 
     @app.route('/api/directory-structure', methods=['POST'])
+    @timed_route('tree.structure')
     def api_directory_structure():
         """API endpoint to get the project directory structure"""
         # Get the max depth parameter from the request, default to 5
         max_depth = request.form.get('max_depth', 5, type=int)
 
+        etag = make_etag('directory_structure', max_depth,
+                         scanner.get_tree_fingerprint(""))
+        cached = not_modified(etag)
+        if cached is not None:
+            return cached
+
         # Generate the directory structure
         directory_structure = generate_directory_structure(
             scanner, max_depth=max_depth)
 
         # Return the directory structure as JSON
-        return jsonify({
+        return with_etag(jsonify({
             'directory_structure': directory_structure
+        }), etag)
+
+    def _file_entry(file_path, content, mode):
+        """Build the file-data entry for a single rendered file"""
+        return {
+            'path': file_path,
+            'language': get_language_type(file_path),
+            'content': content,
+            'render_mode': mode
+        }
+
+    def _render_outline(file_path):
+        """Render a file as an outline, or return None if no outline is available"""
+        outline = scanner.get_file_outline(file_path)
+        if not outline or not outline.strip():
+            return None
+
+        original_tokens = scanner.count_text_tokens(
+            scanner.get_file_contents(file_path))
+        outline_tokens = scanner.count_text_tokens(outline)
+
+        file_entry = _file_entry(file_path, outline, 'outline')
+        file_entry.update({
+            'original_token_count': original_tokens,
+            'token_count': outline_tokens,
+            'tokens_saved': original_tokens - outline_tokens
         })
+        return file_entry
 
     @app.route('/api/file-data', methods=['POST'])
+    @timed_route('files.read')
     def api_file_data():
-        """API endpoint to get the content of requested files"""
+        """
+        API endpoint to get the content of requested files.
+
+        Optional form fields:
+            render_mode: 'full' (default) or 'outline' for every file
+            outline_files: individual files to render as outlines
+            transforms: token-reducing transforms applied to fully rendered files
+            since_snapshot: snapshot id; files unchanged since that snapshot are
+                            replaced by a short reference line
+        """
         # Get selected files and folders from the request
         selected_files = request.form.getlist('selected_files')
         selected_folders = request.form.getlist('selected_folder')
+        render_mode = request.form.get('render_mode', 'full')
+        outline_files = set(request.form.getlist('outline_files'))
+        transforms = request.form.getlist('transforms')
+        since_snapshot = request.form.get('since_snapshot', '')
+
+        if render_mode not in RENDER_MODES:
+            return jsonify({'error': f"Invalid render mode. Must be one of: {', '.join(RENDER_MODES)}"}), 400
+
+        invalid_transforms = [t for t in transforms if t not in TRANSFORMS]
+        if invalid_transforms:
+            return jsonify({'error': f"Invalid transform(s): {', '.join(invalid_transforms)}. Must be one of: {', '.join(TRANSFORMS)}"}), 400
+
+        # Looked up before the ETag check: whether the snapshot still exists
+        # (it is lost on restart or eviction) changes the response
+        previous_hashes = snapshot_store.get(
+            since_snapshot) if since_snapshot else None
+
+        # The response depends only on the request parameters, the state of
+        # the selected files and folders, which are cheap to fingerprint, and
+        # whether since_snapshot is still known
+        etag = make_etag(
+            'file_data',
+            sorted(request.form.items(multi=True)),
+            scanner.get_files_fingerprint(selected_files),
+            [scanner.get_tree_fingerprint(folder) for folder in sorted(selected_folders)],
+            previous_hashes is not None
+        )
+        cached = not_modified(etag)
+        if cached is not None:
+            return cached
 
         # Process folders to get all files within them
         folder_files = []
@@ -56,17 +139,55 @@ def register_prompt_generation_routes(app, scanner):
 
         # Prepare file data
         file_data = []
+        total_tokens_saved = 0
+        transform_totals = {name: 0 for name in transforms}
         for file_path in all_selected_files:
-            file_content = scanner.get_file_contents(file_path)
-            if file_content is not None:
-                language_type = get_language_type(file_path)
-                file_data.append({
-                    'path': file_path,
-                    'language': language_type,
-                    'content': file_content
-                })
+            file_entry = None
+
+            if render_mode == 'outline' or file_path in outline_files:
+                file_entry = _render_outline(file_path)
+                if file_entry is not None:
+                    total_tokens_saved += file_entry['tokens_saved']
+
+            # Fall back to the full content when no outline is available
+            if file_entry is None and transforms:
+                file_content, tokens_removed = scanner.get_transformed_contents(
+                    file_path, transforms)
+                if file_content is not None:
+                    file_entry = _file_entry(file_path, file_content, 'full')
+                    file_entry['tokens_removed'] = tokens_removed
+                    for name, count in tokens_removed.items():
+                        transform_totals[name] += count
+                    total_tokens_saved += sum(tokens_removed.values())
+            elif file_entry is None:
+                file_content = scanner.get_file_contents(file_path)
+                if file_content is not None:
+                    file_entry = _file_entry(file_path, file_content, 'full')
+
+            if file_entry is not None:
+                file_data.append(file_entry)
+
+        # Record a snapshot of what was rendered and, if requested, replace
+        # files that have not changed since the previous snapshot
+        file_hashes = {f['path']: hash_content(f['content']) for f in file_data}
+        unchanged_count = 0
+
+        if previous_hashes is not None:
+            for file_entry in file_data:
+                if previous_hashes.get(file_entry['path']) == file_hashes[file_entry['path']]:
+                    file_entry['unchanged'] = True
+                    file_entry['content'] = f"[Unchanged since the previous prompt: {file_entry['path']}]"
+                    unchanged_count += 1
+
+        snapshot_id = snapshot_store.record(file_hashes)
 
         # Return file data as JSON
-        return jsonify({
-            'files': file_data
-        })
+        return with_etag(jsonify({
+            'files': file_data,
+            'snapshot_id': snapshot_id,
+            'since_snapshot': since_snapshot or None,
+            'snapshot_found': previous_hashes is not None,
+            'unchanged_count': unchanged_count,
+            'tokens_saved': total_tokens_saved,
+            'transform_tokens_removed': transform_totals
+        }), etag)
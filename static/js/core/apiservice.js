@@ -72,10 +72,13 @@ const ApiService = (function () {
    */
   function streamPromptToAI(prompt, provider = "anthropic", reasoningEffort = "medium", onChunk, onComplete, onError) {
     console.log("Streaming prompt with settings:", { provider, reasoningEffort });
+    // Named up front so the generation can be cancelled server-side at any time
+    const generationId = Utilities.generateId();
     const requestData = {
       prompt: prompt,
       provider: provider,
       reasoning_effort: reasoningEffort,
+      generation_id: generationId,
     };
 
     // Create a fetch request to set up the event stream
@@ -99,8 +102,24 @@ const ApiService = (function () {
         const reader = response.body.getReader();
         const decoder = new TextDecoder("utf-8");
 
-        // Storage for incomplete event data
-        let buffer = "";
+        // Parses complete events out of the decoded text as it arrives
+        const pushText = Utilities.createSSEParser((event, data) => {
+          // Handle different event types
+          if (event === "message" && data && onChunk) {
+            onChunk(data);
+          } else if (event === "metrics" && data) {
+            try {
+              const metrics = JSON.parse(data);
+              console.log("Stream metrics:", metrics);
+            } catch (e) {
+              console.error("Error parsing metrics:", e);
+            }
+          } else if (event === "error" && data && onError) {
+            onError(data);
+          } else if (event === "done" && onComplete) {
+            onComplete();
+          }
+        });
 
         // Function to process the stream
         function processStream() {
@@ -113,47 +132,8 @@ const ApiService = (function () {
                 return;
               }
 
-              // Decode the chunk and add it to our buffer
-              buffer += decoder.decode(value, { stream: true });
-
-              // Process complete events in the buffer
-              let eventEnd = buffer.indexOf("\n\n");
-              while (eventEnd >= 0) {
-                const eventData = buffer.substring(0, eventEnd);
-                buffer = buffer.substring(eventEnd + 2);
-
-                // Parse the event data
-                const eventLines = eventData.split("\n");
-                let event = "message";
-                let data = "";
-
-                for (const line of eventLines) {
-                  if (line.startsWith("event: ")) {
-                    event = line.substring(7);
-                  } else if (line.startsWith("data: ")) {
-                    data = line.substring(6);
-                  }
-                }
-
-                // Handle different event types
-                if (event === "message" && data && onChunk) {
-                  onChunk(data);
-                } else if (event === "metrics" && data) {
-                  try {
-                    const metrics = JSON.parse(data);
-                    console.log("Stream metrics:", metrics);
-                  } catch (e) {
-                    console.error("Error parsing metrics:", e);
-                  }
-                } else if (event === "error" && data && onError) {
-                  onError(data);
-                } else if (event === "done" && onComplete) {
-                  onComplete();
-                }
-
-                // Look for the next event
-                eventEnd = buffer.indexOf("\n\n");
-              }
+              // Decode the chunk and hand it to the parser
+              pushText(decoder.decode(value, { stream: true }));
 
               // Continue processing the stream
               return processStream();
@@ -172,7 +152,10 @@ const ApiService = (function () {
 
     // Return an object that can be used to cancel the stream
     return {
+      generationId,
       close: () => {
+        // Stop the upstream generation as well, not just this connection
+        fetch(`/api/cancel_generation/${generationId}`, { method: "POST" }).catch(() => {});
         controller.abort();
       },
     };
@@ -205,8 +205,103 @@ const Utilities = (function () {
     return true;
   }
 
+  // Cached JSON responses for conditional requests, keyed by URL and request body
+  const conditionalCache = new Map();
+
+  /**
+   * Fetch JSON with If-None-Match revalidation.
+   * The last response for the same URL and body is kept together with its ETag;
+   * when the server answers 304 Not Modified the cached data is returned instead.
+   * @param {string} url - Request URL
+   * @param {Object} options - fetch options (body may be FormData or URLSearchParams)
+   * @returns {Promise} Promise resolving to the parsed JSON response
+   */
+  function conditionalFetch(url, options = {}) {
+    const body = options.body instanceof FormData ? new URLSearchParams(options.body).toString() : String(options.body || "");
+    const cacheKey = `${options.method || "GET"} ${url} ${body}`;
+    const cached = conditionalCache.get(cacheKey);
+
+    const headers = Object.assign({}, options.headers);
+    if (cached) {
+      headers["If-None-Match"] = cached.etag;
+    }
+
+    return fetch(url, Object.assign({}, options, { headers })).then((response) => {
+      if (response.status === 304 && cached) {
+        return cached.data;
+      }
+
+      return response.json().then((data) => {
+        const etag = response.headers.get("ETag");
+        if (response.ok && etag) {
+          conditionalCache.set(cacheKey, { etag, data });
+        }
+        return data;
+      });
+    });
+  }
+
+  /**
+   * Create a random id, e.g. for naming a streamed generation before the server replies
+   * @returns {string} Id made of letters and digits
+   */
+  function generateId() {
+    if (window.crypto && window.crypto.randomUUID) {
+      return window.crypto.randomUUID().replace(/-/g, "");
+    }
+    return Date.now().toString(36) + Math.random().toString(36).substring(2);
+  }
+
+  /**
+   * Create an incremental Server-Sent Events parser.
+   * Text can be pushed in arbitrary pieces; complete events are passed to onEvent.
+   * Multi-line data fields are joined with newlines and comment lines (heartbeats) are skipped.
+   * @param {Function} onEvent - Called with (eventType, data) for every complete event
+   * @returns {Function} push(text) to feed decoded stream text into the parser
+   */
+  function createSSEParser(onEvent) {
+    let buffer = "";
+
+    return function push(text) {
+      buffer += text;
+      // Split once per read instead of re-slicing the buffer for every event
+      const blocks = buffer.split("\n\n");
+      buffer = blocks.pop();
+
+      for (const block of blocks) {
+        let event = "message";
+        const dataLines = [];
+
+        for (const line of block.split("\n")) {
+          if (line === "" || line.startsWith(":")) {
+            continue;
+          }
+          const colon = line.indexOf(":");
+          const field = colon < 0 ? line : line.substring(0, colon);
+          let value = colon < 0 ? "" : line.substring(colon + 1);
+          if (value.startsWith(" ")) {
+            value = value.substring(1);
+          }
+
+          if (field === "event") {
+            event = value;
+          } else if (field === "data") {
+            dataLines.push(value);
+          }
+        }
+
+        if (dataLines.length > 0 || event !== "message") {
+          onEvent(event, dataLines.join("\n"));
+        }
+      }
+    };
+  }
+
   // Public API
   return {
+    conditionalFetch,
+    createSSEParser,
+    generateId,
     showError,
     showSnackBar,
     formatFileSize,
@@ -9,8 +9,9 @@ const FileSelectorAPI = (function () {
    */
   function fetchDirectoryStructure() {
     // Using the correct endpoint from routes.py: /api/get_complete_folder_tree
-    // This will get all nested directories and files in one request
-    return fetch("/api/get_complete_folder_tree", {
+    // This will get all nested directories and files in one request.
+    // The server answers 304 when the tree is unchanged since the last fetch.
+    return Utilities.conditionalFetch("/api/get_complete_folder_tree", {
       method: "POST",
       headers: {
         "Content-Type": "application/x-www-form-urlencoded",
@@ -19,7 +20,6 @@ const FileSelectorAPI = (function () {
         root_path: "", // Empty string for root directory
       }),
     })
-      .then((response) => response.json())
       .then((data) => {
         // The response is already in the format expected by the FileSelector
         return data;
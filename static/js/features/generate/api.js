@@ -9,7 +9,7 @@ const GenerateAPI = (function () {
    */
   function fetchDirectoryStructureForPrompt() {
     // Use the directory-structure endpoint which already provides formatted output
-    return fetch("/api/directory-structure", {
+    return Utilities.conditionalFetch("/api/directory-structure", {
       method: "POST",
       headers: {
         "Content-Type": "application/x-www-form-urlencoded",
@@ -18,7 +18,6 @@ const GenerateAPI = (function () {
         max_depth: 5, // Use default depth of 5
       }),
     })
-      .then((response) => response.json())
       .then((data) => {
         // The directory structure is already formatted properly by the backend
         return data.directory_structure;
@@ -51,11 +50,10 @@ const GenerateAPI = (function () {
       });
     }
 
-    return fetch("/api/file-data", {
+    return Utilities.conditionalFetch("/api/file-data", {
       method: "POST",
       body: formData,
     })
-      .then((response) => response.json())
       .catch((error) => {
         console.error("Error fetching file data:", error);
         return { error: "Failed to load file data." };
@@ -142,7 +140,12 @@ const GenerateAPI = (function () {
         if (promiseResults.fileData && promiseResults.fileData.length > 0) {
           combinedContent += "### List of files:\n\n";
           promiseResults.fileData.forEach((file) => {
-            combinedContent += `File: ${file.path}\n\`\`\`${file.language}\n${file.content}\n\`\`\`\n\n`;
+            if (file.unchanged) {
+              combinedContent += `File: ${file.path} (unchanged since the previous prompt)\n\n`;
+              return;
+            }
+            const outlineNote = file.render_mode === "outline" ? " (outline)" : "";
+            combinedContent += `File: ${file.path}${outlineNote}\n\`\`\`${file.language}\n${file.content}\n\`\`\`\n\n`;
           });
         }
 
@@ -210,10 +213,13 @@ const GenerateAPI = (function () {
    */
   function streamPromptToAI(prompt, provider = "anthropic", reasoningEffort = "medium", onChunk, onComplete, onError) {
     console.log("Streaming prompt with settings:", { provider, reasoningEffort });
+    // Named up front so the generation can be cancelled server-side at any time
+    const generationId = Utilities.generateId();
     const requestData = {
       prompt: prompt,
       provider: provider,
       reasoning_effort: reasoningEffort,
+      generation_id: generationId,
     };
 
     // Create a fetch request to set up the event stream
@@ -237,8 +243,24 @@ const GenerateAPI = (function () {
         const reader = response.body.getReader();
         const decoder = new TextDecoder("utf-8");
 
-        // Storage for incomplete event data
-        let buffer = "";
+        // Parses complete events out of the decoded text as it arrives
+        const pushText = Utilities.createSSEParser((event, data) => {
+          // Handle different event types
+          if (event === "message" && data && onChunk) {
+            onChunk(data);
+          } else if (event === "metrics" && data) {
+            try {
+              const metrics = JSON.parse(data);
+              console.log("Stream metrics:", metrics);
+            } catch (e) {
+              console.error("Error parsing metrics:", e);
+            }
+          } else if (event === "error" && data && onError) {
+            onError(data);
+          } else if (event === "done" && onComplete) {
+            onComplete();
+          }
+        });
 
         // Function to process the stream
         function processStream() {
@@ -251,47 +273,8 @@ const GenerateAPI = (function () {
                 return;
               }
 
-              // Decode the chunk and add it to our buffer
-              buffer += decoder.decode(value, { stream: true });
-
-              // Process complete events in the buffer
-              let eventEnd = buffer.indexOf("\n\n");
-              while (eventEnd >= 0) {
-                const eventData = buffer.substring(0, eventEnd);
-                buffer = buffer.substring(eventEnd + 2);
-
-                // Parse the event data
-                const eventLines = eventData.split("\n");
-                let event = "message";
-                let data = "";
-
-                for (const line of eventLines) {
-                  if (line.startsWith("event: ")) {
-                    event = line.substring(7);
-                  } else if (line.startsWith("data: ")) {
-                    data = line.substring(6);
-                  }
-                }
-
-                // Handle different event types
-                if (event === "message" && data && onChunk) {
-                  onChunk(data);
-                } else if (event === "metrics" && data) {
-                  try {
-                    const metrics = JSON.parse(data);
-                    console.log("Stream metrics:", metrics);
-                  } catch (e) {
-                    console.error("Error parsing metrics:", e);
-                  }
-                } else if (event === "error" && data && onError) {
-                  onError(data);
-                } else if (event === "done" && onComplete) {
-                  onComplete();
-                }
-
-                // Look for the next event
-                eventEnd = buffer.indexOf("\n\n");
-              }
+              // Decode the chunk and hand it to the parser
+              pushText(decoder.decode(value, { stream: true }));
 
               // Continue processing the stream
               return processStream();
@@ -310,7 +293,10 @@ const GenerateAPI = (function () {
 
     // Return an object that can be used to cancel the stream
     return {
+      generationId,
       close: () => {
+        // Stop the upstream generation as well, not just this connection
+        fetch(`/api/cancel_generation/${generationId}`, { method: "POST" }).catch(() => {});
         controller.abort();
       },
     };
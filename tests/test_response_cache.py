@@ -0,0 +1,32 @@
+import os
+
+from features.ai.response_cache import ResponseCache
+
+
+def cache_size(cache):
+    return sum(entry.stat().st_size for entry in os.scandir(cache.cache_dir) if entry.name.endswith('.json'))
+
+
+def test_put_scans_cache_only_when_estimate_exceeds_limit(tmp_path, monkeypatch):
+    cache = ResponseCache(str(tmp_path), max_bytes=2000)
+    scans = []
+    evict = cache.evict
+    monkeypatch.setattr(cache, 'evict', lambda: (scans.append(1), evict()))
+
+    for i in range(10):
+        cache.put_response(f"key{i}", {'text': 'x' * 50})
+    # The first write scans to seed the estimate; the rest fit under the limit
+    assert len(scans) == 1
+
+    for i in range(100):
+        cache.put_response(f"more{i}", {'text': 'x' * 50})
+    assert 1 < len(scans) < 100
+    assert cache_size(cache) <= 2000
+
+
+def test_overwriting_entry_does_not_grow_estimate(tmp_path):
+    cache = ResponseCache(str(tmp_path), max_bytes=10_000)
+    for _ in range(20):
+        cache.put_response("same", {'text': 'x' * 50})
+    assert cache._size_estimate == cache_size(cache)
+    assert cache.get_response("same") == {'text': 'x' * 50}
@@ -0,0 +1,14 @@
+from utils.scanner import Scanner
+
+
+def test_transformed_contents_use_universal_newlines(tmp_path):
+    (tmp_path / "crlf.py").write_bytes(b"x = 1  \r\ny = 2\r\n")
+    scanner = Scanner(str(tmp_path))
+
+    assert scanner.get_file_contents("crlf.py") == "x = 1  \ny = 2\n"
+    # Same line endings as the untransformed content; only the transform's change differs
+    transformed, _ = scanner.get_transformed_contents("crlf.py", ["strip_trailing_whitespace"])
+    assert transformed == "x = 1\ny = 2\n"
+    unchanged, tokens_removed = scanner.get_transformed_contents("crlf.py", ["collapse_blank_lines"])
+    assert unchanged == "x = 1  \ny = 2\n"
+    assert tokens_removed == {"collapse_blank_lines": 0}
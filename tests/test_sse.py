@@ -0,0 +1,9 @@
+from features.ai.sse import SSEStream
+
+
+def test_batch_limit_counts_utf8_bytes():
+    # Each chunk is 4 characters but 12 bytes; the first chunk is always sent alone
+    chunks = ["日本語字"] * 5
+    stream = SSEStream(iter(chunks), coalesce_window=60, max_batch_bytes=24)
+    events = list(stream.data_events())
+    assert events == ["data: 日本語字\n\n", "data: 日本語字日本語字\n\n", "data: 日本語字日本語字\n\n"]
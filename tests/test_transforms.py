@@ -0,0 +1,49 @@
+from utils.transforms import apply_transforms
+
+
+def run(text, file_path, transforms):
+    return apply_transforms(text.splitlines(keepends=True), file_path, transforms)[0]
+
+
+def test_pascal_directives_are_kept():
+    source = (
+        "{$MODE OBJFPC}\n"
+        "{ a comment }\n"
+        "{$IFDEF DEBUG} writeln('d'); {$ENDIF}\n"
+        "(*$R+*)\n"
+        "(* old code *)\n"
+        "begin end.\n"
+    )
+    assert run(source, "unit.pas", ["strip_comments"]) == (
+        "{$MODE OBJFPC}\n"
+        "{$IFDEF DEBUG} writeln('d'); {$ENDIF}\n"
+        "(*$R+*)\n"
+        "begin end.\n"
+    )
+
+
+def test_pascal_directive_ends_license_header():
+    source = "{$MODE OBJFPC}\n// Copyright 2024\nbegin end.\n"
+    assert run(source, "unit.pas", ["strip_license_header"]) == source
+
+
+def test_vue_script_comments_are_stripped():
+    source = (
+        "<template>\n"
+        "<!-- note -->\n"
+        "<div/>\n"
+        "</template>\n"
+        "<script>\n"
+        "// secret comment\n"
+        "/* block */\n"
+        "export default {}\n"
+        "</script>\n"
+    )
+    assert run(source, "App.vue", ["strip_comments"]) == (
+        "<template>\n"
+        "<div/>\n"
+        "</template>\n"
+        "<script>\n"
+        "export default {}\n"
+        "</script>\n"
+    )
@@ -0,0 +1,129 @@
+"""
+Negotiated response compression for JSON and event-stream responses.
+
+gzip comes from the standard library; brotli is used when the optional
+`brotli` package is installed and the client prefers it. Streamed responses
+are compressed chunk by chunk with a sync flush after each chunk so
+server-sent events reach the client without extra delay.
+"""
+import zlib
+from typing import Iterable, Iterator, Optional
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # brotli is optional
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {
+    'application/json',
+    'text/event-stream',
+    'text/html',
+    'text/plain',
+    'text/css',
+    'text/javascript',
+    'application/javascript',
+}
+
+# Bodies smaller than this are not worth the compression overhead
+DEFAULT_MIN_SIZE = 1024
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+def supported_encodings() -> list:
+    """Content codings the server can produce, in order of preference."""
+    return ['br', 'gzip'] if brotli is not None else ['gzip']
+
+
+def choose_encoding() -> Optional[str]:
+    """Pick the best content coding accepted by the current request, if any."""
+    return request.accept_encodings.best_match(supported_encodings())
+
+
+def compress_body(data: bytes, encoding: str) -> bytes:
+    """Compress a complete response body."""
+    if encoding == 'br':
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+    return compressor.compress(data) + compressor.flush()
+
+
+def compress_stream(chunks: Iterable, encoding: str) -> Iterator[bytes]:
+    """
+    Compress a streamed body, flushing after every chunk so each event is
+    delivered to the client as soon as it is produced.
+    """
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+
+        def compress(data):
+            return compressor.process(data) + compressor.flush()
+        finish = compressor.finish
+    else:
+        compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+        def compress(data):
+            return compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)
+
+        def finish():
+            return compressor.flush(zlib.Z_FINISH)
+
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            if chunk:
+                yield compress(chunk)
+        yield finish()
+    finally:
+        # Propagate close() so generators upstream see client disconnects
+        close = getattr(chunks, 'close', None)
+        if close is not None:
+            close()
+
+
+def register_response_compression(app, min_size: int = DEFAULT_MIN_SIZE):
+    """
+    Compress eligible responses according to the client's Accept-Encoding.
+
+    Args:
+        app: Flask application instance
+        min_size: Minimum body size in bytes for non-streamed responses
+    """
+    app.config.setdefault('COMPRESSION_MIN_SIZE', min_size)
+
+    @app.after_request
+    def compress_response(response):
+        if (response.status_code < 200 or response.status_code >= 300
+                or response.status_code == 204
+                or response.direct_passthrough
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+            return response
+
+        response.vary.add('Accept-Encoding')
+
+        encoding = choose_encoding()
+        if encoding is None:
+            return response
+
+        if response.is_streamed:
+            response.response = compress_stream(response.response, encoding)
+            response.headers.pop('Content-Length', None)
+        else:
+            data = response.get_data()
+            if len(data) < app.config['COMPRESSION_MIN_SIZE']:
+                return response
+            response.set_data(compress_body(data, encoding))
+
+        response.headers['Content-Encoding'] = encoding
+
+        # A strong ETag identifies exact bytes, so tag each coding separately
+        etag, is_weak = response.get_etag()
+        if etag and not is_weak:
+            response.set_etag(f"{etag}-{encoding}")
+
+        return response
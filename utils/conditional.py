@@ -0,0 +1,54 @@
+"""
+Helpers for conditional GET/POST handling with strong ETags.
+
+Handlers compute an ETag from cheap inputs (request parameters and file system
+fingerprints) before doing any expensive work, and answer with 304 Not Modified
+when the client already holds the current representation.
+"""
+import hashlib
+import json
+from typing import Optional
+
+from flask import Response, request
+
+from utils.compression import supported_encodings
+
+
+def make_etag(*parts) -> str:
+    """Build an ETag value from JSON-serializable parts."""
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def not_modified(etag: str) -> Optional[Response]:
+    """
+    Return a 304 response if the request's If-None-Match matches the ETag.
+
+    Compressed responses carry the content coding as an ETag suffix, so the
+    encoded variants of the ETag are accepted as well.
+
+    Args:
+        etag: ETag of the current representation (unquoted)
+
+    Returns:
+        Response: 304 response to return as-is, or None if the client copy is stale
+    """
+    if_none_match = request.if_none_match
+    if not if_none_match:
+        return None
+
+    for candidate in [etag] + [f"{etag}-{encoding}" for encoding in supported_encodings()]:
+        if if_none_match.contains(candidate):
+            response = Response(status=304)
+            response.set_etag(candidate)
+            response.vary.add('Accept-Encoding')
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+    return None
+
+
+def with_etag(response: Response, etag: str) -> Response:
+    """Attach the ETag to a response and require revalidation on every use."""
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
@@ -38,3 +38,23 @@ def get_language_type(file_path):
     _, ext = os.path.splitext(file_path)
     # Empty string if not a recognized code file
     return extension_map.get(ext.lower(), '')
+
+
+def get_data_dir(*parts):
+    """
+    Get a directory for Prompter's local data (caches, job results, telemetry).
+    Uses the PROMPTER_DATA_DIR environment variable if set, otherwise ~/.prompter.
+    The directory is created if it does not exist.
+
+    Args:
+        *parts: Optional subdirectory path components
+
+    Returns:
+        str: Absolute path of the directory
+    """
+    import os
+    base_dir = os.getenv('PROMPTER_DATA_DIR') or os.path.join(
+        os.path.expanduser('~'), '.prompter')
+    path = os.path.join(base_dir, *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
@@ -0,0 +1,218 @@
+"""
+Signature-only outlines of source files.
+
+Python files are outlined with the ast module (class and function signatures
+plus docstrings). Other supported languages use line-based regular expressions
+that pick out declarations while dropping bodies.
+"""
+import ast
+import os
+import re
+from typing import List, Optional
+
+
+# Declaration patterns per file extension. A line matching any pattern is kept
+# in the outline (with its indentation), everything else is dropped.
+_C_LIKE_PATTERNS = [
+    r'^\s*(?:public|private|protected|internal|static|final|abstract|virtual|override|async|sealed|partial|extern|inline|const|unsafe|\s)*'
+    r'(?:class|struct|interface|enum|record|namespace|union)\s+\w+',
+    r'^\s*(?:public|private|protected|internal|static|final|abstract|virtual|override|async|sealed|partial|extern|inline|const|unsafe|synchronized|\s)*'
+    r'[\w<>\[\],:*&\s]+?\s+[*&]?\w+\s*\([^;{]*\)\s*(?:const\s*)?(?:throws\s+[\w.,\s]+)?\s*\{?\s*$',
+    r'^\s*#\s*(?:include|define)\b',
+    r'^\s*(?:using|import|package)\s+[\w.]+',
+]
+
+_JS_PATTERNS = [
+    r'^\s*(?:export\s+)?(?:default\s+)?(?:async\s+)?function\s*\*?\s*\w*\s*\(',
+    r'^\s*(?:export\s+)?(?:default\s+)?(?:abstract\s+)?class\s+\w+',
+    r'^\s*(?:export\s+)?(?:const|let|var)\s+\w+\s*=\s*(?:async\s+)?(?:function\b|\([^)]*\)\s*=>|\w+\s*=>)',
+    r'^\s*(?:export\s+)?(?:interface|type|enum)\s+\w+',
+    r'^\s*(?:static\s+|async\s+|get\s+|set\s+|public\s+|private\s+|protected\s+|readonly\s+)*(?!if\b|for\b|while\b|switch\b|catch\b|return\b)\w+\s*\([^)]*\)\s*(?::\s*[\w<>\[\]|, ]+)?\s*\{\s*$',
+    r'^\s*import\s+.+from\s+',
+    r'^\s*export\s+\{',
+]
+
+OUTLINE_PATTERNS = {
+    '.js': _JS_PATTERNS,
+    '.jsx': _JS_PATTERNS,
+    '.ts': _JS_PATTERNS,
+    '.tsx': _JS_PATTERNS,
+    '.vue': _JS_PATTERNS,
+    '.java': _C_LIKE_PATTERNS,
+    '.cs': _C_LIKE_PATTERNS,
+    '.c': _C_LIKE_PATTERNS,
+    '.h': _C_LIKE_PATTERNS,
+    '.cpp': _C_LIKE_PATTERNS,
+    '.go': [
+        r'^\s*package\s+\w+',
+        r'^\s*func\s+',
+        r'^\s*type\s+\w+',
+    ],
+    '.rs': [
+        r'^\s*(?:pub(?:\([\w:]+\))?\s+)?(?:async\s+)?(?:unsafe\s+)?(?:const\s+)?fn\s+\w+',
+        r'^\s*(?:pub(?:\([\w:]+\))?\s+)?(?:struct|enum|trait|type|mod|union)\s+\w+',
+        r'^\s*impl\b',
+        r'^\s*(?:pub\s+)?use\s+',
+    ],
+    '.rb': [
+        r'^\s*(?:class|module)\s+\w+',
+        r'^\s*def\s+',
+        r'^\s*(?:attr_reader|attr_writer|attr_accessor)\b',
+    ],
+    '.php': [
+        r'^\s*(?:abstract\s+|final\s+)?(?:class|interface|trait|enum)\s+\w+',
+        r'^\s*(?:public\s+|private\s+|protected\s+|static\s+|abstract\s+|final\s+)*function\s+\w+',
+        r'^\s*namespace\s+',
+    ],
+    '.pl': [
+        r'^\s*sub\s+\w+',
+        r'^\s*package\s+[\w:]+',
+    ],
+    '.sh': [
+        r'^\s*(?:function\s+)?\w+\s*\(\)\s*\{?',
+        r'^\s*function\s+\w+',
+    ],
+    '.bash': [
+        r'^\s*(?:function\s+)?\w+\s*\(\)\s*\{?',
+        r'^\s*function\s+\w+',
+    ],
+    '.sql': [
+        r'^\s*(?:CREATE|ALTER)\s+(?:OR\s+REPLACE\s+)?(?:TABLE|VIEW|FUNCTION|PROCEDURE|INDEX|TRIGGER|TYPE)\b',
+    ],
+    '.pas': [
+        r'^\s*(?:procedure|function|constructor|destructor)\s+\w+',
+        r'^\s*\w+\s*=\s*(?:class|record|interface)\b',
+        r'^\s*(?:unit|program|interface|implementation)\b',
+    ],
+    '.md': [
+        r'^#{1,6}\s+',
+    ],
+}
+
+_COMPILED_PATTERNS = {
+    ext: [re.compile(pattern, re.IGNORECASE if ext in ('.sql', '.pas') else 0) for pattern in patterns]
+    for ext, patterns in OUTLINE_PATTERNS.items()
+}
+
+
+def supports_outline(file_path: str) -> bool:
+    """Check if an outline can be produced for the given file type."""
+    ext = os.path.splitext(file_path)[1].lower()
+    return ext == '.py' or ext in _COMPILED_PATTERNS
+
+
+def generate_outline(file_path: str, content: str) -> Optional[str]:
+    """
+    Build a signatures-only outline of a source file.
+
+    Args:
+        file_path: Path of the file, used to pick the outline strategy
+        content: Full file content
+
+    Returns:
+        str: Outline text, or None if the file type has no outline support
+             or the content could not be parsed
+    """
+    ext = os.path.splitext(file_path)[1].lower()
+
+    if ext == '.py':
+        return _outline_python(content)
+
+    patterns = _COMPILED_PATTERNS.get(ext)
+    if patterns is None:
+        return None
+    return _outline_with_patterns(content, patterns)
+
+
+def _outline_python(content: str) -> Optional[str]:
+    """Outline Python source using the ast module."""
+    try:
+        tree = ast.parse(content)
+    except (SyntaxError, ValueError):
+        return None
+
+    lines: List[str] = []
+
+    module_doc = ast.get_docstring(tree)
+    if module_doc:
+        lines.extend(_format_docstring(module_doc, ""))
+        lines.append("")
+
+    for node in tree.body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            lines.append(ast.unparse(node))
+            continue
+        # Separate the import block from the definitions that follow it
+        if lines and lines[-1].startswith(("import ", "from ")):
+            lines.append("")
+        if isinstance(node, (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+            _outline_python_node(node, "", lines)
+        elif isinstance(node, (ast.Assign, ast.AnnAssign)):
+            # Keep module level constants, they are part of the API surface
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            if all(isinstance(t, ast.Name) and t.id.isupper() for t in targets):
+                lines.append(_truncate(ast.unparse(node)))
+
+    return "\n".join(lines).strip() + "\n"
+
+
+def _outline_python_node(node: ast.AST, indent: str, lines: List[str]) -> None:
+    """Append the outline of a class or function definition to lines."""
+    for decorator in node.decorator_list:
+        lines.append(f"{indent}@{ast.unparse(decorator)}")
+
+    if isinstance(node, ast.ClassDef):
+        bases = [ast.unparse(b) for b in node.bases]
+        bases += [ast.unparse(k) for k in node.keywords]
+        signature = f"class {node.name}({', '.join(bases)}):" if bases else f"class {node.name}:"
+    else:
+        prefix = "async def" if isinstance(node, ast.AsyncFunctionDef) else "def"
+        returns = f" -> {ast.unparse(node.returns)}" if node.returns else ""
+        signature = f"{prefix} {node.name}({ast.unparse(node.args)}){returns}:"
+
+    lines.append(f"{indent}{signature}")
+
+    body_indent = indent + "    "
+    docstring = ast.get_docstring(node)
+    if docstring:
+        lines.extend(_format_docstring(docstring, body_indent))
+
+    has_children = False
+    if isinstance(node, ast.ClassDef):
+        for child in node.body:
+            if isinstance(child, (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+                _outline_python_node(child, body_indent, lines)
+                has_children = True
+            elif isinstance(child, (ast.Assign, ast.AnnAssign)):
+                # Class attributes and dataclass fields describe the interface
+                lines.append(f"{body_indent}{_truncate(ast.unparse(child))}")
+                has_children = True
+
+    if not docstring and not has_children:
+        lines.append(f"{body_indent}...")
+    lines.append("")
+
+
+def _format_docstring(docstring: str, indent: str) -> List[str]:
+    """Format a docstring as indented triple-quoted lines."""
+    doc_lines = docstring.splitlines()
+    if len(doc_lines) == 1:
+        return [f'{indent}"""{doc_lines[0]}"""']
+    result = [f'{indent}"""{doc_lines[0]}']
+    result.extend(f"{indent}{line}" if line else "" for line in doc_lines[1:])
+    result.append(f'{indent}"""')
+    return result
+
+
+def _outline_with_patterns(content: str, patterns: List[re.Pattern]) -> str:
+    """Keep only declaration lines matching any of the patterns."""
+    kept = []
+    for line in content.splitlines():
+        if any(pattern.match(line) for pattern in patterns):
+            kept.append(_truncate(line.rstrip()))
+    return "\n".join(kept) + "\n" if kept else ""
+
+
+def _truncate(line: str, max_length: int = 200) -> str:
+    """Shorten very long outline lines such as inline data literals."""
+    return line if len(line) <= max_length else line[:max_length] + " ..."
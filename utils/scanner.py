@@ -1,9 +1,12 @@
 import os
-import tiktoken
+import hashlib
 import time
 from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
 from utils.gitignore_manager import GitIgnoreManager
+from utils.outline import generate_outline
+from utils.tokenizers import tokenizer_registry
+from utils.transforms import apply_transforms
 
 
 @dataclass
@@ -47,12 +50,16 @@ class Scanner:
     def __init__(self, root_dir: str):
         self.root_dir = os.path.abspath(root_dir)
         self.gitignore_manager = GitIgnoreManager(self.root_dir)
-        try:
-            self.encoding = tiktoken.get_encoding("cl100k_base")
-            self.has_tiktoken = True
-        except Exception:
-            # Fallback to simple estimation if tiktoken is not available
-            self.has_tiktoken = False
+        # Shared with the AI providers, so the encoding is loaded once per process
+        self.tokenizer = tokenizer_registry
+        # Outline cache: full path -> (mtime, outline or None)
+        self._outline_cache: Dict[str, Tuple[float, Optional[str]]] = {}
+        self.outline_cache_hits = 0
+        self.outline_cache_misses = 0
+        # Bumped each time the whole-tree fingerprint changes, i.e. each new
+        # state of the project tree the scanner has seen
+        self.index_generation = 0
+        self._root_fingerprint: Optional[str] = None
 
     def _should_exclude(self, path: str) -> bool:
         """
@@ -113,7 +120,7 @@ class Scanner:
         return True
 
     def count_tokens(self, file_path: str) -> int:
-        """Count tokens in a text file using tiktoken if available, or estimate if not."""
+        """Count tokens in a text file with the shared tokenizer, or estimate for non-text files."""
         if not self._is_text_file(file_path):
             # For non-text files, make a rough estimate
             try:
@@ -123,20 +130,16 @@ class Scanner:
                 return 0
 
         try:
-            # If tiktoken is available, use it for accurate counts
-            if self.has_tiktoken:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    tokens = self.encoding.encode(content)
-                    return len(tokens)
-            else:
-                # Fallback to size-based estimation for text files too
-                size = os.path.getsize(file_path)
-                return size // 4
+            with open(file_path, 'r', encoding='utf-8') as f:
+                return self.tokenizer.count(f.read())
         except Exception as e:
             print(f"Error counting tokens in {file_path}: {str(e)}")
             return 0
 
+    def count_text_tokens(self, text: str) -> int:
+        """Count tokens in an in-memory string using the same method as count_tokens()."""
+        return self.tokenizer.count(text)
+
     def _scan_directory(self, dir_path: str, error_context: str = "scanning directory") -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
         """
         Helper method to scan a directory and collect file and directory information.
@@ -365,6 +368,11 @@ class Scanner:
             # In case of error, assume has files as a safer default
             return True
 
+    def is_project_path(self, path: str) -> bool:
+        """Whether a relative path stays inside the root directory (no ../ escapes)."""
+        full_path = os.path.normpath(os.path.join(self.root_dir, path))
+        return full_path == self.root_dir or full_path.startswith(os.path.join(self.root_dir, ''))
+
     def get_file_contents(self, file_path: str) -> Optional[str]:
         """Read file contents, handling encoding issues."""
         full_path = os.path.join(self.root_dir, file_path)
@@ -380,6 +388,142 @@ class Scanner:
         except Exception as e:
             return f"[Error reading file: {str(e)}]"
 
+    def get_transformed_contents(self, file_path: str, transforms: List[str]) -> Tuple[Optional[str], Dict[str, int]]:
+        """
+        Read file contents through the token-reducing transform pipeline.
+        The file is streamed line by line through the enabled transforms.
+
+        Args:
+            file_path: Relative path from root directory
+            transforms: Names of the transforms to apply (see utils.transforms.TRANSFORMS)
+
+        Returns:
+            Tuple of (content, tokens_removed_per_transform); content is None if the
+            file does not exist
+        """
+        full_path = os.path.join(self.root_dir, file_path)
+
+        if not os.path.exists(full_path) or not os.path.isfile(full_path):
+            return None, {}
+
+        try:
+            # Universal newlines, like get_file_contents(), so output and token
+            # counts do not depend on whether a transform is enabled
+            with open(full_path, 'r', encoding='utf-8') as f:
+                return apply_transforms(f, file_path, transforms, self.count_text_tokens)
+        except UnicodeDecodeError:
+            return "[Binary file not included]", {}
+        except ValueError:
+            raise
+        except Exception as e:
+            return f"[Error reading file: {str(e)}]", {}
+
+    def get_tree_fingerprint(self, subpath: str = "") -> str:
+        """
+        Compute a fingerprint of a directory subtree from the names, sizes and
+        modification times of its visible directories and files. Any change that
+        could alter listings or token counts changes the fingerprint, while file
+        contents are never read.
+
+        Args:
+            subpath: Relative path from root directory
+
+        Returns:
+            str: Hex digest identifying the current state of the subtree
+        """
+        digest = hashlib.sha1()
+        full_path = os.path.join(self.root_dir, subpath)
+
+        try:
+            for root, dirs, files in os.walk(full_path):
+                dirs[:] = sorted(d for d in dirs if not self._should_exclude(
+                    os.path.join(root, d)))
+                digest.update(os.path.relpath(root, self.root_dir).encode('utf-8', 'replace'))
+                for file in sorted(files):
+                    file_path = os.path.join(root, file)
+                    if self._should_exclude(file_path):
+                        continue
+                    try:
+                        stat = os.stat(file_path)
+                    except OSError:
+                        continue
+                    digest.update(
+                        f"{file}\0{stat.st_size}\0{stat.st_mtime_ns}\0".encode('utf-8', 'replace'))
+        except Exception as e:
+            print(f"Error fingerprinting directory {subpath}: {str(e)}")
+
+        fingerprint = digest.hexdigest()
+        if os.path.normpath(full_path) == self.root_dir and fingerprint != self._root_fingerprint:
+            self._root_fingerprint = fingerprint
+            self.index_generation += 1
+        return fingerprint
+
+    def warm_up(self) -> str:
+        """
+        Walk the whole tree once so the gitignore rules are loaded and the
+        directory metadata is in the OS cache before the first request.
+
+        Returns:
+            str: Fingerprint of the whole tree
+        """
+        return self.get_tree_fingerprint("")
+
+    def cache_stats(self) -> Dict[str, int]:
+        """Hit and miss counts of the scanner's caches."""
+        return {
+            "outline_hits": self.outline_cache_hits,
+            "outline_misses": self.outline_cache_misses,
+        }
+
+    def get_files_fingerprint(self, file_paths: List[str]) -> str:
+        """
+        Compute a fingerprint of individual files from their sizes and modification times.
+
+        Args:
+            file_paths: Relative paths from root directory
+
+        Returns:
+            str: Hex digest identifying the current state of the files
+        """
+        digest = hashlib.sha1()
+        for file_path in sorted(file_paths):
+            try:
+                stat = os.stat(os.path.join(self.root_dir, file_path))
+                state = f"{stat.st_size}\0{stat.st_mtime_ns}"
+            except OSError:
+                state = "missing"
+            digest.update(f"{file_path}\0{state}\0".encode('utf-8', 'replace'))
+        return digest.hexdigest()
+
+    def get_file_outline(self, file_path: str) -> Optional[str]:
+        """
+        Get a signatures-only outline of a file, cached by modification time.
+
+        Args:
+            file_path: Relative path from root directory
+
+        Returns:
+            str: Outline text, or None if the file does not exist or its type
+                 has no outline support
+        """
+        full_path = os.path.join(self.root_dir, file_path)
+
+        try:
+            mtime = os.path.getmtime(full_path)
+        except OSError:
+            return None
+
+        cached = self._outline_cache.get(full_path)
+        if cached is not None and cached[0] == mtime:
+            self.outline_cache_hits += 1
+            return cached[1]
+        self.outline_cache_misses += 1
+
+        content = self.get_file_contents(file_path)
+        outline = generate_outline(file_path, content) if content is not None else None
+        self._outline_cache[full_path] = (mtime, outline)
+        return outline
+
     def search_files(self, search_query: str) -> List[Dict[str, Any]]:
         """
         Search all text files for the given query.
@@ -0,0 +1,53 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+
+def hash_content(content: str) -> str:
+    """Return a stable content hash for a rendered file."""
+    return hashlib.sha256(content.encode('utf-8', errors='replace')).hexdigest()
+
+
+class SnapshotStore:
+    """
+    Keeps content-hash snapshots of assembled prompts so follow-up prompts can
+    send only the files that changed since a given snapshot.
+
+    Snapshots are held in memory and the oldest ones are evicted once
+    max_snapshots is reached.
+    """
+
+    def __init__(self, max_snapshots: int = 100):
+        self.max_snapshots = max_snapshots
+        self._snapshots: "OrderedDict[str, Dict[str, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def record(self, file_hashes: Dict[str, str]) -> str:
+        """
+        Record a snapshot of file hashes.
+
+        Args:
+            file_hashes: Mapping of file path to content hash
+
+        Returns:
+            str: Identifier of the snapshot, derived from its contents so that
+                 identical file data always yields the same id
+        """
+        snapshot_id = hashlib.sha256(
+            "\n".join(f"{path}\0{file_hashes[path]}" for path in sorted(file_hashes)).encode('utf-8')
+        ).hexdigest()[:32]
+        with self._lock:
+            self._snapshots[snapshot_id] = dict(file_hashes)
+            self._snapshots.move_to_end(snapshot_id)
+            while len(self._snapshots) > self.max_snapshots:
+                self._snapshots.popitem(last=False)
+        return snapshot_id
+
+    def get(self, snapshot_id: str) -> Optional[Dict[str, str]]:
+        """Get the file hashes of a snapshot, or None if it is unknown or evicted."""
+        with self._lock:
+            snapshot = self._snapshots.get(snapshot_id)
+            if snapshot is not None:
+                self._snapshots.move_to_end(snapshot_id)
+            return snapshot
@@ -0,0 +1,289 @@
+"""
+Local request telemetry, stored in SQLite.
+
+Every AI request, tree build, search and response-processing call is
+recorded with its duration, token counts, bytes and cache hit. Writes go
+through a queue to a single writer thread that inserts in batches, so
+recording never blocks a request on disk I/O. percentiles() reports
+p50/p95/p99 per operation and per provider.
+"""
+import functools
+import math
+import os
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Union
+
+from flask import Response
+
+from utils.helpers import get_data_dir
+
+# Records older than this are deleted when the store is opened
+DEFAULT_RETENTION_DAYS = 30
+# Rows written per transaction at most
+WRITE_BATCH_SIZE = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp REAL NOT NULL,
+    operation TEXT NOT NULL,
+    provider TEXT,
+    duration REAL NOT NULL,
+    status TEXT NOT NULL,
+    input_tokens INTEGER,
+    output_tokens INTEGER,
+    bytes INTEGER,
+    cache_hit INTEGER
+);
+CREATE INDEX IF NOT EXISTS events_operation_time ON events (operation, timestamp);
+"""
+
+_COLUMNS = ("timestamp", "operation", "provider", "duration", "status",
+            "input_tokens", "output_tokens", "bytes", "cache_hit")
+
+
+def telemetry_enabled() -> bool:
+    """Telemetry is on unless PROMPTER_TELEMETRY is set to 0/false/no."""
+    return os.getenv('PROMPTER_TELEMETRY', '1').lower() not in ('0', 'false', 'no')
+
+
+def _percentile(sorted_values, fraction: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class TelemetryStore:
+    """SQLite-backed store of timed operations."""
+
+    def __init__(self, path: str, retention_days: float = DEFAULT_RETENTION_DAYS):
+        """
+        Args:
+            path: SQLite database file
+            retention_days: Records older than this are deleted on open
+        """
+        self.path = path
+        self._queue = queue.Queue()
+        self._pending = 0
+        self._pending_cond = threading.Condition()
+
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executescript(_SCHEMA)
+                conn.execute("DELETE FROM events WHERE timestamp < ?",
+                             (time.time() - retention_days * 86400,))
+        finally:
+            conn.close()
+
+        self._writer = threading.Thread(target=self._write_loop, name="telemetry-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=10)
+        # Readers do not block the writer (and vice versa)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def record(self, operation: str, duration: float, provider: str = None, status: str = "ok",
+               input_tokens: int = None, output_tokens: int = None, size: int = None,
+               cache_hit: bool = None) -> None:
+        """
+        Queue one record for writing.
+
+        Args:
+            operation: Operation name, e.g. "ai.stream" or "search"
+            duration: Seconds the operation took
+            provider: AI provider, for AI operations
+            status: "ok", "error" or "cancelled"
+            input_tokens: Prompt tokens
+            output_tokens: Response tokens
+            size: Bytes of payload produced
+            cache_hit: Whether the result came from a cache
+        """
+        if not telemetry_enabled():
+            return
+        with self._pending_cond:
+            self._pending += 1
+        self._queue.put((time.time(), operation, provider, duration, status, input_tokens,
+                         output_tokens, size, None if cache_hit is None else int(cache_hit)))
+
+    @contextmanager
+    def timed(self, operation: str, **fields) -> Iterator[Dict[str, Any]]:
+        """
+        Time a block and record it. The yielded dict can be updated with
+        record() fields (tokens, size, cache_hit, status) inside the block.
+        Exceptions record status "error"; a closed generator records "cancelled".
+        """
+        event = dict(fields)
+        start = time.perf_counter()
+        try:
+            yield event
+        except GeneratorExit:
+            event.setdefault("status", "cancelled")
+            raise
+        except BaseException:
+            event["status"] = "error"
+            raise
+        finally:
+            self.record(operation, time.perf_counter() - start, **event)
+
+    def _write_loop(self) -> None:
+        conn = self._connect()
+        while True:
+            rows = [self._queue.get()]
+            while len(rows) < WRITE_BATCH_SIZE:
+                try:
+                    rows.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                with conn:
+                    conn.executemany(
+                        f"INSERT INTO events ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})",
+                        rows)
+            except sqlite3.Error as e:
+                print(f"Error writing telemetry: {str(e)}")
+            with self._pending_cond:
+                self._pending -= len(rows)
+                self._pending_cond.notify_all()
+
+    def flush(self, timeout: float = 5.0) -> None:
+        """Wait until every queued record has been written."""
+        with self._pending_cond:
+            self._pending_cond.wait_for(lambda: self._pending == 0, timeout)
+
+    def percentiles(self, window_seconds: float = 86400, operation: str = None) -> Dict[str, Any]:
+        """
+        Latency percentiles and totals per operation, and per provider within
+        each operation.
+
+        Args:
+            window_seconds: Only include records from this many seconds back
+            operation: Only include this operation
+
+        Returns:
+            dict: {"operations": {operation: stats}, "providers": {operation: {provider: stats}}}
+                  where stats has count, errors, p50, p95, p99, mean, max,
+                  cache_hit_rate and token and byte totals
+        """
+        self.flush()
+        query = ("SELECT operation, provider, duration, status, input_tokens, output_tokens, bytes, cache_hit "
+                 "FROM events WHERE timestamp >= ?")
+        params = [time.time() - window_seconds]
+        if operation:
+            query += " AND operation = ?"
+            params.append(operation)
+
+        groups: Dict[tuple, list] = {}
+        conn = self._connect()
+        try:
+            for row in conn.execute(query, params):
+                groups.setdefault((row[0], None), []).append(row)
+                if row[1]:
+                    groups.setdefault((row[0], row[1]), []).append(row)
+        finally:
+            conn.close()
+
+        result = {"window_seconds": window_seconds, "operations": {}, "providers": {}}
+        for (op, provider), rows in sorted(groups.items(), key=lambda item: (item[0][0], item[0][1] or "")):
+            stats = self._summarize(rows)
+            if provider is None:
+                result["operations"][op] = stats
+            else:
+                result["providers"].setdefault(op, {})[provider] = stats
+        return result
+
+    @staticmethod
+    def _summarize(rows) -> Dict[str, Any]:
+        durations = sorted(row[2] for row in rows)
+        cache_flags = [row[7] for row in rows if row[7] is not None]
+        return {
+            "count": len(rows),
+            "errors": sum(1 for row in rows if row[3] == "error"),
+            "p50": _percentile(durations, 0.50),
+            "p95": _percentile(durations, 0.95),
+            "p99": _percentile(durations, 0.99),
+            "mean": sum(durations) / len(durations),
+            "max": durations[-1],
+            "cache_hit_rate": sum(cache_flags) / len(cache_flags) if cache_flags else None,
+            "input_tokens": sum(row[4] or 0 for row in rows),
+            "output_tokens": sum(row[5] or 0 for row in rows),
+            "bytes": sum(row[6] or 0 for row in rows),
+        }
+
+
+class NullTelemetryStore:
+    """Stand-in used when telemetry is disabled or its database cannot be opened; records nothing."""
+
+    def record(self, operation: str, duration: float, **fields) -> None:
+        pass
+
+    @contextmanager
+    def timed(self, operation: str, **fields) -> Iterator[Dict[str, Any]]:
+        yield dict(fields)
+
+    def flush(self, timeout: float = 5.0) -> None:
+        pass
+
+    def percentiles(self, window_seconds: float = 86400, operation: str = None) -> Dict[str, Any]:
+        return {"window_seconds": window_seconds, "operations": {}, "providers": {}, "enabled": False}
+
+
+def timed_route(operation: str):
+    """
+    Decorator recording a Flask view's duration, status and response size.
+    A 304 response counts as a cache hit.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            status = "error"
+            size = None
+            cached = None
+            try:
+                result = view(*args, **kwargs)
+                response = result[0] if isinstance(result, tuple) else result
+                code = result[1] if isinstance(result, tuple) and len(result) > 1 else getattr(response, 'status_code', 200)
+                status = "ok" if code < 400 else "error"
+                if isinstance(response, Response) and not response.is_streamed:
+                    size = response.content_length
+                    cached = response.status_code == 304
+                return result
+            finally:
+                get_telemetry().record(operation, time.perf_counter() - start, status=status,
+                                       size=size, cache_hit=cached)
+        return wrapper
+    return decorator
+
+
+_telemetry: Optional[Union[TelemetryStore, NullTelemetryStore]] = None
+_telemetry_lock = threading.Lock()
+_null_telemetry = NullTelemetryStore()
+
+
+def get_telemetry():
+    """
+    Get the process-wide telemetry store in the data directory.
+
+    Returns a no-op store when telemetry is disabled, or when the database
+    cannot be opened (logged once), so telemetry never fails a request.
+    """
+    global _telemetry
+    if not telemetry_enabled():
+        return _null_telemetry
+    with _telemetry_lock:
+        if _telemetry is None:
+            try:
+                _telemetry = TelemetryStore(os.path.join(get_data_dir('telemetry'), 'telemetry.db'))
+            except (sqlite3.Error, OSError) as e:
+                print(f"Telemetry disabled, cannot open its database: {str(e)}")
+                _telemetry = _null_telemetry
+        return _telemetry
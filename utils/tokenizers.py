@@ -0,0 +1,123 @@
+import threading
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional
+
+import tiktoken
+
+DEFAULT_ENCODING = "cl100k_base"
+
+
+@dataclass(frozen=True)
+class TokenizerSpec:
+    """Offline approximation of a provider's tokenizer: a tiktoken encoding and a correction factor."""
+    encoding: str
+    scale: float = 1.0
+
+
+# Best local approximation per provider. Only OpenAI publishes its tokenizer;
+# the others are close to cl100k_base, with a rough factor where their
+# vocabularies are known to split code into more tokens.
+PROVIDER_TOKENIZERS: Dict[str, TokenizerSpec] = {
+    "openai": TokenizerSpec("o200k_base"),
+    "xai": TokenizerSpec("cl100k_base"),
+    "deepseek": TokenizerSpec("cl100k_base"),
+    "anthropic": TokenizerSpec("cl100k_base", 1.1),
+    "gemini": TokenizerSpec("cl100k_base"),
+    "mistral": TokenizerSpec("cl100k_base", 1.1),
+    "ollama": TokenizerSpec("cl100k_base"),
+}
+
+
+class TokenizerRegistry:
+    """
+    Process-wide cache of tiktoken encodings.
+
+    Loading an encoding reads and parses a large BPE file, so each one is
+    loaded once and shared by the scanner, the providers and the streaming
+    metrics. If an encoding cannot be loaded (e.g. offline without a cached
+    BPE file), counts fall back to ~4 characters per token.
+    """
+
+    def __init__(self):
+        self._encodings: Dict[str, Optional[tiktoken.Encoding]] = {}
+        self._lock = threading.Lock()
+        # Callers blocked until an encoding finishes loading
+        self.waiting = 0
+        self._waiting_lock = threading.Lock()
+        self.preloaded = threading.Event()
+
+    def get_encoding(self, name: str = DEFAULT_ENCODING) -> Optional[tiktoken.Encoding]:
+        """Get an encoding, loading it on first use. Returns None if it is unavailable."""
+        encoding = self._encodings.get(name)
+        if encoding is not None or name in self._encodings:
+            return encoding
+
+        with self._waiting_lock:
+            self.waiting += 1
+        try:
+            return self._load_encoding(name)
+        finally:
+            with self._waiting_lock:
+                self.waiting -= 1
+
+    def _load_encoding(self, name: str) -> Optional[tiktoken.Encoding]:
+        with self._lock:
+            if name not in self._encodings:
+                try:
+                    self._encodings[name] = tiktoken.get_encoding(name)
+                except Exception as e:
+                    print(f"Tokenizer {name} unavailable, estimating token counts: {str(e)}")
+                    self._encodings[name] = None
+            return self._encodings[name]
+
+    def loaded_encodings(self) -> int:
+        """Number of encodings loaded successfully."""
+        return sum(1 for encoding in list(self._encodings.values()) if encoding is not None)
+
+    def preload(self, names: Iterable[str] = None) -> None:
+        """Load encodings ahead of time, by default every encoding a provider maps to."""
+        if names is None:
+            names = {DEFAULT_ENCODING} | {spec.encoding for spec in PROVIDER_TOKENIZERS.values()}
+        for name in names:
+            self.get_encoding(name)
+        self.preloaded.set()
+
+    def preload_in_background(self, names: Iterable[str] = None) -> threading.Thread:
+        """Preload encodings on a daemon thread so startup is not delayed."""
+        thread = threading.Thread(target=self.preload, args=(names,), daemon=True)
+        thread.start()
+        return thread
+
+    def count(self, text: str, encoding_name: str = DEFAULT_ENCODING) -> int:
+        """
+        Count tokens in text with an encoding.
+
+        Args:
+            text: Text to count
+            encoding_name: tiktoken encoding name
+
+        Returns:
+            int: Token count; falls back to cl100k_base, then to a length
+                 estimate, if the encoding is unavailable
+        """
+        if not text:
+            return 0
+        encoding = self.get_encoding(encoding_name)
+        if encoding is None and encoding_name != DEFAULT_ENCODING:
+            encoding = self.get_encoding(DEFAULT_ENCODING)
+        if encoding is None:
+            return len(text) // 4
+        # Special-token markers in source files are counted as plain text
+        return len(encoding.encode(text, disallowed_special=()))
+
+    def count_for_provider(self, text: str, provider: Optional[str]) -> int:
+        """Count tokens with the provider's best offline approximation."""
+        spec = PROVIDER_TOKENIZERS.get(provider)
+        if spec is None:
+            return self.count(text)
+        count = self.count(text, spec.encoding)
+        return round(count * spec.scale) if spec.scale != 1.0 else count
+
+
+# Shared by the scanner, the AI providers and the streaming metrics
+tokenizer_registry = TokenizerRegistry()
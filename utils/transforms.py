@@ -0,0 +1,290 @@
+"""
+Token-reducing content transforms for prompt assembly.
+
+Every transform is a streaming line filter: it takes an iterable of lines
+(with their line endings) and yields the lines to keep, so files are never
+held in memory more than once. Transforms are chained into a pipeline and a
+token meter between each stage reports how many tokens every transform removed.
+"""
+import os
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+@dataclass
+class CommentSyntax:
+    line_prefixes: Tuple[str, ...] = ()
+    block_delimiters: Tuple[Tuple[str, str], ...] = ()
+    triple_quoted_strings: bool = False
+    # Blocks opening with one of these are code, not comments (e.g. Pascal {$IFDEF})
+    directive_prefixes: Tuple[str, ...] = ()
+
+    def block_at(self, text: str) -> Optional[Tuple[str, str]]:
+        """The block comment delimiters text starts with, or None (also for directives)."""
+        if self.directive_prefixes and text.startswith(self.directive_prefixes):
+            return None
+        return next(((start, end) for start, end in self.block_delimiters
+                     if text.startswith(start)), None)
+
+
+_PYTHON = CommentSyntax(line_prefixes=('#',), triple_quoted_strings=True)
+_HASH = CommentSyntax(line_prefixes=('#',))
+_C_STYLE = CommentSyntax(line_prefixes=('//',), block_delimiters=(('/*', '*/'),))
+_MARKUP = CommentSyntax(block_delimiters=(('<!--', '-->'),))
+# Single-file components: markup with JS/TS in <script> and CSS in <style>
+_COMPONENT = CommentSyntax(line_prefixes=('//',), block_delimiters=(('<!--', '-->'), ('/*', '*/')))
+
+COMMENT_SYNTAX = {
+    '.py': _PYTHON, '.sh': _HASH, '.bash': _HASH, '.rb': _HASH, '.pl': _HASH,
+    '.yaml': _HASH, '.yml': _HASH, '.toml': _HASH, '.ini': CommentSyntax(line_prefixes=('#', ';')),
+    '.conf': _HASH, '.cfg': CommentSyntax(line_prefixes=('#', ';')),
+    '.gitignore': _HASH, '.dockerignore': _HASH, '.env': _HASH,
+    '.js': _C_STYLE, '.jsx': _C_STYLE, '.ts': _C_STYLE, '.tsx': _C_STYLE,
+    '.java': _C_STYLE, '.c': _C_STYLE, '.h': _C_STYLE, '.cpp': _C_STYLE,
+    '.cs': _C_STYLE, '.go': _C_STYLE, '.rs': _C_STYLE, '.php': CommentSyntax(
+        line_prefixes=('//', '#'), block_delimiters=(('/*', '*/'),)),
+    '.css': CommentSyntax(block_delimiters=(('/*', '*/'),)),
+    '.sql': CommentSyntax(line_prefixes=('--',), block_delimiters=(('/*', '*/'),)),
+    '.pas': CommentSyntax(line_prefixes=('//',), block_delimiters=(('{', '}'), ('(*', '*)')),
+                          directive_prefixes=('{$', '(*$')),
+    '.html': _MARKUP, '.xml': _MARKUP, '.md': _MARKUP, '.vue': _COMPONENT,
+}
+
+SPECIAL_FILENAME_SYNTAX = {
+    'Dockerfile': _HASH,
+    'Makefile': _HASH,
+}
+
+LICENSE_MARKERS = ('license', 'copyright', 'spdx-license-identifier',
+                   'all rights reserved', '(c)')
+
+# Leading comment blocks longer than this are not treated as license headers
+MAX_LICENSE_HEADER_LINES = 200
+
+
+def get_comment_syntax(file_path: str) -> CommentSyntax:
+    """Get the comment syntax for a file based on its extension or special filename."""
+    filename = os.path.basename(file_path)
+    if filename in SPECIAL_FILENAME_SYNTAX:
+        return SPECIAL_FILENAME_SYNTAX[filename]
+    if filename in ('.gitignore', '.dockerignore', '.env'):
+        return COMMENT_SYNTAX[filename]
+    ext = os.path.splitext(file_path)[1].lower()
+    return COMMENT_SYNTAX.get(ext, CommentSyntax())
+
+
+def _line_ending(line: str) -> str:
+    """Return the line ending of a line, or an empty string for the last line."""
+    if line.endswith('\r\n'):
+        return '\r\n'
+    if line.endswith('\n') or line.endswith('\r'):
+        return line[-1]
+    return ''
+
+
+def strip_trailing_whitespace(lines: Iterable[str], syntax: CommentSyntax) -> Iterator[str]:
+    """Drop spaces and tabs at the end of every line."""
+    for line in lines:
+        yield line.rstrip() + _line_ending(line)
+
+
+def collapse_blank_lines(lines: Iterable[str], syntax: CommentSyntax) -> Iterator[str]:
+    """Collapse runs of blank lines into a single blank line."""
+    previous_blank = False
+    for line in lines:
+        is_blank = not line.strip()
+        if is_blank and previous_blank:
+            continue
+        previous_blank = is_blank
+        yield line
+
+
+def strip_comments(lines: Iterable[str], syntax: CommentSyntax) -> Iterator[str]:
+    """
+    Remove whole-line comments and block comments.
+
+    Only comments that start a line are removed; trailing comments after code are
+    kept because telling them apart from string contents needs a real parser.
+    Lines inside Python triple-quoted strings are never treated as comments.
+    """
+    if not syntax.line_prefixes and not syntax.block_delimiters:
+        yield from lines
+        return
+
+    block_end = None
+    in_triple_quote = False
+    first_line = True
+
+    for line in lines:
+        stripped = line.strip()
+        is_first_line, first_line = first_line, False
+
+        if block_end is not None:
+            end_index = stripped.find(block_end)
+            if end_index < 0:
+                continue
+            remainder = stripped[end_index + len(block_end):]
+            block_end = None
+            if remainder.strip():
+                yield remainder + _line_ending(line)
+            continue
+
+        if in_triple_quote:
+            if _toggles_triple_quote(stripped):
+                in_triple_quote = False
+            yield line
+            continue
+
+        # Keep shebang lines, they change how the file is executed
+        if is_first_line and stripped.startswith('#!'):
+            yield line
+            continue
+
+        if syntax.line_prefixes and stripped.startswith(syntax.line_prefixes):
+            continue
+
+        block = syntax.block_at(stripped)
+        if block is not None:
+            start, end = block
+            end_index = stripped.find(end, len(start))
+            if end_index < 0:
+                block_end = end
+                continue
+            remainder = stripped[end_index + len(end):]
+            if remainder.strip():
+                indent = line[:len(line) - len(line.lstrip())]
+                yield indent + remainder + _line_ending(line)
+            continue
+
+        if syntax.triple_quoted_strings and _toggles_triple_quote(stripped):
+            in_triple_quote = True
+        yield line
+
+
+def _toggles_triple_quote(text: str) -> bool:
+    """Check if a line opens or closes a Python triple-quoted string."""
+    return (text.count('"""') % 2 == 1) or (text.count("'''") % 2 == 1)
+
+
+def strip_license_header(lines: Iterable[str], syntax: CommentSyntax) -> Iterator[str]:
+    """
+    Remove a leading comment block that looks like a license or copyright notice.
+
+    Only the leading comment block is buffered; the rest of the file streams through.
+    """
+    if not syntax.line_prefixes and not syntax.block_delimiters:
+        yield from lines
+        return
+
+    iterator = iter(lines)
+    header: List[str] = []
+    block_end = None
+
+    for line in iterator:
+        stripped = line.strip()
+
+        if block_end is not None:
+            header.append(line)
+            if block_end in stripped:
+                block_end = None
+        elif not stripped or stripped.startswith('#!'):
+            header.append(line)
+        elif syntax.line_prefixes and stripped.startswith(syntax.line_prefixes):
+            header.append(line)
+        else:
+            block = syntax.block_at(stripped)
+            if block is None:
+                yield from _finish_header(header)
+                yield line
+                break
+            header.append(line)
+            if block[1] not in stripped[len(block[0]):]:
+                block_end = block[1]
+
+        if len(header) > MAX_LICENSE_HEADER_LINES:
+            # Too long to be a license notice, let it through untouched
+            yield from header
+            break
+    else:
+        yield from _finish_header(header)
+        return
+
+    yield from iterator
+
+
+def _finish_header(header: List[str]) -> Iterator[str]:
+    """Yield the buffered leading lines unless they contain a license notice."""
+    text = "".join(header).lower()
+    if not any(marker in text for marker in LICENSE_MARKERS):
+        yield from header
+        return
+    # Keep a shebang line even when the notice below it is dropped
+    if header and header[0].startswith('#!'):
+        yield header[0]
+
+
+LineFilter = Callable[[Iterable[str], CommentSyntax], Iterator[str]]
+
+# Transforms in the order they are applied. License detection must see the
+# comments before they are stripped, and blank lines are collapsed last so
+# gaps left by removed comments are folded too.
+TRANSFORMS: Dict[str, LineFilter] = {
+    'strip_license_header': strip_license_header,
+    'strip_comments': strip_comments,
+    'strip_trailing_whitespace': strip_trailing_whitespace,
+    'collapse_blank_lines': collapse_blank_lines,
+}
+
+
+class _TokenMeter:
+    """Pass lines through unchanged while counting their tokens."""
+
+    def __init__(self, lines: Iterable[str], count_tokens: Callable[[str], int]):
+        self.lines = lines
+        self.count_tokens = count_tokens
+        self.tokens = 0
+
+    def __iter__(self) -> Iterator[str]:
+        for line in self.lines:
+            self.tokens += self.count_tokens(line)
+            yield line
+
+
+def apply_transforms(lines: Iterable[str], file_path: str, transforms: List[str],
+                     count_tokens: Optional[Callable[[str], int]] = None) -> Tuple[str, Dict[str, int]]:
+    """
+    Run the enabled transforms over a stream of lines.
+
+    Args:
+        lines: Iterable of lines including line endings, e.g. an open file
+        file_path: Path used to pick the comment syntax
+        transforms: Names of the transforms to enable (see TRANSFORMS)
+        count_tokens: Token counting function; token stats are empty without it
+
+    Returns:
+        Tuple of (transformed_content, tokens_removed_per_transform)
+    """
+    unknown = [name for name in transforms if name not in TRANSFORMS]
+    if unknown:
+        raise ValueError(f"Unknown transform(s): {', '.join(unknown)}")
+
+    syntax = get_comment_syntax(file_path)
+    enabled = [name for name in TRANSFORMS if name in transforms]
+
+    if count_tokens is None:
+        stream = lines
+        for name in enabled:
+            stream = TRANSFORMS[name](stream, syntax)
+        return "".join(stream), {}
+
+    meters = [_TokenMeter(lines, count_tokens)]
+    for name in enabled:
+        meters.append(_TokenMeter(TRANSFORMS[name](meters[-1], syntax), count_tokens))
+
+    content = "".join(meters[-1])
+
+    tokens_removed = {
+        name: meters[i].tokens - meters[i + 1].tokens
+        for i, name in enumerate(enabled)
+    }
+    return content, tokens_removed